@@ -77,6 +77,7 @@ Application options
   -y, --yes                              Don't ask to confirm dangerous actions (non-GUI mode only)
   -q, --quiet                            Suppress progress indication output (non-GUI mode only)
   -v, --version                          Show versions
+  --trace=FILENAME                       Write a timing trace to file
 """)
 
 _USAGE = _("""
@@ -154,6 +155,7 @@ class ArgParser(object):
     -v, --version                   Show versions
     -h, --help                      Display the help
     --usage                         Display usage information
+    --trace=FILENAME                Write a timing trace to file
 
     If the filename (no options) is specified, the interactive session is 
     launched using data from filename.  In this mode (filename, no options), the 
@@ -207,6 +209,7 @@ class ArgParser(object):
         self.runqml = False
         self.quiet = False
         self.auto_accept = False
+        self.trace = None
 
         self.errors = []
         self.parse_args()
@@ -363,6 +366,9 @@ class ArgParser(object):
                 self.auto_accept = True
             elif option in ['-q', '--quiet']:
                 self.quiet = True
+            elif option in ['--trace']:
+                self.trace = value
+                cleandbg += [opt_ix]
         
         #clean options list
         cleandbg.reverse()
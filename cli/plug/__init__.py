@@ -56,10 +56,12 @@ from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.errors import ReportError, FilterError
 from gramps.gen.plug.report import (CATEGORY_TEXT, CATEGORY_DRAW, CATEGORY_BOOK,
                                     CATEGORY_GRAPHVIZ, CATEGORY_CODE, 
-                                    ReportOptions, append_styles)
+                                    ReportOptions, append_styles,
+                                    write_book)
 from gramps.gen.plug.report._paper import paper_sizes
 from gramps.gen.const import USER_HOME
 from gramps.gen.dbstate import DbState
+from gramps.gen.utils import trace
 from gramps.gen.constfunc import STRTYPE, conv_to_unicode_direct
 from ..grampscli import CLIManager
 from ..user import User
@@ -647,7 +649,9 @@ def cl_report(database, name, category, report_class, options_class,
         MyReport = report_class(database, clr.option_class, User())
         MyReport.doc.init()
         MyReport.begin_report()
-        MyReport.write_report()
+        with trace.span('Report.write_report', 'report',
+                        args={'report' : name}):
+            MyReport.write_report()
         MyReport.end_report()
         return clr
     except ReportError as msg:
@@ -752,18 +756,12 @@ def cl_book(database, name, book, options_str_dict):
                               report_class, item.option_class, user)
         if obj:
             append_styles(selected_style, item)
-            rptlist.append(obj)
+            rptlist.append((item, obj))
 
     doc.set_style_sheet(selected_style)
     doc.open(clr.option_class.get_output())
     doc.init()
-    newpage = 0
-    for rpt in rptlist:
-        if newpage:
-            doc.page_break()
-        newpage = 1
-        rpt.begin_report()
-        rpt.write_report()
+    write_book(database, rptlist, doc)
     doc.close()
 
 #------------------------------------------------------------------------
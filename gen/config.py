@@ -128,6 +128,7 @@ register('behavior.addmedia-relative-path', False)
 register('behavior.autoload', False)
 register('behavior.avg-generation-gap', 20)
 register('behavior.betawarn', False)
+register('behavior.book-workers', 0)
 register('behavior.check-for-updates', 0)
 register('behavior.check-for-update-types', ["new"])
 register('behavior.last-check-for-updates', "1970/01/01")
@@ -147,6 +148,7 @@ register('behavior.recent-export-type', 3)
 register('behavior.spellcheck', False)
 register('behavior.startup', 0)
 register('behavior.surname-guessing', 0)
+register('behavior.trace-file', '')
 register('behavior.use-tips', False)
 register('behavior.welcome', 100)
 register('behavior.web-search-url', 'http://google.com/#&q=%(text)s')
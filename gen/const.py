@@ -292,6 +292,7 @@ LONGOPTS = [
     "sm-config-prefix=", 
     "sm-disable",
     "sync",
+    "trace=",
     "usage", 
     "version",
     "qml",
@@ -602,6 +602,17 @@ class DbReadBase(object):
         """
         raise NotImplementedError
 
+    def get_reference_count(self, handle):
+        """
+        Return the number of objects that hold a reference to the object
+        handle.
+
+        This default implementation counts the results of
+        :meth:`find_backlink_handles`. Backends can override this method to
+        count the references without reading them.
+        """
+        return sum(1 for item in self.find_backlink_handles(handle))
+
     def get_raw_event_data(self, handle):
         """
         Return raw (serialized and pickled) Event object from handle
@@ -598,39 +598,39 @@ class DictionaryDb(DbWriteBase, DbReadBase):
             return self.tag_map.keys()
 
     def get_event_from_handle(self, handle):
-        return self.event_map[handle]
+        return self.event_map.get(handle)
 
     def get_family_from_handle(self, handle): 
-        return self.family_map[handle]
+        return self.family_map.get(handle)
 
     def get_repository_from_handle(self, handle):
-        return self.repository_map[handle]
+        return self.repository_map.get(handle)
 
     def get_person_from_handle(self, handle):
-        return self.person_map[handle]
+        return self.person_map.get(handle)
 
     def get_place_from_handle(self, handle):
-        place = self.place_map[handle]
+        place = self.place_map.get(handle)
         return place
 
     def get_citation_from_handle(self, handle):
-        citation = self.citation_map[handle]
+        citation = self.citation_map.get(handle)
         return citation
 
     def get_source_from_handle(self, handle):
-        source = self.source_map[handle]
+        source = self.source_map.get(handle)
         return source
 
     def get_note_from_handle(self, handle):
-        note = self.note_map[handle]
+        note = self.note_map.get(handle)
         return note
 
     def get_object_from_handle(self, handle):
-        media = self.media_map[handle]
+        media = self.media_map.get(handle)
         return media
 
     def get_tag_from_handle(self, handle):
-        tag = self.tag_map[handle]
+        tag = self.tag_map.get(handle)
         return tag
 
     def get_default_person(self):
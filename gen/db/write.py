@@ -1183,6 +1183,28 @@ class DbBsddb(DbBsddbRead, DbWriteBase, UpdateCallback):
 
         referenced_cur.close()
 
+    def get_reference_count(self, handle):
+        """
+        Return the number of objects that hold a reference to the object
+        handle.
+
+        The references are counted in the secondary index of the reference
+        map, which has one duplicate per referencing object, without reading
+        them.
+        """
+        if isinstance(handle, UNITYPE):
+            handle = handle.encode('utf-8')
+        referenced_cur = self.get_reference_map_referenced_cursor()
+
+        try:
+            ret = referenced_cur.set(handle)
+        except:
+            ret = None
+
+        count = referenced_cur.count() if ret is not None else 0
+        referenced_cur.close()
+        return count
+
     def delete_primary_from_reference_map(self, handle, transaction, txn=None):
         """
         Remove all references to the primary object from the reference_map.
@@ -1461,7 +1483,19 @@ class DbBsddb(DbBsddbRead, DbWriteBase, UpdateCallback):
         self.metadata   = None
         self.env        = None
         self.db_is_open = False
-    
+
+    @catch_db_error
+    def sync(self):
+        """
+        Write all committed changes to the files of the database, so that a
+        copy of the database directory can be opened as a database of its
+        own. Metadata is only written on close and is not included.
+        """
+        if not self.db_is_open:
+            return
+        self.env.txn_checkpoint()
+        self.env.memp_sync()
+
     @catch_db_error
     def close(self):
         if not self.db_is_open:
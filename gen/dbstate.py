@@ -26,6 +26,7 @@ Provide the database state class
 from .db import DbBsddbRead
 from .proxy.proxybase import ProxyDbBase
 from .utils.callback import Callback
+from .utils import trace
 from .config import config
 
 class DbState(Callback):
@@ -72,6 +73,7 @@ class DbState(Callback):
             config.get('preferences.eprefix'),
             config.get('preferences.rprefix'),
             config.get('preferences.nprefix') )
+        trace.instrument_db(self.db)
         self.open = True
         self.signal_change()
 
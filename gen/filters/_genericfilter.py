@@ -40,6 +40,8 @@ from ..lib.repo import Repository
 from ..lib.mediaobj import MediaObject
 from ..lib.note import Note
 from ..lib.tag import Tag
+from ..utils import trace
+from .rules import MatchesFilterBase
 
 #-------------------------------------------------------------------------
 #
@@ -66,6 +68,7 @@ class GenericFilter(object):
             self.comment = ''
             self.logical_op = 'and'
             self.invert = False
+        self.prepared_db = None
 
     def match(self, handle, db):
         """
@@ -210,7 +213,10 @@ class GenericFilter(object):
         return found_one
 
     def or_test(self, db, person):
-        return any(rule.apply(db, person) for rule in self.flist) 
+        return any(rule.apply(db, person) for rule in self.flist)
+
+    def and_test(self, db, person):
+        return all(rule.apply(db, person) for rule in self.flist)
 
     def get_check_func(self):
         try:
@@ -219,6 +225,13 @@ class GenericFilter(object):
             m = self.check_and
         return m
 
+    def get_test_func(self):
+        try:
+            m = getattr(self, self.logical_op + '_test')
+        except AttributeError:
+            m = self.and_test
+        return m
+
     def check(self, db, handle):
         return self.get_check_func()(db, [handle])
 
@@ -242,12 +255,139 @@ class GenericFilter(object):
                 match the filter are returned as a list of handles
         """
         m = self.get_check_func()
+        with trace.span('GenericFilter.apply', 'filter',
+                        args={'name' : self.get_name()}):
+            self.prepare_rules(db)
+            timed = self.time_rules()
+            try:
+                return m(db, id_list, cb_progress, tupleind)
+            finally:
+                self.untime_rules(timed)
+                for rule in self.flist:
+                    rule.requestreset()
+
+    def prepare_rules(self, db):
+        """
+        Request that the rules prepare for db.
+        """
         for rule in self.flist:
-            rule.requestprepare(db)
-        res = m(db, id_list, cb_progress, tupleind)
+            with trace.span(rule.__class__.__name__ + '.prepare', 'rule'):
+                rule.requestprepare(db)
+
+    def time_rules(self):
+        """
+        Time the apply of the rules, if tracing is enabled.
+
+        :Returns: the rules timed, for untime_rules
+        """
+        if not trace.is_enabled():
+            return []
+        return [(rule, trace.instrument(rule, ('apply',), 'rule'))
+                for rule in self.flist]
+
+    def untime_rules(self, timed):
+        """
+        Stop timing the rules timed by time_rules.
+        """
+        for rule, names in timed:
+            trace.uninstrument(rule, names)
+
+    def apply_objects(self, db, id_list=None, cb_progress=None):
+        """
+        Apply the filter using db, like apply, but generate (handle, obj)
+        for the objects that match the filter. The objects are fetched
+        once, for the test, and handed to the caller, so that a report
+        iterating over the result need not fetch them again.
+
+        If id_list given, the handles in id_list are used, in that order.
+        If not given a database cursor will be used over all entries.
+        Handles of objects that are not in the database are skipped.
+
+        The rules stay prepared until the generator is exhausted or closed.
+        """
+        test = self.get_test_func()
+        self.prepare_rules(db)
+        timed = self.time_rules()
+        try:
+            if id_list is None:
+                with self.get_cursor(db) as cursor:
+                    for handle, data in cursor:
+                        obj = self.make_obj()
+                        obj.unserialize(data)
+                        if cb_progress:
+                            cb_progress()
+                        if test(db, obj) != self.invert:
+                            yield handle, obj
+            else:
+                for handle in id_list:
+                    obj = self.find_from_handle(db, handle)
+                    if cb_progress:
+                        cb_progress()
+                    if obj is None:
+                        continue
+                    if test(db, obj) != self.invert:
+                        yield handle, obj
+        finally:
+            self.untime_rules(timed)
+            for rule in self.flist:
+                rule.requestreset()
+
+    def keep_prepared(self, db):
+        """
+        Prepare the rules of the filter and keep them prepared until
+        release_prepared is called.
+
+        While the filter is kept prepared, match and apply reuse the
+        prepared state of the rules instead of preparing them on every call.
+        Use update_prepared to keep that state in sync with database changes.
+
+        The rules of custom filters matched by the rules are shared by all
+        users of the custom filter, so they are prepared as private copies.
+        Otherwise other users, like a report on another database, would find
+        them prepared and not prepare them again.
+        """
+        if self.prepared_db is db:
+            return
+        self.release_prepared()
+        MatchesFilterBase.private += 1
+        try:
+            self.prepare_rules(db)
+        finally:
+            MatchesFilterBase.private -= 1
+        self.prepared_db = db
+
+    def release_prepared(self):
+        """
+        Release the prepared state obtained with keep_prepared.
+        """
+        if self.prepared_db is None:
+            return
         for rule in self.flist:
             rule.requestreset()
-        return res
+        self.prepared_db = None
+
+    def update_prepared(self, namespace, handle_list):
+        """
+        Inform the rules of a filter kept prepared that the objects of
+        namespace (eg 'Person', 'Family') with the given handles have been
+        added, changed or deleted.
+
+        :Returns: True if the prepared state of a rule changed, so that
+                objects other than the given ones may now match differently
+                and the filter must be applied again.
+        """
+        if self.prepared_db is None:
+            return False
+        changed = False
+        # rules prepared again keep private copies, as in keep_prepared
+        MatchesFilterBase.private += 1
+        try:
+            for rule in self.flist:
+                if rule.update(self.prepared_db, namespace, handle_list):
+                    changed = True
+        finally:
+            MatchesFilterBase.private -= 1
+        return changed
 
 class GenericFamilyFilter(GenericFilter):
 
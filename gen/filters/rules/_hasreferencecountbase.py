@@ -58,10 +58,7 @@ class HasReferenceCountBase(Rule):
 
 
     def apply(self, db, obj):
-        handle = obj.get_handle()
-        count = 0
-        for item in db.find_backlink_handles(handle):
-            count += 1
+        count = db.get_reference_count(obj.get_handle())
 
         if self.count_type == 0:     # "lesser than"
             return count < self.userSelectedCount
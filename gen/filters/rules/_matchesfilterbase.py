@@ -56,40 +56,63 @@ class MatchesFilterBase(Rule):
     description = "Matches objects matched by the specified filter name"
     category    = _('General filters')
 
+    # while not 0, prepare takes a private copy of the custom filter, see
+    # GenericFilter.keep_prepared
+    private = 0
+    # the private copy of the custom filter, while the rule is prepared
+    private_filter = None
+
     def prepare(self, db):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
-            if self.list[0] in filters:
-                filt = filters[self.list[0]]
-                for rule in filt.flist:
-                    rule.requestprepare(db)
-            else:
-                LOG.warning(_("Can't find filter %s in the defined custom filters")
-                                    % self.list[0])
+        filt = self.find_filter()
+        if filt is not None:
+            if MatchesFilterBase.private:
+                # the rules of the custom filter are shared by all its users,
+                # a filter kept prepared must not keep them prepared
+                filt = filt.__class__(filt)
+                filt.set_rules([rule.__class__(rule.list[:], rule.use_regex)
+                                for rule in filt.flist])
+                self.private_filter = filt
+            for rule in filt.flist:
+                rule.requestprepare(db)
         else:
-            LOG.warning(_("Can't find filter %s in the defined custom filters") 
+            LOG.warning(_("Can't find filter %s in the defined custom filters")
                                     % self.list[0])
 
     def reset(self):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
-            if self.list[0] in filters:
-                filt = filters[self.list[0]]
-                for rule in filt.flist:
-                    rule.requestreset()
+        filt = self.find_filter()
+        if filt is not None:
+            for rule in filt.flist:
+                rule.requestreset()
+        self.private_filter = None
+
+    def update(self, db, namespace, handle_list):
+        """
+        The rules of the filter are checked at apply, only their prepared
+        state must be updated. Objects of update_namespaces are read
+        through the filter, so their changes can alter which objects match.
+        """
+        filt = self.find_filter()
+        if filt is None:
+            return False
+        changed = namespace in self.update_namespaces
+        for rule in filt.flist:
+            if rule.update(db, namespace, handle_list):
+                changed = True
+        return changed
 
     def apply(self, db, obj):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
-            if self.list[0] in filters:
-                filt = filters[self.list[0]]
-                return filt.check(db, obj.handle)
+        filt = self.find_filter()
+        if filt is not None:
+            return filt.check(db, obj.handle)
         return False
     
     def find_filter(self):
         """
-        Return the selected filter or None.
+        Return the selected filter or None. While the rule is prepared with
+        a private copy of the filter, that copy is returned.
         """
+        if self.private_filter is not None:
+            return self.private_filter
         if gramps.gen.filters.CustomFilters:
             filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
             if self.list[0] in filters:
@@ -55,6 +55,8 @@ class Rule(object):
     category    = _('Miscellaneous filters')
     description = _('No description')
     allow_regex = False
+    # object types of which changes can alter the prepared state, see update
+    update_namespaces = ()
 
     def __init__(self, arg, use_regex=False):
         self.list = []
@@ -115,6 +117,27 @@ class Rule(object):
     def reset(self):
         """remove no longer needed memory"""
         pass
+
+    def update(self, db, namespace, handle_list):
+        """
+        Update the prepared state after objects of namespace (eg 'Person',
+        'Family') with the given handles were added, changed or deleted,
+        while the rule is kept prepared.
+
+        Return True if the prepared state changed, so objects other than the
+        given ones may match differently.
+
+        Most rules only parse their values in prepare, their state does not
+        depend on other objects. The default prepares the rule again only
+        if namespace is in update_namespaces, the object types the prepared
+        state is built from. Rules with expensive state can override this
+        to update it incrementally.
+        """
+        if self.nrprepare == 0 or namespace not in self.update_namespaces:
+            return False
+        self.reset()
+        self.prepare(db)
+        return True
  
     def set_list(self, arg):
         """Store the values of this rule."""
@@ -55,6 +55,7 @@ class MatchesPersonFilter(MatchesFilterBase):
     
     # we want to have this filter show person filters
     namespace   = 'Person'
+    update_namespaces = ('Person', 'Family')
     
     def prepare(self, db):
         MatchesFilterBase.prepare(self, db)
@@ -126,6 +126,7 @@ class DeepRelationshipPathBetween(Rule):
                     " with a filter.  This produces a set of relationship paths (including"
                     " by marriage) between the specified person and the target people."
                     "  Each path is not necessarily the shortest path.")
+    update_namespaces = ('Person', 'Family')
     
     def prepare(self, db):
         # FIXME: this should user the User class
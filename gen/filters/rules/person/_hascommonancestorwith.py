@@ -47,6 +47,7 @@ class HasCommonAncestorWith(Rule):
     category    = _("Ancestral filters")
     description = _("Matches people that have a common ancestor "
                     "with a specified person")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         self.db = db
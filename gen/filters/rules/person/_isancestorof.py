@@ -45,27 +45,77 @@ class IsAncestorOf(Rule):
     name        = _('Ancestors of <person>')
     category    = _("Ancestral filters")
     description = _("Matches people that are ancestors of a specified person")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         """Assume that if 'Inclusive' not defined, assume inclusive"""
         self.db = db
         self.map = set()
+        self.parent_family = {}
+        self.family_parents = {}
+        self.root_handle = None
         try:
             first = 0 if int(self.list[1]) else 1
         except IndexError:
             first = 1
         try:
             root_person = db.get_person_from_gramps_id(self.list[0])
+            if root_person:
+                self.root_handle = root_person.handle
             self.init_ancestor_list(db,root_person,first)
         except:
             pass
 
     def reset(self):
         self.map.clear()
+        self.parent_family.clear()
+        self.family_parents.clear()
 
     def apply(self, db, person):
         return person.handle in self.map
 
+    def update(self, db, namespace, handle_list):
+        """
+        The ancestors only change if the main parent family of a visited
+        person, or the parents of a visited family change. Other edits, like
+        a corrected name, leave the prepared set untouched.
+        """
+        if self.nrprepare == 0:
+            return False
+        if namespace == 'Person':
+            if self.root_handle is None:
+                # no root person found yet, it may have been added
+                return self.rebuild(db)
+            for handle in handle_list:
+                if handle not in self.parent_family:
+                    continue
+                person = db.get_person_from_handle(handle)
+                if (person is None or self.parent_family[handle] !=
+                        person.get_main_parents_family_handle()):
+                    return self.rebuild(db)
+                if (handle == self.root_handle and
+                        person.get_gramps_id() != self.list[0]):
+                    return self.rebuild(db)
+        elif namespace == 'Family':
+            for handle in handle_list:
+                if handle not in self.family_parents:
+                    continue
+                fam = db.get_family_from_handle(handle)
+                if (fam is None or self.family_parents[handle] !=
+                        (fam.get_father_handle(), fam.get_mother_handle())):
+                    return self.rebuild(db)
+        return False
+
+    def rebuild(self, db):
+        """
+        Prepare the rule again, return True if the set of matched people
+        changed.
+        """
+        old_map = set(self.map)
+        self.reset()
+        self.prepare(db)
+        return old_map != self.map
+
     def init_ancestor_list(self, db, person,first):
         if not person:
             return
@@ -75,10 +125,12 @@ class IsAncestorOf(Rule):
             self.map.add(person.handle)
         
         fam_id = person.get_main_parents_family_handle()
+        self.parent_family[person.handle] = fam_id
         fam = db.get_family_from_handle(fam_id)
         if fam:
             f_id = fam.get_father_handle()
             m_id = fam.get_mother_handle()
+            self.family_parents[fam_id] = (f_id, m_id)
         
             if f_id:
                 self.init_ancestor_list(db,db.get_person_from_handle(f_id),0)
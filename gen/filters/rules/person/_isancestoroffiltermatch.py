@@ -52,6 +52,8 @@ class IsAncestorOfFilterMatch(IsAncestorOf):
     def prepare(self,db):
         self.db = db
         self.map = set()
+        self.parent_family = {}
+        self.family_parents = {}
         try:
             if int(self.list[1]):
                 first = 0
@@ -69,6 +71,14 @@ class IsAncestorOfFilterMatch(IsAncestorOf):
 
     def reset(self):
         self.map.clear()
+        self.parent_family.clear()
+        self.family_parents.clear()
+
+    def update(self, db, namespace, handle_list):
+        # any change of a person can alter the people matched by the filter
+        if self.nrprepare == 0 or namespace not in self.update_namespaces:
+            return False
+        return self.rebuild(db)
 
     def apply(self,db,person):
         return person.handle in self.map
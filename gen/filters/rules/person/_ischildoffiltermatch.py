@@ -47,6 +47,7 @@ class IsChildOfFilterMatch(Rule):
     name        = _('Children of <filter> match')
     category    = _('Family filters')
     description = _("Matches children of anybody matched by a filter")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
@@ -51,6 +51,7 @@ class IsDescendantFamilyOf(Rule):
     category    = _('Descendant filters')
     description = _("Matches people that are descendants or the spouse "
                     "of a descendant of a specified person")
+    update_namespaces = ('Person', 'Family')
     
     def prepare(self,db):
         self.db = db
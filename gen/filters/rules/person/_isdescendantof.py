@@ -46,35 +46,89 @@ class IsDescendantOf(Rule):
     name        = _('Descendants of <person>')
     category    = _('Descendant filters')
     description = _('Matches all descendants for the specified person')
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         self.db = db
         self.map = set()
+        self.person_families = {}
+        self.family_children = {}
+        self.root_handle = None
         try:
             first = False if int(self.list[1]) else True
         except IndexError:
             first = True
         try:
             root_person = db.get_person_from_gramps_id(self.list[0])
+            if root_person:
+                self.root_handle = root_person.handle
             self.init_list(root_person,first)
         except:
             pass
 
     def reset(self):
         self.map.clear()
+        self.person_families.clear()
+        self.family_children.clear()
 
     def apply(self, db, person):
         return person.handle in self.map
 
+    def update(self, db, namespace, handle_list):
+        """
+        The descendants only change if the families of a visited person, or
+        the children of a visited family change. Other edits, like a
+        corrected name, leave the prepared set untouched.
+        """
+        if self.nrprepare == 0:
+            return False
+        if namespace == 'Person':
+            if self.root_handle is None:
+                # no root person found yet, it may have been added
+                return self.rebuild(db)
+            for handle in handle_list:
+                if handle not in self.person_families:
+                    continue
+                person = db.get_person_from_handle(handle)
+                if (person is None or self.person_families[handle] !=
+                        tuple(person.get_family_handle_list())):
+                    return self.rebuild(db)
+                if (handle == self.root_handle and
+                        person.get_gramps_id() != self.list[0]):
+                    return self.rebuild(db)
+        elif namespace == 'Family':
+            for handle in handle_list:
+                if handle not in self.family_children:
+                    continue
+                fam = db.get_family_from_handle(handle)
+                if (fam is None or self.family_children[handle] !=
+                        tuple(ref.ref for ref in fam.get_child_ref_list())):
+                    return self.rebuild(db)
+        return False
+
+    def rebuild(self, db):
+        """
+        Prepare the rule again, return True if the set of matched people
+        changed.
+        """
+        old_map = set(self.map)
+        self.reset()
+        self.prepare(db)
+        return old_map != self.map
+
     def init_list(self, person, first):
         if not person:
             return
         if not first:
             self.map.add(person.handle)
         
-        for fam_id in person.get_family_handle_list():
+        fam_list = person.get_family_handle_list()
+        self.person_families[person.handle] = tuple(fam_list)
+        for fam_id in fam_list:
             fam = self.db.get_family_from_handle(fam_id)
             if fam:
-                for child_ref in fam.get_child_ref_list():
+                child_list = [ref.ref for ref in fam.get_child_ref_list()]
+                self.family_children[fam_id] = tuple(child_list)
+                for child_handle in child_list:
                     self.init_list(
-                        self.db.get_person_from_handle(child_ref.ref), 0)
+                        self.db.get_person_from_handle(child_handle), 0)
@@ -52,6 +52,8 @@ class IsDescendantOfFilterMatch(IsDescendantOf):
     def prepare(self,db):
         self.db = db
         self.map = set()
+        self.person_families = {}
+        self.family_children = {}
         try:
             if int(self.list[1]):
                 first = 0
@@ -69,6 +71,14 @@ class IsDescendantOfFilterMatch(IsDescendantOf):
 
     def reset(self):
         self.map.clear()
+        self.person_families.clear()
+        self.family_children.clear()
+
+    def update(self, db, namespace, handle_list):
+        # any change of a person can alter the people matched by the filter
+        if self.nrprepare == 0 or namespace not in self.update_namespaces:
+            return False
+        return self.rebuild(db)
 
     def apply(self,db,person):
         return person.handle in self.map
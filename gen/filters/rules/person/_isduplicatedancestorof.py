@@ -48,6 +48,7 @@ class IsDuplicatedAncestorOf(Rule):
     category    = _("Ancestral filters")
     description = _("Matches people that are ancestors twice or more "
                     "of a specified person")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         self.db = db
@@ -54,6 +54,7 @@ class IsLessThanNthGenerationAncestorOfBookmarked(Rule):
     category    = _('Ancestral filters')
     description = _("Matches ancestors of the people on the bookmark list "
                     "not more than N generations away")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         self.db = db
@@ -49,6 +49,7 @@ class IsLessThanNthGenerationAncestorOfDefaultPerson(Rule):
     category    = _('Ancestral filters')
     description = _("Matches ancestors of the default person "
                     "not more than N generations away")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
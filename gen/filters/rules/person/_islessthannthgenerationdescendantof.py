@@ -48,6 +48,7 @@ class IsLessThanNthGenerationDescendantOf(Rule):
     category    = _('Descendant filters')
     description = _("Matches people that are descendants of a "
                     "specified person not more than N generations away")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
@@ -47,6 +47,7 @@ class IsMoreThanNthGenerationAncestorOf(Rule):
     category    = _("Ancestral filters")
     description = _("Matches people that are ancestors "
                     "of a specified person at least N generations away")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
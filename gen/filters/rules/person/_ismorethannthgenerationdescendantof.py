@@ -47,6 +47,7 @@ class IsMoreThanNthGenerationDescendantOf(Rule):
     category    = _("Descendant filters")
     description = _("Matches people that are descendants of a specified "
                  "person at least N generations away")
+    update_namespaces = ('Person', 'Family')
     
     
     def prepare(self ,db):
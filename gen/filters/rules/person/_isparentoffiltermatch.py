@@ -47,6 +47,7 @@ class IsParentOfFilterMatch(Rule):
     name        = _('Parents of <filter> match')
     category    = _('Family filters')
     description = _("Matches parents of anybody matched by a filter")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
@@ -32,6 +32,7 @@ _ = glocale.translation.gettext
 #
 #-------------------------------------------------------------------------
 from .. import Rule
+from ....utils.db import FamilyComponents
 
 #-------------------------------------------------------------------------
 #
@@ -45,52 +46,21 @@ class IsRelatedWith(Rule):
     name        = _('People related to <Person>')
     category    = _("Relationship filters")
     description = _("Matches people related to a specified person")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self, db):
         """prepare so the rule can be executed efficiently
            we build the list of people related to <person> here,
            so that apply is only a check into this list
         """
-        self.db = db
-
-        self.relatives = []
-        self.add_relative(db.get_person_from_gramps_id(self.list[0]))
+        self.relatives = set()
+        person = db.get_person_from_gramps_id(self.list[0])
+        if person:
+            self.relatives = FamilyComponents(db).get_connected(
+                person.get_handle())
 
     def reset(self):
-        self.relatives = []
-        
+        self.relatives = set()
+
     def apply(self, db, person):
         return person.handle in self.relatives
-
-
-    def add_relative(self, person):
-        """Recursive function that scans relatives and add them to self.relatives"""
-        if not(person) or person.handle in self.relatives:
-            return
-
-        # Add the relative to the list
-        self.relatives.append(person.handle)
-        
-        for family_handle in person.get_parent_family_handle_list():
-            family = self.db.get_family_from_handle(family_handle)
-            if family:
-        # Check Parents
-                for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                    if parent_handle:
-                        self.add_relative(self.db.get_person_from_handle(parent_handle))
-        # Check Sibilings
-                for child_ref in family.get_child_ref_list():
-                    self.add_relative(self.db.get_person_from_handle(child_ref.ref))
-
-        for family_handle in person.get_family_handle_list():
-            family = self.db.get_family_from_handle(family_handle)
-            if family:
-        # Check Spouse
-                for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                    if parent_handle:
-                        self.add_relative(self.db.get_person_from_handle(parent_handle))
-        # Check Children
-                for child_ref in family.get_child_ref_list():
-                    self.add_relative(self.db.get_person_from_handle(child_ref.ref))
-
-        return
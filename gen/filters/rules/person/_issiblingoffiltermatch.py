@@ -46,6 +46,7 @@ class IsSiblingOfFilterMatch(Rule):
     name        = _('Siblings of <filter> match')
     category    = _('Family filters')
     description = _("Matches siblings of anybody matched by a filter")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
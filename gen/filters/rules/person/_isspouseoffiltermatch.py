@@ -47,6 +47,7 @@ class IsSpouseOfFilterMatch(Rule):
     name        = _('Spouses of <filter> match')
     description = _("Matches people married to anybody matching a filter")
     category    = _('Family filters')
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.filt = MatchesFilter (self.list)
@@ -53,6 +53,7 @@ class RelationshipPathBetweenBookmarks(Rule):
     description = _("Matches the ancestors of bookmarked individuals "
                     "back to common ancestors, producing the relationship "
                     "path(s) between bookmarked persons.")
+    update_namespaces = ('Person', 'Family')
 
     def prepare(self,db):
         self.db = db
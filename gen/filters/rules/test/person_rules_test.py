@@ -0,0 +1,197 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the update of person rules kept prepared.
+"""
+
+import unittest
+
+from gramps.gen.db import DbTxn
+from gramps.gen.db.dictionary import DictionaryDb
+from gramps.gen.lib import Person, Family, ChildRef
+from gramps.gen import filters
+from gramps.gen.filters import FilterList, GenericFilter
+from gramps.gen.filters.rules.person import (IsAncestorOf, IsDescendantOf,
+                                             HasBirth, MatchesFilter)
+
+class UpdateTest(unittest.TestCase):
+    """
+    A family tree of three generations, and an unrelated family:
+
+    grandfather + grandmother -> father
+    father + mother -> child
+    stranger + other -> stranger_child
+    """
+
+    def setUp(self):
+        self.db = DictionaryDb()
+        self.people = {}
+        self.families = {}
+        with DbTxn("Test", self.db) as self.trans:
+            for name in ('grandfather', 'grandmother', 'father', 'mother',
+                         'child', 'stranger', 'other', 'stranger_child'):
+                person = Person()
+                self.db.add_person(person, self.trans)
+                self.people[name] = person
+            self.add_family('grandparents', 'grandfather', 'grandmother',
+                            ['father'])
+            self.add_family('parents', 'father', 'mother', ['child'])
+            self.add_family('strangers', 'stranger', 'other',
+                            ['stranger_child'])
+
+    def add_family(self, name, father, mother, children):
+        family = Family()
+        family.set_father_handle(self.people[father].handle)
+        family.set_mother_handle(self.people[mother].handle)
+        self.db.add_family(family, self.trans)
+        for parent in (father, mother):
+            self.people[parent].add_family_handle(family.handle)
+            self.db.commit_person(self.people[parent], self.trans)
+        self.families[name] = family
+        for child in children:
+            self.add_child(name, child)
+
+    def add_child(self, family_name, name):
+        family = self.families[family_name]
+        person = self.people[name]
+        child_ref = ChildRef()
+        child_ref.set_reference_handle(person.handle)
+        family.add_child_ref(child_ref)
+        person.add_parent_family_handle(family.handle)
+        self.db.commit_family(family, self.trans)
+        self.db.commit_person(person, self.trans)
+        return [person.handle], [family.handle]
+
+    def remove_child(self, family_name, name):
+        family = self.families[family_name]
+        person = self.people[name]
+        family.remove_child_handle(person.handle)
+        person.remove_parent_family_handle(family.handle)
+        self.db.commit_family(family, self.trans)
+        self.db.commit_person(person, self.trans)
+        return [person.handle], [family.handle]
+
+    def prepared(self, rule_class, name):
+        rule = rule_class([self.people[name].gramps_id, '1'])
+        rule.requestprepare(self.db)
+        return rule
+
+    def check_update(self, rule_class, name, change, *args):
+        """
+        Change the tree, and check that the updated rule matches the same
+        people as a rule prepared after the change.
+        """
+        rule = self.prepared(rule_class, name)
+        with DbTxn("Test", self.db) as self.trans:
+            person_handles, family_handles = change(*args)
+        changed = rule.update(self.db, 'Person', person_handles)
+        changed = rule.update(self.db, 'Family', family_handles) or changed
+        fresh = self.prepared(rule_class, name)
+        self.assertEqual(rule.map, fresh.map)
+        return changed
+
+    def test_ancestors_add_parent(self):
+        self.assertTrue(self.check_update(
+            IsAncestorOf, 'child', self.add_child, 'strangers', 'mother'))
+
+    def test_ancestors_remove_parent(self):
+        self.assertTrue(self.check_update(
+            IsAncestorOf, 'child', self.remove_child, 'grandparents',
+            'father'))
+
+    def test_ancestors_unrelated(self):
+        self.assertFalse(self.check_update(
+            IsAncestorOf, 'child', self.remove_child, 'strangers',
+            'stranger_child'))
+
+    def test_descendants_add_child(self):
+        self.assertTrue(self.check_update(
+            IsDescendantOf, 'grandfather', self.add_child, 'parents',
+            'stranger_child'))
+
+    def test_descendants_remove_child(self):
+        self.assertTrue(self.check_update(
+            IsDescendantOf, 'grandfather', self.remove_child, 'grandparents',
+            'father'))
+
+    def test_descendants_unrelated(self):
+        self.assertFalse(self.check_update(
+            IsDescendantOf, 'grandfather', self.remove_child, 'strangers',
+            'stranger_child'))
+
+    def test_update_default(self):
+        """
+        A rule that only parses its values in prepare keeps its state.
+        """
+        rule = HasBirth(['1900', '', ''])
+        rule.requestprepare(self.db)
+        self.assertFalse(rule.update(self.db, 'Person',
+                                     [self.people['child'].handle]))
+
+    def custom_filter(self, name, rule):
+        """
+        Replace the custom filters by a single person filter with rule.
+        """
+        custom_filters = FilterList('')
+        filt = GenericFilter()
+        filt.set_name(name)
+        filt.add_rule(rule)
+        custom_filters.add('Person', filt)
+        self.addCleanup(setattr, filters, 'CustomFilters',
+                        filters.CustomFilters)
+        filters.CustomFilters = custom_filters
+        return filt
+
+    def handles(self, *names):
+        return set(self.people[name].handle for name in names)
+
+    def test_keep_custom_filter(self):
+        """
+        A filter kept prepared does not keep the rules of the custom filters
+        it matches prepared, other users of the custom filter prepare them.
+        """
+        custom = self.custom_filter('Ancestors', IsAncestorOf(
+            [self.people['child'].gramps_id, '1']))
+        kept = GenericFilter()
+        kept.add_rule(MatchesFilter(['Ancestors']))
+        kept.keep_prepared(self.db)
+        self.assertEqual(custom.flist[0].nrprepare, 0)
+        all_handles = self.db.get_person_handles()
+        ancestors = self.handles('child', 'father', 'mother', 'grandfather',
+                                 'grandmother')
+        self.assertEqual(set(kept.apply(self.db, all_handles)), ancestors)
+
+        with DbTxn("Test", self.db) as self.trans:
+            person_handles, family_handles = self.remove_child(
+                'grandparents', 'father')
+        parents = self.handles('child', 'father', 'mother')
+        self.assertEqual(set(custom.apply(self.db, all_handles)), parents)
+        self.assertEqual(custom.flist[0].nrprepare, 0)
+
+        changed = kept.update_prepared('Person', person_handles)
+        changed = kept.update_prepared('Family', family_handles) or changed
+        self.assertTrue(changed)
+        self.assertEqual(set(kept.apply(self.db, all_handles)), parents)
+        self.assertEqual(custom.flist[0].nrprepare, 0)
+
+        kept.release_prepared()
+        self.assertIsNone(kept.flist[0].private_filter)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,13 @@
 Provide merge capabilities for citations.
 """
 
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+import heapq
+
 #-------------------------------------------------------------------------
 #
 # Gramps modules
@@ -109,3 +116,118 @@ class MergeCitationQuery(object):
                     raise MergeError("Encounter an object of type %s that has "
                             "a citation reference." % class_name)
             self.database.remove_citation(old_handle, trans)
+
+#-------------------------------------------------------------------------
+#
+# MergeCitationsQuery
+#
+#-------------------------------------------------------------------------
+# methods of the database to get and commit the objects that can hold a
+# citation reference
+_CITATION_REFERRERS = {
+    Person.__name__      : ('get_person_from_handle', 'commit_person'),
+    Family.__name__      : ('get_family_from_handle', 'commit_family'),
+    Event.__name__       : ('get_event_from_handle', 'commit_event'),
+    Place.__name__       : ('get_place_from_handle', 'commit_place'),
+    MediaObject.__name__ : ('get_object_from_handle', 'commit_media_object'),
+    Repository.__name__  : ('get_repository_from_handle',
+                            'commit_repository'),
+    Citation.__name__    : ('get_citation_from_handle', 'commit_citation'),
+    Source.__name__      : ('get_source_from_handle', 'commit_source'),
+    }
+
+class MergeCitationsQuery(object):
+    """
+    Create database query to merge many citations at once.
+
+    Every object referring to one of the merged citations is read and
+    committed once, however many of its references change.
+    """
+    def __init__(self, dbstate, merges, batch=False):
+        """
+        :param merges: list of (old_handle, new_handle) pairs, or a
+            dictionary. The citation old_handle is merged into the citation
+            new_handle, in the order of the list. new_handle may itself be
+            merged into another citation.
+        :param batch: if True, the merge is done in a batch transaction
+        """
+        self.database = dbstate.db
+        if isinstance(merges, dict):
+            merges = list(merges.items())
+        self.merges = merges
+        self.batch = batch
+
+    def execute(self):
+        """
+        Merges the citations.
+        """
+        database = self.database
+        targets = dict(self.merges)
+        order = dict((old_handle, index) for (index, (old_handle, new_handle))
+                     in enumerate(self.merges))
+        for old_handle in targets:
+            new_handle = targets[old_handle]
+            seen = set([old_handle])
+            while new_handle in targets:
+                if new_handle in seen:
+                    raise MergeError("A citation is merged into itself.")
+                seen.add(new_handle)
+                new_handle = targets[new_handle]
+
+        # the references are looked up before the transaction starts, as
+        # the back references are not available in a batch transaction
+        referrers = []
+        replaced = {}
+        for old_handle, new_handle in self.merges:
+            for (class_name, handle) in database.find_backlink_handles(
+                    old_handle):
+                if class_name not in _CITATION_REFERRERS:
+                    raise MergeError("Encounter an object of type %s that "
+                            "has a citation reference." % class_name)
+                if class_name == Citation.__name__ and handle in targets:
+                    continue
+                key = (class_name, handle)
+                if key not in replaced:
+                    referrers.append(key)
+                    replaced[key] = []
+                replaced[key].append(old_handle)
+
+        with DbTxn(_("Merge Citation"), database, batch=self.batch) as trans:
+            objects = {}
+            def get_object(class_name, handle):
+                key = (class_name, handle)
+                if key not in objects:
+                    get_method = _CITATION_REFERRERS[class_name][0]
+                    objects[key] = getattr(database, get_method)(handle)
+                return objects[key]
+
+            phoenixes = []
+            for old_handle, new_handle in self.merges:
+                phoenix = get_object(Citation.__name__, new_handle)
+                phoenix.merge(get_object(Citation.__name__, old_handle))
+                if new_handle not in targets and new_handle not in phoenixes:
+                    phoenixes.append(new_handle)
+            for new_handle in phoenixes:
+                if (Citation.__name__, new_handle) not in replaced:
+                    database.commit_citation(
+                        get_object(Citation.__name__, new_handle), trans)
+
+            for class_name, handle in referrers:
+                obj = get_object(class_name, handle)
+                # replace in the order of the merges, following a citation
+                # that is merged again later
+                pending = [(order[old_handle], old_handle)
+                           for old_handle in replaced[(class_name, handle)]]
+                heapq.heapify(pending)
+                while pending:
+                    index, old_handle = heapq.heappop(pending)
+                    new_handle = targets[old_handle]
+                    obj.replace_citation_references(old_handle, new_handle)
+                    if new_handle in order and order[new_handle] > index:
+                        heapq.heappush(pending,
+                                       (order[new_handle], new_handle))
+                commit_method = _CITATION_REFERRERS[class_name][1]
+                getattr(database, commit_method)(obj, trans)
+
+            for old_handle in targets:
+                database.remove_citation(old_handle, trans)
@@ -34,3 +34,5 @@ from ._bibliography import Bibliography, Citation
 from ._options import MenuReportOptions, ReportOptions, DocOptions
 
 from ._book import BookList, Book, BookItem, append_styles
+
+from ._bookwriter import RecordDoc, write_book
@@ -0,0 +1,289 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Write the items of a book into one document, optionally in worker processes.
+
+In a worker the report of an item writes into a :class:`RecordDoc`, which
+keeps the document calls as a fragment. The fragments are replayed in book
+order into the real document, so the result is the same as when the items
+are written one after the other.
+
+The database is copied once, and each worker opens a private copy of that
+snapshot, read-only, with the table files linked. Berkeley DB environments
+of Gramps are private to the process that opens them, so the open database
+can not be shared. If the workers can not open the database, the items are
+written in the calling process.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+import shutil
+import traceback
+import multiprocessing
+from multiprocessing.util import Finalize
+
+#------------------------------------------------------------------------
+#
+# Set up logging
+#
+#------------------------------------------------------------------------
+import logging
+log = logging.getLogger(".Book")
+
+#-------------------------------------------------------------------------
+#
+# gramps modules
+#
+#-------------------------------------------------------------------------
+from ...config import config
+from ...const import PLUGINS_DIR, USER_PLUGINS
+from ...user import User
+from ...utils.db import (can_copy_database, copy_database,
+                         open_database_copy, close_database_copy)
+from ...utils import trace
+from ..docgen import BaseDoc, TextDoc, DrawDoc
+from .. import BasePluginManager
+from ._book import BookItem
+
+#------------------------------------------------------------------------
+#
+# RecordDoc
+#
+#------------------------------------------------------------------------
+# Document calls that only return information, these are not recorded
+_QUERIES = ('get_usable_width', 'get_usable_height', 'string_width',
+            'string_multiline_width')
+
+class RecordDoc(BaseDoc, TextDoc, DrawDoc):
+    """
+    A document that records the text and drawing calls made on it, so that
+    they can be replayed into another document with :meth:`replay`.
+    """
+
+    def __init__(self, styles, paper_style):
+        BaseDoc.__init__(self, styles, paper_style)
+        self.calls = []
+
+    def open(self, filename):
+        pass
+
+    def close(self):
+        pass
+
+    def replay(self, doc):
+        """
+        Make the recorded calls on doc.
+        """
+        replay_calls(doc, self.calls)
+
+def _recorder(name):
+    """
+    Return a RecordDoc method that records calls to name.
+    """
+    def record(self, *args, **kwargs):
+        self.calls.append((name, args, kwargs))
+    record.__name__ = name
+    return record
+
+for _name in list(vars(TextDoc)) + list(vars(DrawDoc)):
+    if (not _name.startswith('_') and _name not in _QUERIES and
+            callable(getattr(TextDoc, _name, None) or
+                     getattr(DrawDoc, _name, None))):
+        setattr(RecordDoc, _name, _recorder(_name))
+del _name
+
+def replay_calls(doc, calls):
+    """
+    Make the calls recorded by a :class:`RecordDoc` on doc.
+    """
+    for name, args, kwargs in calls:
+        getattr(doc, name)(*args, **kwargs)
+
+#------------------------------------------------------------------------
+#
+# Worker processes
+#
+#------------------------------------------------------------------------
+_WORKER = {}
+
+def _init_worker(db_class, path, name_formats, styles, paper_style):
+    """
+    Initialize a worker process: open a private copy of the database
+    snapshot path.
+
+    An error is kept and raised by the tasks, instead of being raised here,
+    which would make the pool start new workers forever.
+    """
+    try:
+        pmgr = BasePluginManager.get_instance()
+        if not pmgr.get_reg_bookitems():
+            # not forked from the main process
+            pmgr.reg_plugins(PLUGINS_DIR)
+            pmgr.reg_plugins(USER_PLUGINS, load_on_reg=True)
+
+        database, tmpdir = open_database_copy(db_class, path,
+                                              "gramps-book-", link=True)
+    except:
+        _WORKER['error'] = traceback.format_exc()
+        return
+    database.name_formats = name_formats
+
+    _WORKER['db'] = database
+    _WORKER['styles'] = styles
+    _WORKER['paper'] = paper_style
+    Finalize(None, close_database_copy, args=(database, tmpdir),
+             exitpriority=10)
+
+def _render_item(args):
+    """
+    Write a book item into a RecordDoc, run in a worker process.
+
+    :returns: the recorded calls, or None if the item could not be written
+    :raises WorkerError: if the worker could not be initialized
+    """
+    if 'error' in _WORKER:
+        raise WorkerError(_WORKER['error'])
+    name, style_name, options = args
+    database = _WORKER['db']
+    try:
+        item = BookItem(database, name)
+        item.set_style_name(style_name)
+        option_class = item.option_class
+        option_class.options_dict.update(options)
+        menu = getattr(option_class, 'menu', None)
+        if menu is not None:
+            for optname in options:
+                menu_option = menu.get_option_by_name(optname)
+                if menu_option:
+                    menu_option.set_value(options[optname])
+        doc = RecordDoc(_WORKER['styles'], _WORKER['paper'])
+        option_class.set_document(doc)
+        report = item.get_write_item()(database, option_class, User())
+        report.begin_report()
+        report.write_report()
+    except:
+        log.warning("Failed to write book item %s in a worker process:\n%s",
+                    name, traceback.format_exc())
+        return None
+    return doc.calls
+
+class WorkerError(Exception):
+    """
+    Error initializing a worker process, with the traceback of the worker
+    as message.
+    """
+    pass
+
+def _item_options(item):
+    """
+    Return the option values of a book item, as a dictionary.
+    """
+    option_class = item.option_class
+    options = dict(option_class.options_dict)
+    menu = getattr(option_class, 'menu', None)
+    if menu is not None:
+        for optname in menu.get_all_option_names():
+            options[optname] = menu.get_option_by_name(optname).get_value()
+    return options
+
+#------------------------------------------------------------------------
+#
+# Functions
+#
+#------------------------------------------------------------------------
+def write_book(database, book_items, doc, workers=None):
+    """
+    Write the reports of a book into doc, with a page break between the
+    items. doc must be opened and initialized, closing it is left to the
+    caller.
+
+    :param book_items: list of (:class:`.BookItem`, report) pairs in book
+        order. report is the report created for the item, with doc as its
+        document, or None if the report could not be created.
+    :param workers: number of worker processes for writing the items,
+        default the 'behavior.book-workers' preference. With less than two
+        workers, or a database that can not be copied, the items are
+        written one by one in this process.
+    """
+    if workers is None:
+        workers = config.get('behavior.book-workers')
+    jobs = [(item.get_name(), item.get_style_name(), _item_options(item))
+            for (item, report) in book_items if report is not None]
+
+    pool = None
+    fragments = None
+    snapshot_dir = None
+    if workers > 1 and len(jobs) > 1 and can_copy_database(database):
+        database.sync()
+        try:
+            snapshot, snapshot_dir = copy_database(database.get_save_path(),
+                                                   "gramps-book-")
+        except EnvironmentError as msg:
+            log.warning("Could not copy the database for the book workers, "
+                        "writing the items in this process: %s", msg)
+        else:
+            pool = multiprocessing.Pool(
+                min(workers, len(jobs)), _init_worker,
+                (database.__class__, snapshot, database.name_formats,
+                 doc.get_style_sheet(), doc.paper))
+            fragments = pool.imap(_render_item, jobs)
+
+    try:
+        newpage = False
+        for item, report in book_items:
+            if newpage:
+                doc.page_break()
+            newpage = True
+            if report is None:
+                continue
+            with trace.span('BookItem', 'book',
+                            args={'item' : item.get_name()}):
+                calls = None
+                if fragments is not None:
+                    try:
+                        calls = next(fragments)
+                    except WorkerError as msg:
+                        log.warning("The book workers failed, writing the "
+                                    "items in this process:\n%s", msg)
+                        pool.terminate()
+                        pool.join()
+                        pool = fragments = None
+                if calls is not None:
+                    replay_calls(doc, calls)
+                else:
+                    report.begin_report()
+                    with trace.span('Report.write_report', 'report',
+                                    args={'report' : item.get_name()}):
+                        report.write_report()
+    except:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        raise
+    else:
+        if pool is not None:
+            # let the workers exit normally, so that they remove their copy
+            pool.close()
+            pool.join()
+    finally:
+        if snapshot_dir is not None:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
@@ -26,6 +26,9 @@ Utilities for getting information from the database.
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
 import logging
 LOG = logging.getLogger(".gui.utils.db")
 
@@ -40,6 +43,7 @@ from ..display.name import displayer as name_displayer
 from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 from ..constfunc import cuni
+from ..db.dbconst import DBMODE_R
 
 #-------------------------------------------------------------------------
 #
@@ -659,3 +663,194 @@ def get_note_referents(note_handle, db):
                   'Source', 'Citation', 'MediaObject', 'Repository')
     
     return (get_referents(note_handle, db, _primaries))
+
+#-------------------------------------------------------------------------
+#
+# People connected through families
+#
+#-------------------------------------------------------------------------
+class FamilyComponents(object):
+    """
+    The groups of people connected to each other through families, as
+    parents, spouses, children or siblings, kept as a union-find structure.
+
+    All members of a family are in the same group. Links of people to
+    families that do not list them are not followed, these are repaired by
+    the Check and Repair tool.
+    """
+
+    def __init__(self, db, callback=None):
+        """
+        Build the groups in one pass over the families of db.
+
+        :param callback: called once for every family
+        """
+        self._parent = dict((handle, handle)
+                            for handle in db.iter_person_handles())
+        self._size = dict.fromkeys(self._parent, 1)
+        self._members = None
+        for family in db.iter_families():
+            self.add_family(family)
+            if callback:
+                callback()
+
+    def add_family(self, family):
+        """
+        Join the groups of the members of family, for instance after it was
+        committed. Members that are not in the database are left out.
+        Removing a link between a person and a family needs a new instance.
+        """
+        handles = [family.get_father_handle(), family.get_mother_handle()]
+        handles.extend(ref.ref for ref in family.get_child_ref_list())
+        handles = [handle for handle in handles if handle in self._parent]
+        for handle in handles[1:]:
+            self._union(handles[0], handle)
+
+    def add_person(self, handle):
+        """
+        Add a person without family links, for instance a new person.
+        """
+        if handle not in self._parent:
+            self._parent[handle] = handle
+            self._size[handle] = 1
+            self._members = None
+
+    def _find(self, handle):
+        """
+        Return the handle representing the group of handle.
+        """
+        parent = self._parent
+        while parent[handle] != handle:
+            # path halving
+            parent[handle] = parent[parent[handle]]
+            handle = parent[handle]
+        return handle
+
+    def _union(self, handle1, handle2):
+        """
+        Join the groups of handle1 and handle2.
+        """
+        root1 = self._find(handle1)
+        root2 = self._find(handle2)
+        if root1 == root2:
+            return
+        if self._size[root1] < self._size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size.pop(root2)
+        self._members = None
+
+    def is_connected(self, handle1, handle2):
+        """
+        Return True if the people handle1 and handle2 are in the same group.
+        """
+        return self._find(handle1) == self._find(handle2)
+
+    def get_size(self, handle):
+        """
+        Return the number of people in the group of the person handle.
+        """
+        return self._size[self._find(handle)]
+
+    def get_connected(self, handle):
+        """
+        Return the set of handles of the people in the group of the person
+        handle, including handle.
+        """
+        if self._members is None:
+            self._members = {}
+            for member in self._parent:
+                self._members.setdefault(self._find(member),
+                                         set()).add(member)
+        return set(self._members[self._find(handle)])
+
+    def get_unconnected(self, handle):
+        """
+        Return the set of handles of the people not in the group of the
+        person handle.
+        """
+        root = self._find(handle)
+        return set(member for member in self._parent
+                   if self._find(member) != root)
+
+#-------------------------------------------------------------------------
+#
+# Private copies of a database, for worker processes
+#
+#-------------------------------------------------------------------------
+def can_copy_database(database):
+    """
+    Return True if a private copy of the database can be opened with
+    open_database_copy. The database must be synced before it is copied.
+    """
+    if not (hasattr(database, 'load') and hasattr(database, 'sync')):
+        return False
+    path = database.get_save_path()
+    return bool(path) and os.path.isdir(path)
+
+def copy_database(path, prefix="gramps-"):
+    """
+    Copy the database directory path to a new temporary directory, as a
+    snapshot to open copies of with open_database_copy.
+
+    :returns: (copy, tmpdir), the path of the copy and the temporary
+        directory to remove when done
+    """
+    tmpdir = tempfile.mkdtemp(prefix=prefix)
+    copy = os.path.join(tmpdir, "tree")
+    try:
+        shutil.copytree(path, copy, ignore=shutil.ignore_patterns('*.gbkp*'))
+    except:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise
+    return copy, tmpdir
+
+def open_database_copy(db_class, path, prefix="gramps-", link=False):
+    """
+    Copy the database directory path to a temporary directory and open the
+    copy read-only with a new instance of db_class.
+
+    Berkeley DB environments of Gramps are private to the process that opens
+    them, so another process can not share the open database.
+
+    :param link: if True, path is a snapshot made with copy_database, and
+        its table files, which are only read, are linked instead of copied.
+        The environment and log files are always copied.
+    :returns: (database, tmpdir), pass them to close_database_copy when done
+    """
+    tmpdir = tempfile.mkdtemp(prefix=prefix)
+    copy = os.path.join(tmpdir, "tree")
+    try:
+        if link:
+            os.mkdir(copy)
+            for name in os.listdir(path):
+                src = os.path.join(path, name)
+                dst = os.path.join(copy, name)
+                if os.path.isdir(src):
+                    shutil.copytree(src, dst)
+                    continue
+                if name.endswith('.db'):
+                    try:
+                        os.link(src, dst)
+                        continue
+                    except (OSError, AttributeError):
+                        pass
+                shutil.copy2(src, dst)
+        else:
+            shutil.copytree(path, copy,
+                            ignore=shutil.ignore_patterns('*.gbkp*'))
+        database = db_class()
+        database.load(copy, None, DBMODE_R)
+    except:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        raise
+    return database, tmpdir
+
+def close_database_copy(database, tmpdir):
+    """
+    Close a database opened with open_database_copy and remove its copy.
+    """
+    try:
+        database.close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,366 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+A table of facts about all people in a database, like birth year, age at
+death and number of children, for statistics-style reports and gramplets.
+
+The facts are stored per column, indexed by person index, so that a report
+can aggregate over them instead of looking up people, families and events
+one by one. The table is built in one pass over the events, people and
+families, and is kept per database until one of these changes.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from array import array
+import weakref
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..lib import ChildRefType
+from ..lib.date import gregorian
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# signals after which the table of a database is out of date
+_SIGNALS = ['%s-%s' % (obj, action)
+            for obj in ('person', 'family', 'event')
+            for action in ('add', 'update', 'delete', 'rebuild')]
+
+# database -> [PersonFacts or None, number of changes]
+_TABLES = weakref.WeakKeyDictionary()
+
+#-------------------------------------------------------------------------
+#
+# PersonFacts
+#
+#-------------------------------------------------------------------------
+class PersonFacts(object):
+    """
+    Facts about all people and families of a database, one column per
+    fact. Use :func:`get_person_facts` to obtain the table of a database.
+
+    Person columns, indexed by person index:
+
+    handles             handle of the person, see also index
+    gender              Person.MALE, Person.FEMALE or Person.UNKNOWN
+    birth, death        Date of the birth and death event, or None
+    death_fallback      Date of the death event, or else of the first primary
+                        death fallback event, or None
+    birth_year          gregorian year of birth, 0 if not valid
+    death_year          gregorian year of death, 0 if not valid
+    death_age           death_year - birth_year, -1 if unknown
+    parent_families     list of handles of the families the person is a
+                        child in
+    families            list of handles of the families the person is a
+                        parent in
+    nr_children         number of children in these families
+    first_child_age     age in years when the first child was born, of the
+                        children with birth relation, -1 if unknown
+    last_child_age      idem for the last child
+    nr_media            number of media references of the person
+    incomplete_names    number of names of the person without given name or
+                        with an empty surname
+    surnames            tuple of the non empty surnames of all names of the
+                        person
+
+    Family columns, indexed by family index:
+
+    family_handles      handle of the family, see also family_index
+    father, mother      person index of the parents, -1 if not set
+    children            list of (person index, father relation, mother
+                        relation) for the children
+    marriage, divorce   Date of the (last) marriage and divorce event with
+                        family or primary role, or None
+    """
+    def __init__(self, db=None):
+        self.handles = []
+        self.index = {}
+        self.gender = array('b')
+        self.birth = []
+        self.death = []
+        self.death_fallback = []
+        self.birth_year = array('i')
+        self.death_year = array('i')
+        self.death_age = array('i')
+        self.parent_families = []
+        self.families = []
+        self.nr_children = array('i')
+        self.first_child_age = array('i')
+        self.last_child_age = array('i')
+        self.nr_media = array('i')
+        self.incomplete_names = array('i')
+        self.surnames = []
+
+        self.family_handles = []
+        self.family_index = {}
+        self.father = array('i')
+        self.mother = array('i')
+        self.children = []
+        self.marriage = []
+        self.divorce = []
+
+        if db is not None:
+            for dummy in self.build(db):
+                pass
+
+    def __len__(self):
+        return len(self.handles)
+
+    def build(self, db, step=0):
+        """
+        Generator filling all columns of an empty table in one pass over
+        events, people and families. If step is given, it yields after every
+        step objects, so that it can be run in steps, like the main method
+        of a gramplet.
+        """
+        count = 0
+        events = {}
+        for event in db.iter_events():
+            events[event.handle] = (event.get_date_object(), event.get_type())
+            count += 1
+            if step and count % step == 0:
+                yield
+
+        for person in db.iter_people():
+            count += 1
+            if step and count % step == 0:
+                yield
+            self.index[person.handle] = len(self.handles)
+            self.handles.append(person.handle)
+            self.gender.append(person.gender)
+            birth = _ref_date(events, person.get_birth_ref())
+            death = _ref_date(events, person.get_death_ref())
+            fallback = death
+            if person.get_death_ref() is None:
+                for event_ref in person.get_primary_event_ref_list():
+                    event = events.get(event_ref.ref)
+                    if event and event[1].is_death_fallback():
+                        fallback = event[0]
+                        break
+            self.birth.append(birth)
+            self.death.append(death)
+            self.death_fallback.append(fallback)
+            birth_year = _year(birth)
+            death_year = _year(death)
+            self.birth_year.append(birth_year)
+            self.death_year.append(death_year)
+            if birth_year and death_year:
+                self.death_age.append(death_year - birth_year)
+            else:
+                self.death_age.append(-1)
+            self.parent_families.append(person.get_parent_family_handle_list())
+            self.families.append(person.get_family_handle_list())
+            self.nr_media.append(len(person.get_media_list()))
+            names = [person.get_primary_name()] + person.get_alternate_names()
+            self.incomplete_names.append(sum(_missing_names(name)
+                                             for name in names))
+            self.surnames.append(tuple(surname for surname in
+                                       (name.get_surname().strip()
+                                        for name in names)
+                                       if surname))
+
+        nrpeople = len(self.handles)
+        self.nr_children = array('i', [0] * nrpeople)
+        self.first_child_age = array('i', [-1] * nrpeople)
+        self.last_child_age = array('i', [-1] * nrpeople)
+        birth_year = self.birth_year
+        for family in db.iter_families():
+            count += 1
+            if step and count % step == 0:
+                yield
+            self.family_index[family.handle] = len(self.family_handles)
+            self.family_handles.append(family.handle)
+            father = self.index.get(family.get_father_handle(), -1)
+            mother = self.index.get(family.get_mother_handle(), -1)
+            self.father.append(father)
+            self.mother.append(mother)
+            children = [(self.index[child_ref.ref],
+                         child_ref.get_father_relation(),
+                         child_ref.get_mother_relation())
+                        for child_ref in family.get_child_ref_list()
+                        if child_ref.ref in self.index]
+            self.children.append(children)
+            marriage = divorce = None
+            for event_ref in family.get_event_ref_list():
+                event = events.get(event_ref.ref)
+                if event is None:
+                    continue
+                role = event_ref.get_role()
+                if not (role.is_family() or role.is_primary()):
+                    continue
+                if event[1].is_marriage():
+                    marriage = event[0]
+                elif event[1].is_divorce():
+                    divorce = event[0]
+            self.marriage.append(marriage)
+            self.divorce.append(divorce)
+
+            for parent, relpos in ((father, 1), (mother, 2)):
+                if parent < 0:
+                    continue
+                self.nr_children[parent] += len(children)
+                if not birth_year[parent]:
+                    continue
+                for child in children:
+                    if (child[relpos] != ChildRefType.BIRTH or
+                            not birth_year[child[0]]):
+                        continue
+                    age = birth_year[child[0]] - birth_year[parent]
+                    first = self.first_child_age[parent]
+                    if first < 0 or age < first:
+                        self.first_child_age[parent] = age
+                    if age > self.last_child_age[parent]:
+                        self.last_child_age[parent] = age
+
+    def birth_children(self, index):
+        """
+        Return the person indices of the children with birth relation to
+        the person with index.
+        """
+        children = []
+        for family_handle in self.families[index]:
+            family = self.family_index.get(family_handle)
+            if family is None:
+                continue
+            if self.father[family] == index:
+                relpos = 1
+            elif self.mother[family] == index:
+                relpos = 2
+            else:
+                continue
+            children.extend(child[0] for child in self.children[family]
+                            if child[relpos] == ChildRefType.BIRTH)
+        return children
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_person_facts(db):
+    """
+    Return the :class:`PersonFacts` of the database. The table is kept until
+    a person, family or event of the database changes. Databases that do not
+    emit signals of their own, like proxies, which pass the signals of the
+    database below them, get a new table on every call.
+    """
+    holder = _get_holder(db)
+    if holder is None:
+        return PersonFacts(db)
+    if holder[0] is None:
+        holder[0] = PersonFacts(db)
+    return holder[0]
+
+def iter_person_facts(db, step=300):
+    """
+    Generator building the :class:`PersonFacts` of the database in steps of
+    step objects, like :func:`get_person_facts`. It yields None after each
+    step, and the table last.
+    """
+    holder = _get_holder(db)
+    if holder is not None and holder[0] is not None:
+        yield holder[0]
+        return
+    if holder is not None:
+        version = holder[1]
+    facts = PersonFacts()
+    for dummy in facts.build(db, step):
+        yield None
+    # keep the table, unless the database changed while it was built
+    if holder is not None and holder[1] == version:
+        holder[0] = facts
+    yield facts
+
+def _get_holder(db):
+    """
+    Return the [table, version] list holding the kept table of db, the
+    table is None until it is built. Return None if the table of db can
+    not be kept.
+    """
+    try:
+        holder = _TABLES.get(db)
+    except TypeError:
+        # not weak referencable
+        return None
+    if holder is None:
+        if not _emits_signals(db):
+            return None
+        holder = [None, 0]
+        def invalidate(*args):
+            holder[0] = None
+            holder[1] += 1
+        # the callbacks are kept by db, they go together with its table
+        for signal in _SIGNALS:
+            db.connect(signal, invalidate)
+        _TABLES[db] = holder
+    return holder
+
+def _emits_signals(db):
+    """
+    Return True if the signals connected to with db.connect are emitted by
+    db itself. A proxy passes connect to the database below it, whose
+    callbacks would outlive the proxy and keep its table.
+    """
+    from ..proxy.proxybase import ProxyDbBase
+    if isinstance(db, ProxyDbBase):
+        return False
+    connect = getattr(db, 'connect', None)
+    return getattr(connect, '__self__', None) is db
+
+def _ref_date(events, event_ref):
+    """
+    Return the date of the event of event_ref, or None.
+    """
+    if event_ref is None:
+        return None
+    event = events.get(event_ref.ref)
+    if event is None:
+        return None
+    return event[0]
+
+def _missing_names(name):
+    """
+    Return the number of missing parts of the name: 1 if it has no given
+    name, else the number of empty surnames, or 1 if it has no surnames.
+    """
+    if name.get_first_name().strip() == "":
+        return 1
+    surnames = name.get_surname_list()
+    if not surnames:
+        return 1
+    return sum(1 for surname in surnames
+               if surname.get_surname().strip() == "")
+
+def _year(date):
+    """
+    Return the gregorian year of the date, or 0 if it is not valid.
+    """
+    if date is None or not date.get_year_valid():
+        return 0
+    return gregorian(date).get_year()
@@ -190,9 +190,17 @@ class FormattingHelper(object):
             self._text_cache[person.handle][line_count] = text
         return text
 
-    def clear_cache( self):
+    def clear_cache( self, handle_list=None):
         """clear the cache of kept format strings
+        
+        :param handle_list: if given, only the strings of the people and
+                            families with these handles are cleared
         """
-        self._text_cache = {}
-        self._markup_cache = {}
+        if handle_list is None:
+            self._text_cache = {}
+            self._markup_cache = {}
+            return
+        for handle in handle_list:
+            self._text_cache.pop(handle, None)
+            self._markup_cache.pop(handle, None)
 
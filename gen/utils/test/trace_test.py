@@ -0,0 +1,223 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the timing instrumentation.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from gramps.gen.utils import trace
+from gramps.gen.filters import GenericFilter
+from gramps.gen.filters.rules import Rule
+
+class Clock(object):
+    """
+    A clock that only advances when told to.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class Cursor(object):
+    def __init__(self, items):
+        self.items = items
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def __iter__(self):
+        return iter(self.items)
+
+class FakeDb(object):
+    def __init__(self):
+        self.people = {'h1' : 'person 1', 'h2' : 'person 2'}
+
+    def get_person_from_handle(self, handle):
+        return self.people.get(handle)
+
+    def get_person_cursor(self):
+        return Cursor(sorted(self.people.items()))
+
+    def iter_person_handles(self):
+        return iter(sorted(self.people))
+
+    def get_dbname(self):
+        return 'fake'
+
+class FailingRule(Rule):
+    name = 'Failing rule'
+
+    def apply(self, db, person):
+        raise ValueError(person)
+
+class TraceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.clock = Clock()
+        self.saved_clock = trace._CLOCK
+        trace._CLOCK = self.clock
+
+    def tearDown(self):
+        trace.disable()
+        trace._CLOCK = self.saved_clock
+        shutil.rmtree(self.tmpdir)
+
+    def enable(self, fname):
+        fname = os.path.join(self.tmpdir, fname)
+        trace.enable(fname)
+        return fname
+
+    def counters(self):
+        """
+        Return the counters of the tracer by name, as (calls, seconds).
+        """
+        result = {}
+        for (name, category, site), (calls, seconds) in \
+                trace._TRACER.counters.items():
+            old_calls, old_seconds = result.get(name, (0, 0.0))
+            result[name] = (old_calls + calls, old_seconds + seconds)
+        return result
+
+    def nested_spans(self):
+        with trace.span('outer', 'test'):
+            self.clock.now += 1
+            with trace.span('inner', 'test'):
+                self.clock.now += 2
+            self.clock.now += 3
+            with trace.span('inner', 'test'):
+                self.clock.now += 4
+
+    def test_disabled(self):
+        self.assertFalse(trace.is_enabled())
+        self.assertTrue(trace.span('test') is trace._NULL_SPAN)
+        @trace.traced('test')
+        def func(value):
+            return value * 2
+        self.assertEqual(func(21), 42)
+
+    def test_self_time(self):
+        self.enable('trace.json')
+        self.nested_spans()
+        self.assertEqual(trace._TRACER.stacks,
+                         {'outer' : 4.0, 'outer;inner' : 6.0})
+        self.assertEqual(self.counters(),
+                         {'outer' : (1, 10.0), 'inner' : (2, 6.0)})
+
+    def test_folded(self):
+        fname = self.enable('trace.folded')
+        self.nested_spans()
+        trace.disable()
+        with open(fname) as trace_file:
+            self.assertEqual(trace_file.read(),
+                             "outer 4000000\nouter;inner 6000000\n")
+
+    def test_chrome(self):
+        fname = self.enable('trace.json')
+        self.nested_spans()
+        with trace.span('counted', 'test', event=False):
+            self.clock.now += 1
+        trace.disable()
+        with open(fname) as trace_file:
+            data = json.load(trace_file)
+        events = [(event['name'], event['ts'], event['dur'])
+                  for event in data['traceEvents']]
+        self.assertEqual(sorted(events), [('inner', 1e6, 2e6),
+                                          ('inner', 6e6, 4e6),
+                                          ('outer', 0.0, 10e6)])
+        # a counter per call site
+        counters = sorted((counter['name'], counter['calls'])
+                          for counter in data['counters'])
+        self.assertEqual(counters, [('counted', 1), ('inner', 1),
+                                    ('inner', 1), ('outer', 1)])
+        site = data['counters'][0]['site']
+        self.assertTrue(site.startswith(os.path.join('gramps', 'gen', 'utils',
+                                                     'test', 'trace_test.py')
+                                        + ':'), site)
+
+    def test_traced(self):
+        self.enable('trace.json')
+        @trace.traced('test')
+        def func(value):
+            self.clock.now += 1
+            return value * 2
+        self.assertEqual(func(21), 42)
+        self.assertEqual(self.counters(), {'func' : (1, 1.0)})
+
+    def test_instrument(self):
+        self.enable('trace.json')
+        database = FakeDb()
+        names = trace.instrument(database, ['get_person_from_handle'], 'db')
+        self.assertEqual(names, ['get_person_from_handle'])
+        self.assertTrue('get_person_from_handle' in database.__dict__)
+        # instrumenting again leaves the wrapper alone
+        self.assertEqual(trace.instrument(database,
+                                          ['get_person_from_handle']), [])
+        self.assertEqual(database.get_person_from_handle('h1'), 'person 1')
+        self.assertEqual(self.counters(),
+                         {'FakeDb.get_person_from_handle' : (1, 0.0)})
+        # only counted, no events
+        self.assertEqual(trace._TRACER.events, [])
+        trace.uninstrument(database, names)
+        self.assertFalse('get_person_from_handle' in database.__dict__)
+        self.assertEqual(database.get_person_from_handle('h2'), 'person 2')
+        self.assertEqual(self.counters()['FakeDb.get_person_from_handle'],
+                         (1, 0.0))
+
+    def test_instrument_db(self):
+        self.enable('trace.json')
+        database = FakeDb()
+        trace.instrument_db(database)
+        self.assertEqual(sorted(database.__dict__),
+                         ['get_person_cursor', 'get_person_from_handle',
+                          'iter_person_handles', 'people'])
+        with database.get_person_cursor() as cursor:
+            self.assertEqual([handle for handle, data in cursor],
+                             ['h1', 'h2'])
+        self.assertEqual(list(database.iter_person_handles()), ['h1', 'h2'])
+        counters = self.counters()
+        self.assertEqual(counters['FakeDb.get_person_cursor'][0], 1)
+        # one more call for the end of the items
+        self.assertEqual(counters['FakeDb.get_person_cursor.next'][0], 3)
+        self.assertEqual(counters['FakeDb.iter_person_handles.next'][0], 3)
+
+    def test_filter_error(self):
+        """
+        The rules of a filter are no longer timed after an error.
+        """
+        self.enable('trace.json')
+        rule = FailingRule([])
+        filt = GenericFilter()
+        filt.add_rule(rule)
+        self.assertRaises(ValueError, filt.apply, FakeDb(), ['h1'])
+        self.assertFalse('apply' in rule.__dict__)
+        self.assertEqual(rule.nrprepare, 0)
+        self.assertEqual(self.counters()['FailingRule.apply'][0], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,434 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Timing instrumentation, off unless it is enabled.
+
+Tracing is enabled with the --trace option or the 'behavior.trace-file'
+preference. Spans are then recorded around reports, book items, filters and
+their rules, the phases of Check and Repair and the calls to the database,
+and written to the trace file when Gramps exits.
+
+A trace file ending in ``.folded`` gets the collapsed stacks read by
+flamegraph.pl, in microseconds of self time. Any other file gets the trace
+event format of chrome://tracing, Perfetto and speedscope, with a
+``counters`` list of the number of calls and time of every name per call
+site.
+
+Frequent calls, like the database calls and the apply of a rule, are only
+counted, they do not get a trace event of their own.
+
+While tracing is disabled, :func:`span` returns a context manager that does
+nothing, and the instrumented functions are called directly.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import threading
+from functools import wraps
+
+#------------------------------------------------------------------------
+#
+# Set up logging
+#
+#------------------------------------------------------------------------
+import logging
+LOG = logging.getLogger(".trace")
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+_CLOCK = getattr(time, 'perf_counter', time.time)
+
+# database methods that are timed, and how their result is timed
+_DB_CALLS = re.compile(r'^(get_\w+_from_(handle|gramps_id)|get_raw_\w+_data'
+                       r'|commit_\w+|transaction_commit)$')
+_DB_CURSORS = re.compile(r'^get_\w+_cursor$')
+_DB_ITERATORS = re.compile(r'^(iter_\w+|find_backlink_handles)$')
+
+# the directory of the gramps package, call sites are relative to it
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
+_TRACER = None
+
+#-------------------------------------------------------------------------
+#
+# Tracer
+#
+#-------------------------------------------------------------------------
+class _NullSpan(object):
+    """
+    The span of a disabled tracer.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span(object):
+    """
+    A span of a Tracer, see :func:`span`.
+    """
+    __slots__ = ('tracer', 'name', 'category', 'site', 'event', 'args',
+                 'frame', 'start')
+
+    def __init__(self, tracer, name, category, site, event, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.site = site
+        self.event = event
+        self.args = args
+
+    def __enter__(self):
+        self.frame = self.tracer.push(self.name)
+        self.start = _CLOCK()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = _CLOCK()
+        self.tracer.pop(self, end)
+        return False
+
+class Tracer(object):
+    """
+    The spans and counters recorded while tracing is enabled.
+    """
+    def __init__(self, fname):
+        self.fname = fname
+        self.origin = _CLOCK()
+        self.pid = os.getpid()
+        self.events = []
+        # (name, category, site) -> [calls, seconds]
+        self.counters = {}
+        # names of the stack -> seconds of self time
+        self.stacks = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def push(self, name):
+        """
+        Start a span on the stack of the current thread. The frame is a
+        list of the stack, the name and the time of the spans below.
+        """
+        parent = getattr(self.local, 'frame', None)
+        if parent is None:
+            stack = name
+        else:
+            stack = parent[0] + ';' + name
+        frame = [stack, parent, 0.0]
+        self.local.frame = frame
+        return frame
+
+    def pop(self, span, end):
+        """
+        End span, started with push.
+        """
+        duration = end - span.start
+        frame = span.frame
+        parent = frame[1]
+        self.local.frame = parent
+        if parent is not None:
+            parent[2] += duration
+        key = (span.name, span.category, span.site)
+        with self.lock:
+            counter = self.counters.get(key)
+            if counter is None:
+                self.counters[key] = [1, duration]
+            else:
+                counter[0] += 1
+                counter[1] += duration
+            self.stacks[frame[0]] = (self.stacks.get(frame[0], 0.0) +
+                                     duration - frame[2])
+        if span.event:
+            event = {
+                'name' : span.name,
+                'cat'  : span.category,
+                'ph'   : 'X',
+                'ts'   : (span.start - self.origin) * 1e6,
+                'dur'  : duration * 1e6,
+                'pid'  : self.pid,
+                'tid'  : threading.current_thread().ident,
+                }
+            if span.args:
+                event['args'] = span.args
+            self.events.append(event)
+
+    def span(self, name, category, site, event, args):
+        return _Span(self, name, category, site, event, args)
+
+    def save(self):
+        """
+        Write the trace file.
+        """
+        with self.lock:
+            if self.fname.endswith('.folded'):
+                lines = ["%s %d\n" % (stack, max(0, round(seconds * 1e6)))
+                         for (stack, seconds) in sorted(self.stacks.items())]
+                with open(self.fname, 'w') as trace_file:
+                    trace_file.writelines(lines)
+            else:
+                counters = [{'name'    : name,
+                             'cat'     : category,
+                             'site'    : _relative(site),
+                             'calls'   : calls,
+                             'seconds' : seconds}
+                            for ((name, category, site), (calls, seconds))
+                            in self.counters.items()]
+                counters.sort(key=lambda counter: -counter['seconds'])
+                trace = {
+                    'traceEvents'     : self.events,
+                    'displayTimeUnit' : 'ms',
+                    'counters'        : counters,
+                    }
+                with open(self.fname, 'w') as trace_file:
+                    json.dump(trace, trace_file)
+        LOG.info("Trace written to %s", self.fname)
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def _relative(site):
+    """
+    Return the call site site relative to the gramps package, if it is in
+    it.
+    """
+    if site.startswith(_ROOT + os.sep):
+        return site[len(_ROOT) + 1:]
+    return site
+
+def _call_site(depth):
+    """
+    Return 'file:line' of the caller depth frames up from the caller.
+    """
+    frame = sys._getframe(depth + 1)
+    return "%s:%d" % (frame.f_code.co_filename, frame.f_lineno)
+
+def enable(fname):
+    """
+    Start tracing, the trace is written to fname when Gramps exits.
+    """
+    global _TRACER
+    if _TRACER is not None:
+        return
+    _TRACER = Tracer(os.path.abspath(os.path.expanduser(fname)))
+    atexit.register(disable)
+    LOG.info("Tracing to %s", _TRACER.fname)
+
+def disable():
+    """
+    Stop tracing and write the trace file.
+    """
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is None:
+        return
+    try:
+        tracer.save()
+    except (IOError, OSError) as msg:
+        LOG.warning("Could not write the trace file %s: %s",
+                    tracer.fname, msg)
+
+def is_enabled():
+    """
+    Return True if tracing is enabled.
+    """
+    return _TRACER is not None
+
+def span(name, category='', event=True, args=None):
+    """
+    Return a context manager timing the code in its block as a span.
+
+    :param event: if False, the span is only counted, it does not get an
+        event in the trace.
+    :param args: dictionary shown with the event of the span.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, category, _call_site(1), event, args)
+
+def traced(category='', name=None, event=True):
+    """
+    Decorator timing each call of a function or method as a span, named
+    after the function if no name is given.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, category, _call_site(1), event,
+                             None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def instrument(obj, names, category='', prefix=None, event=False):
+    """
+    Time the calls of the methods names of the object obj, by setting a
+    timing wrapper as attribute of obj. Methods that are already
+    instrumented are left alone.
+
+    :param prefix: the spans are named prefix.method, default the name of
+        the class of obj.
+    :returns: the names of the methods instrumented, for
+        :func:`uninstrument`
+    """
+    if prefix is None:
+        prefix = obj.__class__.__name__
+    done = []
+    for method in names:
+        if method in obj.__dict__:
+            continue
+        setattr(obj, method, _timed(getattr(obj, method),
+                                    "%s.%s" % (prefix, method),
+                                    category, event))
+        done.append(method)
+    return done
+
+def uninstrument(obj, names):
+    """
+    Remove the timing wrappers set by :func:`instrument`.
+    """
+    for method in names:
+        obj.__dict__.pop(method, None)
+
+def instrument_db(database):
+    """
+    Count the calls to the database: getting and committing objects,
+    cursors and iterators. The time of a cursor or iterator is the time
+    spent in getting its items.
+    """
+    if _TRACER is None:
+        return
+    prefix = database.__class__.__name__
+    for method in dir(database):
+        if method.startswith('_') or method in database.__dict__:
+            continue
+        if _DB_CALLS.match(method):
+            timed = _timed
+        elif _DB_CURSORS.match(method):
+            timed = _timed_cursor
+        elif _DB_ITERATORS.match(method):
+            timed = _timed_iterator
+        else:
+            continue
+        func = getattr(database, method)
+        if callable(func):
+            setattr(database, method, timed(func, "%s.%s" % (prefix, method),
+                                            'db', False))
+
+def _timed(func, name, category, event):
+    """
+    Return a wrapper of func, timing each call.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _TRACER
+        if tracer is None:
+            return func(*args, **kwargs)
+        with tracer.span(name, category, _call_site(1), event, None):
+            return func(*args, **kwargs)
+    return wrapper
+
+def _timed_iterator(func, name, category, event):
+    """
+    Return a wrapper of func, returning an iterator, that times getting
+    the items of the iterator.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _TRACER
+        if tracer is None:
+            return func(*args, **kwargs)
+        site = _call_site(1)
+        with tracer.span(name, category, site, event, None):
+            iterator = func(*args, **kwargs)
+        return _iterate(tracer, iterator, name + '.next', category, site)
+    return wrapper
+
+def _timed_cursor(func, name, category, event):
+    """
+    Return a wrapper of func, returning a cursor, that times getting the
+    items of the cursor.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _TRACER
+        if tracer is None:
+            return func(*args, **kwargs)
+        site = _call_site(1)
+        with tracer.span(name, category, site, event, None):
+            cursor = func(*args, **kwargs)
+        return _TimedCursor(tracer, cursor, name + '.next', category, site)
+    return wrapper
+
+def _iterate(tracer, iterator, name, category, site):
+    """
+    Generate the items of iterator, counting the time of each.
+    """
+    iterator = iter(iterator)
+    while True:
+        with tracer.span(name, category, site, False, None):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+class _TimedCursor(object):
+    """
+    A cursor of the database, that counts the time of getting its items.
+    """
+    def __init__(self, tracer, cursor, name, category, site):
+        self.__cursor = cursor
+        self.__timing = (tracer, name, category, site)
+
+    def __getattr__(self, name):
+        return getattr(self.__cursor, name)
+
+    def __enter__(self):
+        self.__cursor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.__cursor.__exit__(exc_type, exc_value, traceback)
+
+    def __iter__(self):
+        tracer, name, category, site = self.__timing
+        return _iterate(tracer, self.__cursor, name, category, site)
@@ -399,6 +399,12 @@ def run():
     argv_copy = sys.argv[:]
     argpars = ArgParser(argv_copy)
 
+    from .gen.config import config
+    trace_file = argpars.trace or config.get('behavior.trace-file')
+    if trace_file:
+        from .gen.utils import trace
+        trace.enable(trace_file)
+
     # Calls to LOG must be after setup_logging() and ArgParser() 
     LOG = logging.getLogger(".locale")
     LOG.debug("Encoding: %s", glocale.encoding)
@@ -71,7 +71,8 @@ from ...user import User
 from .. import make_gui_option
 
 # Import from specific modules in ReportBase
-from gramps.gen.plug.report import BookList, Book, BookItem, append_styles
+from gramps.gen.plug.report import (BookList, Book, BookItem, append_styles,
+                                    write_book)
 from gramps.gen.plug.report import CATEGORY_BOOK, book_categories
 from gramps.gen.plug.report._options import ReportOptions
 from ._reportdialog import ReportDialog
@@ -961,7 +962,7 @@ class BookDialog(DocReportDialog):
             report_class = item.get_write_item()
             obj = write_book_item(self.database, report_class, 
                                   item.option_class, user)
-            self.rptlist.append(obj)
+            self.rptlist.append((item, obj))
             append_styles(selected_style, item)
 
         self.doc.set_style_sheet(selected_style)
@@ -972,14 +973,7 @@ class BookDialog(DocReportDialog):
         and call each item's write_book_item method."""
 
         self.doc.init()
-        newpage = 0
-        for rpt in self.rptlist:
-            if newpage:
-                self.doc.page_break()
-            newpage = 1
-            if rpt:
-                rpt.begin_report()
-                rpt.write_report()
+        write_book(self.database, self.rptlist, self.doc)
         self.doc.close()
         
         if self.open_with_app.get_active():
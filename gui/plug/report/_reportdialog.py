@@ -49,6 +49,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale,  URL_MANUAL_PAGE
 _ = glocale.translation.gettext
 from gramps.gen.config import config
 from gramps.gen.errors import DatabaseError, FilterError, ReportError, WindowActiveError
+from gramps.gen.utils import trace
 from ...utils import open_file_with_default_application
 from .. import add_gui_options, make_gui_option
 from ...user import User
@@ -696,7 +697,9 @@ def report(dbstate, uistate, person, report_class, options_class,
                 MyReport = report_class(dialog.db, dialog.options, user)
                 MyReport.doc.init()
                 MyReport.begin_report()
-                MyReport.write_report()
+                with trace.span('Report.write_report', 'report',
+                                args={'report' : name}):
+                    MyReport.write_report()
                 MyReport.end_report()
 
                 # Web reports do not have a target frame      
@@ -30,6 +30,9 @@ Handles generation and access to thumbnails used in GRAMPS.
 import os
 import sys
 import logging
+import threading
+from multiprocessing.pool import ThreadPool
+from collections import OrderedDict
 try:
     from hashlib import md5
 except ImportError:
@@ -80,6 +83,74 @@ LOG = logging.getLogger(".thumbnail")
 SIZE_NORMAL = 0
 SIZE_LARGE = 1
 
+# memory used by the cache of decoded thumbnails, in bytes
+CACHE_SIZE = 64 * 1024 * 1024
+
+#-------------------------------------------------------------------------
+#
+# PixbufCache
+#
+#-------------------------------------------------------------------------
+class PixbufCache(object):
+    """
+    LRU cache of decoded thumbnails, bounded by the memory of the pixbufs.
+
+    Entries are keyed by source file, rectangle and size and remember the
+    modification time of the source file, so a changed file is decoded
+    again. The cache can be used from worker threads.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, mtime):
+        """
+        Return the cached pixbuf for key, or None if it is not cached or the
+        source file changed since.
+        """
+        with self.__lock:
+            entry = self.__data.pop(key, None)
+            if entry is None:
+                return None
+            if entry[0] != mtime:
+                self.nbytes -= entry[2]
+                return None
+            # reinsert as most recently used
+            self.__data[key] = entry
+            return entry[1]
+
+    def put(self, key, mtime, pixbuf):
+        """
+        Store a pixbuf, removing the least recently used ones if needed.
+        """
+        nbytes = pixbuf.get_rowstride() * pixbuf.get_height()
+        if nbytes > self.max_bytes:
+            return
+        with self.__lock:
+            entry = self.__data.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[2]
+            self.__data[key] = (mtime, pixbuf, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                dummy, entry = self.__data.popitem(last=False)
+                self.nbytes -= entry[2]
+
+    def clear(self):
+        """
+        Remove all pixbufs from the cache.
+        """
+        with self.__lock:
+            self.__data.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self.__data)
+
+_PIXBUF_CACHE = PixbufCache(CACHE_SIZE)
+
 #-------------------------------------------------------------------------
 #
 # __get_gconf_string
@@ -214,7 +285,14 @@ def __create_thumbnail_image(src_file, mtype=None, rectangle=None,
             
             pixbuf = pixbuf.scale_simple(scaled_width, scaled_height, 
                                          GdkPixbuf.InterpType.BILINEAR)
-            pixbuf.savev(filename, "png", "", "")
+            # thumbnails can be created concurrently by worker processes
+            # and threads, so never let a reader see a partly written file
+            tmp_filename = "%s.%d.%d.tmp" % (filename, os.getpid(),
+                                             threading.current_thread().ident)
+            pixbuf.savev(tmp_filename, "png", "", "")
+            if win() and os.path.exists(filename):
+                os.remove(filename)
+            os.rename(tmp_filename, filename)
             return True
         except Exception as err:
             LOG.warn("Error scaling image down: %s", str(err))
@@ -305,7 +383,9 @@ def get_thumbnail_image(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     found, a generic document icon is returned.
 
     The image is not generated every time, but only if the thumbnail does not
-    exist, or if the source file is newer than the thumbnail.
+    exist, or if the source file is newer than the thumbnail. Decoded
+    thumbnails are kept in a memory cache, so the returned pixbuf may be
+    shared and must not be modified.
 
     :param src_file: Source media file
     :type src_file: unicode
@@ -316,15 +396,63 @@ def get_thumbnail_image(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
     :returns: thumbnail representing the source file
     :rtype: GdkPixbuf.Pixbuf
     """
+    key = (src_file, rectangle and tuple(rectangle), size)
+    try:
+        mtime = os.path.getmtime(src_file)
+    except (OSError, TypeError):
+        mtime = None
+    if mtime is not None:
+        pixbuf = _PIXBUF_CACHE.get(key, mtime)
+        if pixbuf is not None:
+            return pixbuf
     try:
         filename = get_thumbnail_path(src_file, mtype, rectangle, size)
-        return GdkPixbuf.Pixbuf.new_from_file(filename)
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file(filename)
     except (GObject.GError, OSError):
         if mtype:
             return find_mime_type_pixbuf(mtype)
         else:
             default = os.path.join(IMAGE_DIR, "document.png")
             return GdkPixbuf.Pixbuf.new_from_file(default)
+    if mtime is not None:
+        _PIXBUF_CACHE.put(key, mtime, pixbuf)
+    return pixbuf
+
+#-------------------------------------------------------------------------
+#
+# get_cached_thumbnail_image
+#
+#-------------------------------------------------------------------------
+def get_cached_thumbnail_image(src_file, rectangle=None, size=SIZE_NORMAL):
+    """
+    Return the decoded thumbnail of the source file if it is in the memory
+    cache and up to date, otherwise None. Never creates or reads a file, so
+    it is cheap enough to call before deciding to load a thumbnail in the
+    background.
+
+    :param src_file: Source media file
+    :type src_file: unicode
+    :param rectangle: subsection rectangle
+    :type rectangle: tuple
+    :rtype: GdkPixbuf.Pixbuf or None
+    """
+    try:
+        mtime = os.path.getmtime(src_file)
+    except (OSError, TypeError):
+        return None
+    return _PIXBUF_CACHE.get((src_file, rectangle and tuple(rectangle), size),
+                             mtime)
+
+#-------------------------------------------------------------------------
+#
+# clear_thumbnail_cache
+#
+#-------------------------------------------------------------------------
+def clear_thumbnail_cache():
+    """
+    Remove all decoded thumbnails from the memory cache.
+    """
+    _PIXBUF_CACHE.clear()
 
 #-------------------------------------------------------------------------
 #
@@ -355,3 +483,118 @@ def get_thumbnail_path(src_file, mtype=None, rectangle=None, size=SIZE_NORMAL):
             if not __create_thumbnail_image(src_file, mtype, rectangle, size):
                 return os.path.join(IMAGE_DIR, "document.png")
         return os.path.abspath(filename)
+
+#-------------------------------------------------------------------------
+#
+# needs_thumbnail
+#
+#-------------------------------------------------------------------------
+def needs_thumbnail(src_file, rectangle=None, size=SIZE_NORMAL):
+    """
+    Return True if the thumbnail of the source file is missing or older
+    than the source file.
+
+    :param src_file: Source media file
+    :type src_file: unicode
+    :param rectangle: subsection rectangle
+    :type rectangle: tuple
+    :rtype: bool
+    """
+    if not os.path.isfile(src_file):
+        return False
+    filename = __build_thumb_path(src_file, rectangle, size)
+    return (not os.path.isfile(filename) or
+            os.path.getmtime(src_file) > os.path.getmtime(filename))
+
+#-------------------------------------------------------------------------
+#
+# find_media_sources
+#
+#-------------------------------------------------------------------------
+def find_media_sources(db, references=False):
+    """
+    Return a list of (source file, mime type, rectangle) tuples for the
+    media objects of the database, to be passed to generate_thumbnails.
+
+    :param db: the database
+    :param references: if True, also include the subsection rectangles used
+      by the media references of people, families, events, places, sources
+      and citations
+    :type references: bool
+    """
+    from gramps.gen.utils.file import media_path_full
+    sources = []
+    mime_types = {}
+    for obj in db.iter_media_objects():
+        full_path = media_path_full(db, obj.get_path())
+        mime_types[obj.get_handle()] = (full_path, obj.get_mime_type())
+        sources.append((full_path, obj.get_mime_type(), None))
+    if references:
+        rectangles = set()
+        for iter_objects in (db.iter_people, db.iter_families,
+                             db.iter_events, db.iter_places,
+                             db.iter_sources, db.iter_citations):
+            for obj in iter_objects():
+                for ref in obj.get_media_list():
+                    rectangle = ref.get_rectangle()
+                    media = mime_types.get(ref.get_reference_handle())
+                    if media and rectangle is not None:
+                        rectangles.add((media[0], media[1], rectangle))
+        sources.extend(rectangles)
+    return sources
+
+#-------------------------------------------------------------------------
+#
+# generate_thumbnails
+#
+#-------------------------------------------------------------------------
+def _generate_thumbnail(args):
+    """
+    Worker for generate_thumbnails, run in a thread of its pool.
+    """
+    src_file, mtype, rectangle, size = args
+    try:
+        return __create_thumbnail_image(src_file, mtype, rectangle, size)
+    except Exception as err:
+        LOG.warn("Error creating thumbnail for %s: %s", src_file, str(err))
+        return False
+
+def generate_thumbnails(sources, size=SIZE_NORMAL, threads=None,
+                        callback=None):
+    """
+    Create the missing and outdated thumbnails of the given sources in a
+    pool of worker threads.
+
+    Loading and scaling the images releases the GIL, and thumbnailers run as
+    processes of their own, so the threads run in parallel. Worker processes
+    are not used, as they would be forked from the GTK application. This
+    does not use the GTK main loop, so it can be run from a thread while the
+    interface stays responsive.
+
+    :param sources: list of (source file, mime type, rectangle) tuples, see
+      find_media_sources
+    :param size: thumbnail size, SIZE_NORMAL or SIZE_LARGE
+    :param threads: number of worker threads, default the number of CPUs
+    :param callback: optional function called with (done, total) after each
+      created thumbnail
+    :returns: number of thumbnails created
+    :rtype: int
+    """
+    todo = [(src_file, mtype, rectangle, size)
+            for (src_file, mtype, rectangle) in sources
+            if needs_thumbnail(src_file, rectangle, size)]
+    if not todo:
+        return 0
+    created = 0
+    pool = ThreadPool(threads)
+    try:
+        for done, result in enumerate(
+                pool.imap_unordered(_generate_thumbnail, todo, 16)):
+            if result:
+                created += 1
+            if callback:
+                callback(done + 1, len(todo))
+    finally:
+        pool.close()
+        pool.join()
+    return created
@@ -81,6 +81,10 @@ TEXT = 1
 MARKUP = 2
 ICON = 3
 
+# object types of which changes can alter the prepared state of the rules
+# of a sidebar filter, eg the ancestors of a person
+FILTER_NAMESPACES = ('Person', 'Family')
+
 #----------------------------------------------------------------
 #
 # ListView
@@ -674,6 +678,34 @@ class ListView(NavigationView):
         for sig in self.signal_map:
             self.callman.add_db_signal(sig, self.signal_map[sig])
         self.callman.add_db_signal('tag-update', self.tag_updated)
+        for namespace in FILTER_NAMESPACES:
+            if namespace == self.FILTER_TYPE:
+                # done in row_add, row_update and row_delete
+                continue
+            for action in ('update', 'delete'):
+                self.callman.add_db_signal(
+                    '%s-%s' % (namespace.lower(), action),
+                    self.__filter_callback(namespace))
+
+    def __filter_callback(self, namespace):
+        """
+        Return a callback updating the sidebar filter for the namespace.
+        """
+        return lambda handle_list: self.update_filter(namespace, handle_list)
+
+    def update_filter(self, namespace, handle_list):
+        """
+        Update the prepared state of the sidebar filter after objects of
+        namespace changed. The filter is only applied again to all rows if
+        the change requires it, eg when an ancestor was added.
+        """
+        if not self.model or self.search_bar.is_visible():
+            return
+        if self.model.update_filter(namespace, handle_list):
+            if self.active:
+                self.build_tree()
+            else:
+                self.dirty = True
 
     def change_db(self, db):
         """
@@ -730,6 +762,7 @@ class ListView(NavigationView):
         """
         Called when an object is added.
         """
+        self.update_filter(self.FILTER_TYPE, handle_list)
         if self.active or \
            (not self.dirty and not self._dirty_on_change_inactive):
             cput = time.clock()
@@ -747,6 +780,7 @@ class ListView(NavigationView):
         """
         Called when an object is updated.
         """
+        self.update_filter(self.FILTER_TYPE, handle_list)
         if self.model:
             self.model.prev_handle = None
         if self.active or \
@@ -770,6 +804,7 @@ class ListView(NavigationView):
         """
         Called when an object is deleted.
         """
+        self.update_filter(self.FILTER_TYPE, handle_list)
         if self.active or \
            (not self.dirty and not self._dirty_on_change_inactive):
             cput = time.clock()
@@ -495,6 +495,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
         self.sort_col = scol
         self.skip = skip
         self._in_build = False
+        self._kept_filter = None
 
         self.node_map = FlatNodeMap()
         self.set_search(search)
@@ -516,6 +517,32 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
         self.node_map = None
         self.rebuild_data = None
         self.search = None
+        self._keep_filter(None)
+
+    def _keep_filter(self, dfilter):
+        """
+        Keep the rules of the sidebar filter prepared while it is used by the
+        model, so single rows can be matched without preparing them again.
+        """
+        if dfilter is self._kept_filter:
+            return
+        if self._kept_filter:
+            self._kept_filter.release_prepared()
+        self._kept_filter = dfilter
+        if dfilter:
+            dfilter.keep_prepared(self.db)
+
+    def update_filter(self, namespace, handle_list):
+        """
+        Update the prepared state of the sidebar filter after objects of
+        namespace with the given handles changed in the database.
+
+        :Returns: True if the filter must be applied again to all rows,
+                False if updating the rows of the changed objects suffices.
+        """
+        if self._kept_filter is None:
+            return False
+        return self._kept_filter.update_prepared(namespace, handle_list)
 
     def set_search(self, search):
         """
@@ -530,6 +557,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
             if search[0]:
                 #following is None if no data given in filter sidebar
                 self.search = search[1]
+                self._keep_filter(self.search)
                 self.rebuild_data = self._rebuild_filter
             else:
                 if search[1]: # Search from topbar in columns
@@ -544,9 +572,11 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel):
                         self.search = SearchFilter(func, text, inv)
                 else:
                     self.search = None
+                self._keep_filter(None)
                 self.rebuild_data = self._rebuild_search
         else:
             self.search = None
+            self._keep_filter(None)
             self.rebuild_data = self._rebuild_search
 
     def total(self):
@@ -333,6 +333,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel):
             self.sort_col = scol
     
         self._in_build = False
+        self._kept_filter = None
         
         self.lru_data  = LRU(TreeBaseModel._CACHE_SIZE)
 
@@ -366,9 +367,35 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel):
         self.search2 = None
         self.current_filter = None
         self.current_filter2 = None
+        self._keep_filter(None)
         self.clear_cache()
         self.lru_data = None
 
+    def _keep_filter(self, dfilter):
+        """
+        Keep the rules of the sidebar filter prepared while it is used by the
+        model, so single rows can be matched without preparing them again.
+        """
+        if dfilter is self._kept_filter:
+            return
+        if self._kept_filter:
+            self._kept_filter.release_prepared()
+        self._kept_filter = dfilter
+        if dfilter:
+            dfilter.keep_prepared(self.db)
+
+    def update_filter(self, namespace, handle_list):
+        """
+        Update the prepared state of the sidebar filter after objects of
+        namespace with the given handles changed in the database.
+
+        :Returns: True if the filter must be applied again to all rows,
+                False if updating the rows of the changed objects suffices.
+        """
+        if self._kept_filter is None:
+            return False
+        return self._kept_filter.update_prepared(namespace, handle_list)
+
     def _set_base_data(self):
         """
         This method must be overwritten in the inheriting class, setting 
@@ -453,6 +480,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel):
                 if self.has_secondary:
                     self.search2 = search[1]
                     _LOG.debug("search2 filter %s %s" % (search[0], search[1]))
+                self._keep_filter(search[1])
                 self._build_data = self._rebuild_filter
             elif search[0] == 0: # Search
                 if search[1]:
@@ -488,6 +516,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel):
                 _LOG.debug("search2 no search parameter")
             self._build_data = self._rebuild_search
             
+        if not search or search[0] != 1:
+            self._keep_filter(None)
         self.current_filter = self.search
         if self.has_secondary:
             self.current_filter2 = self.search2
@@ -99,6 +99,7 @@ CHILDRING_WIDTH = 12       # width of the children ring inside the person
 TRANSLATE_PX = 10          # size of the central circle, used to move the chart
 PAD_PX = 4                 # padding with edges
 PAD_TEXT = 2               # padding for text in boxes
+RING_MARGIN = 4            # margin around a cached ring for the thick borders
 
 BACKGROUND_SCHEME1 = 0
 BACKGROUND_SCHEME2 = 1
@@ -216,6 +217,7 @@ class FanChartBaseWidget(Gtk.DrawingArea):
         self.center_y = 0
         self.mouse_x = 0
         self.mouse_y = 0
+        self.rendering_ring = False
         #(re)compute everything
         self.reset()
         self.set_size_request(120, 120)
@@ -226,6 +228,8 @@ class FanChartBaseWidget(Gtk.DrawingArea):
         structures needed
         """
         self.cache_fontcolor = {}
+        self.cache_boxcolor = {}
+        self.invalidate_rings()
         
         # fill the data structure
         self._fill_data_structures()
@@ -287,6 +291,88 @@ class FanChartBaseWidget(Gtk.DrawingArea):
         """
         raise NotImplementedError
 
+    def draw_ring(self, cr, generation):
+        """
+        draw all boxes of ring generation on cr, which is rotated already
+        """
+        raise NotImplementedError
+
+    def ring_radius(self, generation):
+        """
+        the outer radius in pixels of ring generation, border indicators
+        included
+        """
+        raise NotImplementedError
+
+    def invalidate_rings(self, generation=0):
+        """
+        Drop the cached surfaces of all rings from generation outwards. Must
+        be called whenever the boxes in these rings change.
+        """
+        if generation <= 0:
+            self.rings = {}
+        else:
+            for gen in list(self.rings):
+                if gen >= generation:
+                    del self.rings[gen]
+
+    def ring_surface(self, cr, generation):
+        """
+        Return (surface, rotation, half) for ring generation, with half the
+        size of the square surface and rotation the rotate value it was
+        rendered for. While moving the chart, a surface rendered for another
+        rotation is reused, otherwise the ring is rendered again.
+        """
+        cached = self.rings.get(generation)
+        if cached is not None and (cached[1] == self.rotate_value or
+                                   not self.draw_names()):
+            return cached
+        half = int(math.ceil(self.ring_radius(generation))) + RING_MARGIN
+        surface = cr.get_target().create_similar(cairo.CONTENT_COLOR_ALPHA,
+                                                 2 * half, 2 * half)
+        ringcr = cairo.Context(surface)
+        ringcr.translate(half, half)
+        ringcr.rotate(math.radians(self.rotate_value))
+        self.rendering_ring = True
+        try:
+            self.draw_ring(ringcr, generation)
+        finally:
+            self.rendering_ring = False
+        cached = self.rings[generation] = (surface, self.rotate_value, half)
+        return cached
+
+    def paint_rings(self, cr, generations):
+        """
+        Paint the rings in generations, in that order, from their cached
+        surfaces. cr must be translated to the center of the chart.
+        """
+        for generation in generations:
+            surface, rotation, half = self.ring_surface(cr, generation)
+            cr.save()
+            if rotation != self.rotate_value:
+                cr.rotate(math.radians(self.rotate_value - rotation))
+            cr.set_source_surface(surface, -half, -half)
+            cr.paint()
+            cr.restore()
+
+    def draw_names(self):
+        """
+        Names are drawn in the boxes, except while moving the chart directly.
+        The cached rings always contain the names.
+        """
+        return (self.rendering_ring or self.last_x is None
+                or self.last_y is None)
+
+    def queue_draw_chart(self):
+        """
+        Queue a redraw of the area covered by the chart only, eg after a
+        rotation which does not affect the rest of the widget.
+        """
+        radius = int(math.ceil(self.halfdist() + self.gen_pixels()))
+        self.queue_draw_area(int(self.center_x) - radius,
+                             int(self.center_y) - radius,
+                             2 * radius, 2 * radius)
+
     def people_generator(self):
         """
         a generator over all people outside of the core person
@@ -421,6 +507,11 @@ class FanChartBaseWidget(Gtk.DrawingArea):
         determine red, green, blue value of background of the box of person,
         which has gender gender, and is in ring generation
         """
+        key = (person.handle, generation)
+        try:
+            return self.cache_boxcolor[key]
+        except KeyError:
+            pass
         if generation == 0 and self.background in [BACKGROUND_GENDER, 
                 BACKGROUND_GRAD_GEN, BACKGROUND_SCHEME1,
                 BACKGROUND_SCHEME2]:
@@ -468,7 +559,8 @@ class FanChartBaseWidget(Gtk.DrawingArea):
         else:
             alpha = 1.
         
-        return color[0], color[1], color[2], alpha
+        self.cache_boxcolor[key] = (color[0], color[1], color[2], alpha)
+        return self.cache_boxcolor[key]
 
     def fontcolor(self, r, g, b, a):
         """
@@ -932,8 +1024,12 @@ class FanChartBaseWidget(Gtk.DrawingArea):
                 end_angle = math.pi + (math.pi + end_angle)
             # now look at change in angle:
             diff_angle = (end_angle - start_angle) % (math.pi * 2.0)
-            self.rotate_value -= math.degrees(diff_angle)
             self.last_x, self.last_y = event.x, event.y
+            if diff_angle:
+                self.rotate_value -= math.degrees(diff_angle)
+                # only the chart itself turns
+                self.queue_draw_chart()
+            return True
         self.queue_draw()
         return True
 
@@ -1081,6 +1177,7 @@ class FanChartWidget(FanChartBaseWidget):
         self.angle = {}
         if self.childring:
             self.angle[-2] = []
+        self._nrgen = None
         self.data = {}
         self.childrenroot = []
         for i in range(self.generations):
@@ -1194,7 +1291,9 @@ class FanChartWidget(FanChartBaseWidget):
         return PIXELS_PER_GENERATION
 
     def nrgen(self):
-        #compute the number of generations present
+        #compute the number of generations present, once per data change
+        if self._nrgen is not None:
+            return self._nrgen
         nrgen = None
         for generation in range(self.generations - 1, 0, -1):
             for p in range(len(self.data[generation])):
@@ -1206,6 +1305,7 @@ class FanChartWidget(FanChartBaseWidget):
                 break
         if nrgen is None:
             nrgen = 1
+        self._nrgen = nrgen
         return nrgen
 
     def halfdist(self):
@@ -1265,20 +1365,21 @@ class FanChartWidget(FanChartBaseWidget):
             elif self.form == FORM_QUADRANT:
                 self.center_x = self.CENTER + PAD_PX - self.center_xy[0]
                 self.center_y = h - self.CENTER - PAD_PX - self.center_xy[1]
+            # whole pixels, so the cached rings are not resampled
+            self.center_x = round(self.center_x)
+            self.center_y = round(self.center_y)
         cr.translate(self.center_x, self.center_y)
 
-        cr.save()
-        cr.rotate(math.radians(self.rotate_value))
-        for generation in range(self.generations - 1, 0, -1):
-            for p in range(len(self.data[generation])):
-                (text, person, parents, child, userdata) = self.data[generation][p]
-                if person:
-                    start, stop, state = self.angle[generation][p]
-                    if state in [NORMAL, EXPANDED]:
-                        self.draw_person(cr, gender_code(p%2 == 0), 
-                                         text, start, stop, 
-                                         generation, state, parents, child,
-                                         person, userdata)
+        rings = range(self.nrgen(), 0, -1)
+        if widget:
+            self.paint_rings(cr, rings)
+            cr.save()
+            cr.rotate(math.radians(self.rotate_value))
+        else:
+            cr.save()
+            cr.rotate(math.radians(self.rotate_value))
+            for generation in rings:
+                self.draw_ring(cr, generation)
         cr.set_source_rgb(1, 1, 1) # white
         cr.move_to(0,0)
         cr.arc(0, 0, self.CENTER, 0, 2 * math.pi)
@@ -1317,6 +1418,27 @@ class FanChartWidget(FanChartBaseWidget):
         if self.background in [BACKGROUND_GRAD_AGE, BACKGROUND_GRAD_PERIOD]:
             self.draw_gradient(cr, widget, halfdist)
 
+    def draw_ring(self, cr, generation):
+        """
+        draw all people in generation
+        """
+        for p in range(len(self.data[generation])):
+            (text, person, parents, child, userdata) = self.data[generation][p]
+            if person:
+                start, stop, state = self.angle[generation][p]
+                if state in [NORMAL, EXPANDED]:
+                    self.draw_person(cr, gender_code(p%2 == 0), 
+                                     text, start, stop, 
+                                     generation, state, parents, child,
+                                     person, userdata)
+
+    def ring_radius(self, generation):
+        """
+        the outer radius of generation, with room for the parents indicator
+        """
+        return (generation * PIXELS_PER_GENERATION + self.CENTER
+                + BORDER_EDGE_WIDTH)
+
     def draw_person(self, cr, gender, name, start, stop, generation, 
                     state, parents, child, person, userdata):
         """
@@ -1375,7 +1497,7 @@ class FanChartWidget(FanChartBaseWidget):
             cr.set_line_width(3)
         cr.stroke()
         cr.set_line_width(1)
-        if self.last_x is None or self.last_y is None: 
+        if self.draw_names():
             #we are not in a move, so draw text
             radial = False
             radstart = radius - PIXELS_PER_GENERATION/2
@@ -1549,6 +1671,9 @@ class FanChartWidget(FanChartBaseWidget):
     def do_mouse_click(self):
         # no drag occured, expand or collapse the section
         self.change_slice(self._mouse_click_gen, self._mouse_click_sel)
+        # only the rings from the clicked generation outwards change
+        if self._mouse_click_gen > 0:
+            self.invalidate_rings(self._mouse_click_gen)
         self._mouse_click = False
         self.queue_draw()
 
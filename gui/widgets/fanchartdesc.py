@@ -158,6 +158,7 @@ class FanChartDescWidget(FanChartBaseWidget):
         self.gen2fam[0] = [] #no families
         self.angle = {}
         self.angle[-2] = []
+        self._nrgen = None
         for i in range(1, self.generations-1):
             self.gen2fam[i] = []
             self.gen2people[i] = []
@@ -381,7 +382,9 @@ class FanChartDescWidget(FanChartBaseWidget):
                 offset += slice
 
     def nrgen(self):
-        #compute the number of generations present
+        #compute the number of generations present, once per data change
+        if self._nrgen is not None:
+            return self._nrgen
         nrgen = None
         for gen in range(self.generations - 1, 0, -1):
             if len(self.gen2people[gen]) > 0:
@@ -389,6 +392,7 @@ class FanChartDescWidget(FanChartBaseWidget):
                 break
         if nrgen is None:
             nrgen = 1
+        self._nrgen = nrgen
         return nrgen
 
     def halfdist(self):
@@ -452,6 +456,9 @@ class FanChartDescWidget(FanChartBaseWidget):
             elif self.form == FORM_QUADRANT:
                 self.center_x = self.CENTER + PAD_PX - self.center_xy[0]
                 self.center_y = h - self.CENTER - PAD_PX - self.center_xy[1]
+            # whole pixels, so the cached rings are not resampled
+            self.center_x = round(self.center_x)
+            self.center_y = round(self.center_y)
         cr.translate(self.center_x, self.center_y)
 
         cr.save()
@@ -493,36 +500,55 @@ class FanChartDescWidget(FanChartBaseWidget):
                 self.draw_parentring(cr)
             else:
                 cr.stroke()
-        #now write all the families and children
-        cr.save()
-        cr.rotate(self.rotate_value * math.pi/180)
-        radstart = self.CENTER - PIXELS_PER_GENFAMILY - PIXELS_PER_GENPERSON
-        for gen in range(self.generations-1):
-            radstart += PIXELS_PER_GENPERSON
-            for famdata in self.gen2fam[gen]:
-                # family, duplicate or not, start angle, slice size, 
-                #       text, spouse pos in gen, nrchildren, userdata, status
-                fam, dup, start, slice, text, posfam, nrchild, userdata,\
-                    partner, status = famdata
-                if status != COLLAPSED:
-                    self.draw_person(cr, text, start, slice, radstart, 
-                                     radstart + PIXELS_PER_GENFAMILY, gen, dup, 
-                                     partner, userdata, family=True, thick=status != NORMAL)
-            radstart += PIXELS_PER_GENFAMILY
-            for pdata in self.gen2people[gen+1]:
-                # person, duplicate or not, start angle, slice size,
-                #             text, parent pos in fam, nrfam, userdata, status
-                pers, dup, start, slice, text, pospar, nrfam, userdata, status = \
-                    pdata
-                if status != COLLAPSED:
-                    self.draw_person(cr, text, start, slice, radstart, 
-                                     radstart + PIXELS_PER_GENPERSON, gen+1, dup, 
-                                     pers, userdata, thick=status != NORMAL)
-        cr.restore()
+        #now write all the families and children, the families of the
+        #outermost generation are in the ring after it
+        rings = range(1, min(self.nrgen() + 1, self.generations))
+        if widget:
+            self.paint_rings(cr, rings)
+        else:
+            cr.save()
+            cr.rotate(self.rotate_value * math.pi/180)
+            for generation in rings:
+                self.draw_ring(cr, generation)
+            cr.restore()
         
         if self.background in [BACKGROUND_GRAD_AGE, BACKGROUND_GRAD_PERIOD]:
             self.draw_gradient(cr, widget, halfdist)
 
+    def draw_ring(self, cr, generation):
+        """
+        draw the families of the previous generation, and the people of 
+        generation
+        """
+        gen = generation - 1
+        radstart = self.CENTER - PIXELS_PER_GENFAMILY + gen * self.gen_pixels()
+        for famdata in self.gen2fam[gen]:
+            # family, duplicate or not, start angle, slice size, 
+            #       text, spouse pos in gen, nrchildren, userdata, status
+            fam, dup, start, slice, text, posfam, nrchild, userdata,\
+                partner, status = famdata
+            if status != COLLAPSED:
+                self.draw_person(cr, text, start, slice, radstart, 
+                                 radstart + PIXELS_PER_GENFAMILY, gen, dup, 
+                                 partner, userdata, family=True, thick=status != NORMAL)
+        radstart += PIXELS_PER_GENFAMILY
+        for pdata in self.gen2people[generation]:
+            # person, duplicate or not, start angle, slice size,
+            #             text, parent pos in fam, nrfam, userdata, status
+            pers, dup, start, slice, text, pospar, nrfam, userdata, status = \
+                pdata
+            if status != COLLAPSED:
+                self.draw_person(cr, text, start, slice, radstart, 
+                                 radstart + PIXELS_PER_GENPERSON, generation, dup, 
+                                 pers, userdata, thick=status != NORMAL)
+
+    def ring_radius(self, generation):
+        """
+        the outer radius of generation, with room for the children indicator
+        """
+        return (self.CENTER + (generation - 1) * self.gen_pixels()
+                + PIXELS_PER_GENPERSON + BORDER_EDGE_WIDTH)
+
     def draw_person(self, cr, name, start_rad, slice, radius, radiusend, 
                 generation, dup, person, userdata, family=False, thick=False):
         """
@@ -571,7 +597,7 @@ class FanChartDescWidget(FanChartBaseWidget):
         # now draw the person
         self.draw_radbox(cr, radius, radiusend, start_rad, stop_rad,
                          (r/255, g/255, b/255, a), thick)
-        if self.last_x is None or self.last_y is None:
+        if self.draw_names():
             #we are not in a move, so draw text
             radial = False
             width = radiusend-radius
@@ -682,6 +708,9 @@ class FanChartDescWidget(FanChartBaseWidget):
         # no drag occured, expand or collapse the section
         self.change_slice(self._mouse_click_gen, self._mouse_click_sel, 
                           self._mouse_click_btype)
+        # only the rings from the clicked generation outwards change
+        if self._mouse_click_gen > 0:
+            self.invalidate_rings(self._mouse_click_gen)
         self._mouse_click = False
         self.queue_draw()
 
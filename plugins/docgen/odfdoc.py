@@ -69,10 +69,14 @@ except ImportError:
 import zipfile
 import time
 import sys
+import codecs
+import shutil
+import tempfile
 if sys.version_info[0] < 3:
     from cStringIO import StringIO
 else:
     from io import StringIO
+from io import BytesIO
 from math import pi, cos, sin, degrees, radians
 from xml.sax.saxutils import escape
 
@@ -118,6 +122,12 @@ _esc_map = {
 #
 #-------------------------------------------------------------------------
 import re
+
+# Chunk size when copying the content and images into the odt file
+_CHUNK_SIZE = 1 << 16
+
+# ZipFile.open can write a member as a stream since python 3.6
+_STREAM_ZIP = sys.version_info >= (3, 6)
 # Hyphen is added because it is used to replace spaces in the font name
 NewStyle = re.compile('style-name="([a-zA-Z0-9]*)__([#a-zA-Z0-9 -]*)__">')
 
@@ -448,7 +458,7 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         self.cntnt = None
         self.cntnt1 = None
         self.cntnt2 = None
-        self.cntntx = None
+        self.cntnt_file = None
         self.sfile = None
         self.mimetype = None
         self.meta = None
@@ -480,7 +490,10 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
 
         self.filename = os.path.normpath(os.path.abspath(self.filename))
         self._backend = OdfBackend()
-        self.cntnt = StringIO()
+        # The body of content.xml goes to a temporary file as it is written,
+        # only the declarations that precede it are kept in memory.
+        self.cntnt_file = tempfile.TemporaryFile()
+        self.cntnt = codecs.getwriter('utf-8')(self.cntnt_file)
         self.cntnt1 = StringIO()
         self.cntnt2 = StringIO()
 
@@ -793,19 +806,14 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         """
         We have finished the document.
         So me must integrate the new fonts and styles where they should be.
-        The content.xml file is closed.
+        The new fonts and styles go to the declarations before the body, the
+        body itself stays in its temporary file until it is zipped.
         """
-        self.cntntx = StringIO()
         self.StyleList_notes = self.uniq(self.StyleList_notes)
         self.add_styled_notes_fonts()
         self.add_styled_notes_styles()
         self.add_styled_photo_styles()
-        self.cntntx.write(self.cntnt1.getvalue())
-        self.cntntx.write(self.cntnt2.getvalue())
-        self.cntntx.write(self.cntnt.getvalue())
-        self.cntnt1.close()
-        self.cntnt2.close()
-        self.cntnt.close()
+        self.cntnt.flush()
 
     def close(self):
         """
@@ -1181,9 +1189,9 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         """
         self.cntnt.write('</text:span>')
 
-    def _add_zip(self, zfile, name, data, t):
+    def _zip_info(self, name, t):
         """
-        Add a zip file to an archive
+        Return the ZipInfo of a file in the archive
         """
         if sys.version_info[0] < 3:
             name = name.encode('utf-8')
@@ -1191,7 +1199,34 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         zipinfo.date_time = t
         zipinfo.compress_type = zipfile.ZIP_DEFLATED
         zipinfo.external_attr = 0o644 << 16
-        zfile.writestr(zipinfo, data)
+        return zipinfo
+
+    def _add_zip(self, zfile, name, data, t):
+        """
+        Add a zip file to an archive
+        """
+        zfile.writestr(self._zip_info(name, t), data)
+
+    def _add_zip_stream(self, zfile, name, sources, t):
+        """
+        Add a zip file to an archive, with the concatenated content of the
+        binary file objects in sources. The data is copied in chunks where
+        the zipfile module allows it.
+        """
+        zipinfo = self._zip_info(name, t)
+        if _STREAM_ZIP:
+            # the size tells zipfile whether the entry needs ZIP64
+            # extensions, which it can not add afterwards
+            size = _stream_size(sources)
+            if size is not None:
+                zipinfo.file_size = size
+            with zfile.open(zipinfo, "w",
+                            force_zip64=size is None) as dest:
+                for source in sources:
+                    shutil.copyfileobj(source, dest, _CHUNK_SIZE)
+        else:
+            zfile.writestr(zipinfo,
+                           b''.join(source.read() for source in sources))
 
     def _write_zip(self):
         """
@@ -1208,13 +1243,20 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         t = time.localtime(time.time())[:6]
 
         self._add_zip(zfile, "META-INF/manifest.xml", self.mfile.getvalue(), t)
-        self._add_zip(zfile, "content.xml", self.cntntx.getvalue(), t)
+        header = self.cntnt1.getvalue() + self.cntnt2.getvalue()
+        if not isinstance(header, bytes):
+            header = header.encode('utf-8')
+        self.cntnt_file.seek(0)
+        self._add_zip_stream(zfile, "content.xml",
+                             [BytesIO(header), self.cntnt_file], t)
         self._add_zip(zfile, "meta.xml", self.meta.getvalue(), t)
         self._add_zip(zfile, "settings.xml", self.stfile.getvalue(), t)
         self._add_zip(zfile, "styles.xml", self.sfile.getvalue(), t)
         self._add_zip(zfile, "mimetype", self.mimetype.getvalue(), t)
 
         self.mfile.close()
+        self.cntnt1.close()
+        self.cntnt2.close()
         self.cntnt.close()
         self.meta.close()
         self.stfile.close()
@@ -1223,10 +1265,10 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         
         for image in self.media_list:
             try:
-                ifile = open(image[0], mode='rb')
-                self._add_zip(zfile, "Pictures/%s" % image[1], ifile.read(), t)
-                ifile.close()
-            except:
+                with open(image[0], mode='rb') as ifile:
+                    self._add_zip_stream(zfile, "Pictures/%s" % image[1],
+                                         [ifile], t)
+            except (IOError, OSError) as msg:
                 errmsg = "%s\n%s" % (_("Could not open %s") % image[0],
                                      msg)
                 raise ReportError(errmsg)
@@ -1992,6 +2034,22 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
                 )
         self.cntnt.write('</draw:frame>\n')
 
+def _stream_size(sources):
+    """
+    Return the number of bytes left in the seekable file objects sources
+    together, or None if one of them can not seek.
+    """
+    size = 0
+    try:
+        for source in sources:
+            pos = source.tell()
+            source.seek(0, 2)
+            size += source.tell() - pos
+            source.seek(pos)
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+    return size
+
 def process_spaces(line, format):
     """
     Function to process spaces in text lines for flowed and pre-formatted notes.
@@ -45,7 +45,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 # Person and relation types
 from gramps.gen.lib import Person, FamilyRelType, EventType, EventRoleType
-from gramps.gen.lib.date import Date, gregorian
+from gramps.gen.lib.date import Date
 # gender and report type names
 from gramps.gen.plug.docgen import (FontStyle, ParagraphStyle, GraphicsStyle,
                                     FONT_SANS_SERIF, FONT_SERIF,
@@ -59,6 +59,7 @@ from gramps.gen.plug.report import utils as ReportUtils
 from gramps.gen.plug.report import MenuReportOptions
 from gramps.gen.plug.report import stdoptions
 from gramps.gen.datehandler import parser
+from gramps.gen.utils.facts import get_person_facts
 
 #------------------------------------------------------------------------
 #
@@ -554,10 +555,12 @@ class Extract(object):
     def get_child_handles(self, person):
         "return list of child handles for given person or None"
         children = []
+        facts = self.facts
         for fam_handle in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_handle)
-            for child_ref in fam.get_child_ref_list():
-                children.append(child_ref.ref)
+            family = facts.family_index.get(fam_handle)
+            if family is not None:
+                children.extend(facts.handles[child[0]]
+                                for child in facts.children[family])
         # TODO: it would be good to return only biological children,
         # but GRAMPS doesn't offer any efficient way to check that
         # (I don't want to check each children's parent family mother
@@ -655,33 +658,34 @@ class Extract(object):
                 # localized data title, value dict, type and data method
                 data.append((ext[name][1], {}, ext[name][2], ext[name][3]))
         
+        # gender, birth and death of everybody, so that only the people
+        # in range need to be loaded
+        facts = self.facts = get_person_facts(db)
+
         # go through the people and collect data
-        for person_handle in filter_func.apply(db, db.iter_person_handles(), cb_progress):
+        for person_handle, person in filter_func.apply_objects(
+                db, db.iter_person_handles(), cb_progress):
             cb_progress()
-            person = db.get_person_from_handle(person_handle)
+            index = facts.index.get(person_handle)
+            if index is None:
+                continue
             # check whether person has suitable gender
-            if person.gender != genders and genders != Person.UNKNOWN:
+            if facts.gender[index] != genders and genders != Person.UNKNOWN:
                 continue
         
             # check whether birth year is within required range
-            birth = self.get_birth(person)
-            if birth:
-                birthdate = birth.get_date_object()
+            birthdate = facts.birth[index]
+            if birthdate is not None:
                 if birthdate.get_year_valid():
-                    birthdate = gregorian(birthdate)
-
-                    year = birthdate.get_year()
+                    year = facts.birth_year[index]
                     if not (year >= year_from and year <= year_to):
                         continue
                 else:
                     # if death before range, person's out of range too...
-                    death = self.get_death(person)
-                    if death:
-                        deathdate = death.get_date_object()
+                    deathdate = facts.death[index]
+                    if deathdate is not None:
                         if deathdate.get_year_valid():
-                            deathdate = gregorian(deathdate)
-
-                            if deathdate.get_year() < year_from:
+                            if facts.death_year[index] < year_from:
                                 continue
                         if not no_years:
                             # do not accept people who are not known to be in range
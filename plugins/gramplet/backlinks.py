@@ -64,9 +64,7 @@ class Backlinks(Gramplet):
         """
         if active_handle is None:
             return False
-        for handle in self.dbstate.db.find_backlink_handles(active_handle):
-            return True
-        return False
+        return self.dbstate.db.get_reference_count(active_handle) > 0
         
     def cb_double_click(self, treeview):
         """
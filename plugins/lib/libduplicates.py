@@ -0,0 +1,575 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2000-2007  Donald N. Allingham
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Find people that are possibly the same person.
+
+The people are read once, into :class:`PersonFeatures` records with what the
+comparison needs. Only the pairs of people that can get a positive score are
+compared: people of the same sex group, with the same surname key, sharing
+the initial of a given name, and with the same birth year when both have a
+regular birth date. The pairs that can not get a positive score in any of
+these ways score -1 anyway, so the result is the same as when all the
+people of a surname are compared.
+
+The pairs are scored in a pool of worker processes, unless find_duplicates
+is called from the GUI.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import multiprocessing
+from collections import namedtuple
+
+#-------------------------------------------------------------------------
+#
+# GRAMPS modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.lib import Date, Person
+from gramps.gen.soundex import soundex
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# with fewer people the pairs are scored in this process
+_MIN_PARALLEL = 2000
+# number of people whose pairs a worker scores at a time
+_CHUNK_SIZE = 256
+
+#-------------------------------------------------------------------------
+#
+# Features
+#
+#-------------------------------------------------------------------------
+# name: (surnames, suffix, first name) of the primary name
+# birth, death: see date_features
+# birth_place, death_place: (place handle, place title)
+# parents: None, or the names of the father and mother of the main parents
+#     family, each None if there is none
+# families: (father handle, father name, mother handle, mother name) of the
+#     families the person is a parent in
+PersonFeatures = namedtuple('PersonFeatures',
+                            'handle gender name birth birth_place death '
+                            'death_place parents families')
+
+def get_surnames(name):
+    """Construct a full surname of the surnames"""
+    return ' '.join([surn.get_surname() for surn in name.get_surname_list()])
+
+def name_features(name):
+    """
+    Return the (surnames, suffix, first name) tuple of a Name.
+    """
+    return (get_surnames(name), name.get_suffix(), name.get_first_name())
+
+def date_features(date):
+    """
+    Return what the comparison of dates needs of a Date, None if it is
+    empty.
+    """
+    if date.is_empty():
+        return None
+    # what Date.is_equal compares
+    if date.modifier == Date.MOD_TEXTONLY:
+        equal = ('text', date.text)
+    else:
+        equal = (date.calendar, date.modifier, date.quality, date.dateval)
+    return (equal, date.is_compound(), date.get_year(), date.get_month(),
+            date.get_month_valid(), tuple(date.get_start_date()[0:3]),
+            tuple(date.get_stop_date()[0:3]))
+
+def get_features(db, callback=None):
+    """
+    Return the list of :class:`PersonFeatures` of the people of db, and the
+    dictionary of the (father handle, mother handle) of the main parents of
+    the people. callback is called once for each person.
+    """
+    people = []
+    names = {}
+    for person in db.iter_people():
+        if callback:
+            callback()
+        names[person.get_handle()] = name_features(person.get_primary_name())
+        people.append((person.get_handle(), person.get_gender(),
+                       person.get_birth_ref(), person.get_death_ref(),
+                       person.get_main_parents_family_handle(),
+                       person.get_family_handle_list()))
+
+    family_parents = {}
+    for family in db.iter_families():
+        family_parents[family.get_handle()] = (family.get_father_handle(),
+                                               family.get_mother_handle())
+
+    place_titles = {}
+    def event_features(event_ref):
+        event = None
+        if event_ref:
+            event = db.get_event_from_handle(event_ref.ref)
+        if event is None:
+            return None, ('', None)
+        place_handle = event.get_place_handle()
+        if place_handle and place_handle not in place_titles:
+            place = db.get_place_from_handle(place_handle)
+            place_titles[place_handle] = place.get_title() if place else ''
+        return (date_features(event.get_date_object()),
+                (place_handle, place_titles.get(place_handle)))
+
+    features = []
+    parents = {}
+    for (handle, gender, birth_ref, death_ref, main_family,
+         family_list) in people:
+        birth, birth_place = event_features(birth_ref)
+        death, death_place = event_features(death_ref)
+        main_parents = None
+        if main_family:
+            father, mother = family_parents.get(main_family, (None, None))
+            parents[handle] = (father, mother)
+            main_parents = (names.get(father) if father else None,
+                            names.get(mother) if mother else None)
+        families = []
+        for family_handle in family_list:
+            father, mother = family_parents.get(family_handle, (None, None))
+            families.append((father, names.get(father) if father else None,
+                             mother, names.get(mother) if mother else None))
+        features.append(PersonFeatures(handle, gender, names[handle], birth,
+                                       birth_place, death, death_place,
+                                       main_parents, tuple(families)))
+    return features, parents
+
+#-------------------------------------------------------------------------
+#
+# Comparison
+#
+#-------------------------------------------------------------------------
+def is_initial(name):
+    if len(name) > 2:
+        return 0
+    elif len(name) == 2:
+        if name[0] == name[0].upper() and name[1] == '.':
+            return 1
+    else:
+        return name[0] == name[0].upper()
+
+class Comparator(object):
+    """
+    Scores the likelihood that two people are the same person. A score of
+    -1 means they are not.
+    """
+
+    def __init__(self, use_soundex=True, parents=None):
+        """
+        :param use_soundex: compare names by their soundex codes
+        :param parents: dictionary of the (father, mother) handles of the
+            main parents of people, for the ancestor test
+        """
+        self.use_soundex = use_soundex
+        self.parents = parents or {}
+        self.__soundex = {}
+
+    def gen_key(self, val):
+        if self.use_soundex:
+            try:
+                return soundex(val)
+            except UnicodeEncodeError:
+                return val
+        else:
+            return val
+
+    def name_compare(self, s1, s2):
+        if self.use_soundex:
+            try:
+                cache = self.__soundex
+                if s1 not in cache:
+                    cache[s1] = soundex(s1)
+                if s2 not in cache:
+                    cache[s2] = soundex(s2)
+                return cache[s1] == cache[s2]
+            except UnicodeEncodeError:
+                return s1 == s2
+        else:
+            return s1 == s2
+
+    def is_ancestor(self, handle, person_handle):
+        """
+        Return True if handle is the person or one of their ancestors, in
+        the main parents families.
+        """
+        parents = self.parents
+        todo = [person_handle]
+        seen = set()
+        while todo:
+            current = todo.pop()
+            if not current or current in seen:
+                continue
+            if current == handle:
+                return True
+            seen.add(current)
+            todo.extend(parents.get(current, ()))
+        return False
+
+    def compare_people(self, p1, p2):
+        """
+        Return the score of two :class:`PersonFeatures`.
+        """
+        chance = self.compare_features(p1, p2)
+        if chance == -1:
+            return -1
+        if (self.is_ancestor(p2.handle, p1.handle) or
+                self.is_ancestor(p1.handle, p2.handle)):
+            return -1
+        return chance
+
+    def compare_features(self, p1, p2):
+        """
+        Return the score of two :class:`PersonFeatures`, without testing if
+        one is an ancestor of the other.
+        """
+        chance = self.name_match(p1.name, p2.name)
+        if chance == -1  :
+            return -1
+
+        value = self.date_match(p1.birth, p2.birth)
+        if value == -1 :
+            return -1
+        chance += value
+
+        value = self.date_match(p1.death, p2.death)
+        if value == -1 :
+            return -1
+        chance += value
+
+        value = self.place_match(p1.birth_place, p2.birth_place)
+        if value == -1 :
+            return -1
+        chance += value
+
+        value = self.place_match(p1.death_place, p2.death_place)
+        if value == -1 :
+            return -1
+        chance += value
+
+        if p1.parents and p2.parents:
+            value = self.name_match(p1.parents[0], p2.parents[0])
+            if value == -1:
+                return -1
+            chance += value
+
+            value = self.name_match(p1.parents[1], p2.parents[1])
+            if value == -1:
+                return -1
+            chance += value
+
+        female = p1.gender == Person.FEMALE
+        for f1 in p1.families:
+            for f2 in p2.families:
+                if female:
+                    # compare the fathers
+                    id1, name1, id2, name2 = f1[0], f1[1], f2[0], f2[1]
+                else:
+                    # compare the mothers
+                    id1, name1, id2, name2 = f1[2], f1[3], f2[2], f2[3]
+                if id1 and id2:
+                    if id1 == id2:
+                        chance += 1
+                    else:
+                        value = self.name_match(name1, name2)
+                        if value != -1:
+                            chance += value
+        return chance
+
+    def date_match(self, date1, date2):
+        if date1 is None or date2 is None:
+            return 0
+        if date1[0] == date2[0]:
+            return 1
+
+        if date1[1] or date2[1]:
+            return self.range_compare(date1, date2)
+
+        if date1[2] == date2[2]:
+            if date1[3] == date2[3]:
+                return 0.75
+            if not date1[4] or not date2[4]:
+                return 0.75
+            else:
+                return -1
+        else:
+            return -1
+
+    def range_compare(self, date1, date2):
+        start_date_1 = date1[5]
+        start_date_2 = date2[5]
+        stop_date_1 = date1[6]
+        stop_date_2 = date2[6]
+        if date1[1] and date2[1]:
+            if (start_date_2 <= start_date_1 <= stop_date_2 or
+                start_date_1 <= start_date_2 <= stop_date_1 or
+                start_date_2 <= stop_date_1 <= stop_date_2 or
+                start_date_1 <= stop_date_2 <= stop_date_1):
+                return 0.5
+            else:
+                return -1
+        elif date2[1]:
+            if start_date_2 <= start_date_1 <= stop_date_2:
+                return 0.5
+            else:
+                return -1
+        else:
+            if start_date_1 <= start_date_2 <= stop_date_1:
+                return 0.5
+            else:
+                return -1
+
+    def name_match(self, name, name1):
+
+        if not name1 or not name:
+            return 0
+
+        srn1, sfx1, first1 = name
+        srn2, sfx2, first2 = name1
+
+        if not self.name_compare(srn1, srn2):
+            return -1
+        if sfx1 != sfx2:
+            if sfx1 != "" and sfx2 != "":
+                return -1
+
+        if first1 == first2:
+            return 1
+        else:
+            list1 = first1.split()
+            list2 = first2.split()
+
+            if len(list1) < len(list2):
+                return self.list_reduce(list1, list2)
+            else:
+                return self.list_reduce(list2, list1)
+
+    def place_match(self, place1, place2):
+        p1_id, name1 = place1
+        p2_id, name2 = place2
+        if p1_id == p2_id:
+            return 1
+
+        if not (name1 and name2):
+            return 0
+        if name1 == name2:
+            return 1
+
+        list1 = name1.replace(","," ").split()
+        list2 = name2.replace(","," ").split()
+
+        value = 0
+        for name in list1:
+            for name2 in list2:
+                if name == name2:
+                    value += 0.5
+                elif name[0] == name2[0] and self.name_compare(name, name2):
+                    value += 0.25
+        return min(value,1) if value else -1
+
+    def list_reduce(self, list1, list2):
+        value = 0
+        for name in list1:
+            for name2 in list2:
+                if is_initial(name) and name[0] == name2[0]:
+                    value += 0.25
+                elif is_initial(name2) and name2[0] == name[0]:
+                    value += 0.25
+                elif name == name2:
+                    value += 0.5
+                elif name[0] == name2[0] and self.name_compare(name, name2):
+                    value += 0.25
+        return min(value,1) if value else -1
+
+#-------------------------------------------------------------------------
+#
+# Blocking
+#
+#-------------------------------------------------------------------------
+class Blocks(object):
+    """
+    Index of people by blocking keys, to find the people that a person can
+    get a positive score with.
+    """
+
+    def __init__(self, features, comparator):
+        # (sex group, surname key, given name initial) -> birth year or
+        # None -> indexes of people, in order
+        self.blocks = {}
+        self.keys = []
+        for index, person in enumerate(features):
+            keys = self.__keys(person, comparator)
+            self.keys.append(keys)
+            year = self.__year(person)
+            for key in keys:
+                years = self.blocks.setdefault(key, {})
+                years.setdefault(year, []).append(index)
+
+    @staticmethod
+    def __keys(person, comparator):
+        surnames, suffix, first_name = person.name
+        group = (person.gender == Person.MALE,
+                 comparator.gen_key(surnames))
+        # the names score -1 unless the given names are the same, or share
+        # an initial
+        initials = set(token[0] for token in first_name.split())
+        if not initials:
+            initials = set([None])
+        return [group + (initial, ) for initial in initials]
+
+    @staticmethod
+    def __year(person):
+        """
+        The birth year, or None if the birth date matches dates of any
+        year.
+        """
+        birth = person.birth
+        if birth is None or birth[1] or birth[0][0] == 'text':
+            return None
+        return birth[2]
+
+    def candidates(self, index, features):
+        """
+        Return the indexes of the people a person can get a positive score
+        with, in order.
+        """
+        year = self.__year(features[index])
+        found = set()
+        for key in self.keys[index]:
+            years = self.blocks.get(key, {})
+            if year is None:
+                for indexes in years.values():
+                    found.update(indexes)
+            else:
+                found.update(years.get(year, ()))
+                found.update(years.get(None, ()))
+        found.discard(index)
+        return sorted(found)
+
+#-------------------------------------------------------------------------
+#
+# Scoring in worker processes
+#
+#-------------------------------------------------------------------------
+_WORKER = {}
+
+def _init_worker(features, blocks, comparator, threshold):
+    _WORKER['features'] = features
+    _WORKER['blocks'] = blocks
+    _WORKER['comparator'] = comparator
+    _WORKER['threshold'] = threshold
+
+def _score_people(indexes):
+    """
+    Return (index, [(index2, chance), ...]) for the given people, with the
+    pairs that score at least the threshold.
+    """
+    return [_score_person(index, _WORKER['features'], _WORKER['blocks'],
+                          _WORKER['comparator'], _WORKER['threshold'])
+            for index in indexes]
+
+def _score_person(index, features, blocks, comparator, threshold):
+    p1 = features[index]
+    matches = []
+    for index2 in blocks.candidates(index, features):
+        p2 = features[index2]
+        chance = comparator.compare_features(p1, p2)
+        if chance >= threshold:
+            # the ancestor test is only needed for the pairs that count
+            if (comparator.is_ancestor(p2.handle, p1.handle) or
+                    comparator.is_ancestor(p1.handle, p2.handle)):
+                continue
+            matches.append((index2, chance))
+    return index, matches
+
+def find_duplicates(db, threshold, use_soundex=True, processes=None,
+                    callback=None):
+    """
+    Return a dictionary of the people of db that are possibly the same as
+    another person, to (handle of the other person, score), with a score of
+    at least threshold.
+
+    :param processes: number of worker processes scoring pairs, default the
+        number of CPUs. With 1, or few people, the pairs are scored in this
+        process. The workers are forked, so a GTK application must pass 1.
+    :param callback: called with a pass number (1 or 2) and the number of
+        steps at the start of a pass, and without arguments for each step.
+    """
+    if callback:
+        callback(1, db.get_number_of_people())
+    features, parents = get_features(db, callback)
+    comparator = Comparator(use_soundex, parents)
+    blocks = Blocks(features, comparator)
+
+    if callback:
+        callback(2, len(features))
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes > 1 and len(features) >= _MIN_PARALLEL:
+        chunks = [range(start, min(start + _CHUNK_SIZE, len(features)))
+                  for start in range(0, len(features), _CHUNK_SIZE)]
+        pool = multiprocessing.Pool(processes, _init_worker,
+                                    (features, blocks, comparator, threshold))
+        try:
+            scores = {}
+            for results in pool.imap_unordered(_score_people, chunks):
+                for index, matches in results:
+                    if callback:
+                        callback()
+                    scores[index] = matches
+        except:
+            pool.terminate()
+            pool.join()
+            raise
+        pool.close()
+        pool.join()
+        scores = [scores[index] for index in range(len(features))]
+    else:
+        scores = []
+        for index in range(len(features)):
+            if callback:
+                callback()
+            scores.append(_score_person(index, features, blocks, comparator,
+                                        threshold)[1])
+
+    # in the order of the people, keep one match for each person
+    the_map = {}
+    for index, matches in enumerate(scores):
+        p1key = features[index].handle
+        for index2, chance in matches:
+            p2key = features[index2].handle
+            if p2key in the_map:
+                (v, c) = the_map[p2key]
+                if v == p1key:
+                    continue
+            if p1key in the_map:
+                val = the_map[p1key]
+                if val[1] > chance:
+                    the_map[p1key] = (p2key, chance)
+            else:
+                the_map[p1key] = (p2key, chance)
+    return the_map
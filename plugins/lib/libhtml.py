@@ -37,11 +37,11 @@ from gramps.gen.constfunc import STRTYPE, cuni
 """
 HTML operations.
 
-This module exports the Html class
+This module exports the Html and HtmlFragment classes
 
 """
 
-__all__ = ['Html']
+__all__ = ['Html', 'HtmlFragment']
 
 #------------------------------------------------------------------------
 #
@@ -422,6 +422,23 @@ class Html(list):
                     item.write(method=method, indent=indent, tabs=tabs)
                 else:
                     method(cuni('%s%s' % (tabs, item)))  # else write the line
+#
+    def serialize(self, indent='\t', tabs=''):
+        """
+        Return what write outputs as one string, with a newline after each
+        item written. Writing this string at once is much faster than
+        writing each item with print.
+
+        :type  indent: string
+        :param indent: string to use for indentation. Default = '\t' (tab)
+        :type  tabs: string
+        :param tabs: starting indentation
+        :rtype: string
+        """
+        lines = []
+        self.write(method=lines.append, indent=indent, tabs=tabs)
+        lines.append('')
+        return '\n'.join(lines)
 #
     def addXML(self, version=1.0, encoding="UTF-8", standalone="no"):
         """
@@ -572,6 +589,49 @@ class Html(list):
     def __exit__(self, exc_type, exc_val, exc_tb):
         return exc_type is None
 
+#------------------------------------------------------------------------
+#
+# HtmlFragment
+#
+#------------------------------------------------------------------------
+class HtmlFragment(Html):
+    """
+    Stands for an Html object in a tree, and writes what the object writes.
+    The object is serialized once for each indentation, so that a block that
+    is the same on many pages is only serialized once. The object must not
+    be changed after the fragment is made.
+    """
+    def __init__(self, html):
+        """
+        :type  html: Html
+        :param html: the Html object the fragment stands for
+        """
+        list.__init__(self, [])
+        self.html = html
+        self.indent, self.close, self.inline = (html.indent, html.close,
+                                                html.inline)
+        self.__text = {}
+#
+    def __str__(self):
+        return self.html.__str__()
+#
+    def __iter__(self):
+        return iter(self.html)
+#
+    def write(self, method=print, indent='\t', tabs=''):
+        """
+        Output function: calls the supplied method once with the lines the
+        Html object writes, joined by newlines.
+        """
+        key = (indent, tabs)
+        text = self.__text.get(key)
+        if text is None:
+            lines = []
+            self.html.write(method=lines.append, indent=indent, tabs=tabs)
+            text = self.__text[key] = '\n'.join(lines) if lines else False
+        if text is not False:
+            method(text)
+
 #------------------------------------------------------------------------
 #
 # Functions
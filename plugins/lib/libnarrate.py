@@ -1395,6 +1395,61 @@ class Narrator(object):
         self.__get_date = nlocale.get_date
         self._locale = nlocale
 
+        # Memos for the run of a report: translated templates by template,
+        # narrated date and place of events by event handle, and place
+        # titles by place handle. Reports narrate the same events again and
+        # again, for the person and for the relatives of the person.
+        self.__templates = {}
+        self.__event_info = {}
+        self.__place_titles = {}
+
+    def __translate(self, template):
+        """
+        Return the translation of a template.
+        """
+        try:
+            return self.__templates[template]
+        except KeyError:
+            text = self.__templates[template] = self.__translate_text(template)
+            return text
+
+    def __get_place_title(self, place_handle):
+        """
+        Return the title of the place with place_handle.
+        """
+        try:
+            return self.__place_titles[place_handle]
+        except KeyError:
+            place = self.__db.get_place_from_handle(place_handle)
+            title = self.__place_titles[place_handle] = place.get_title()
+            return title
+
+    def __get_event_info(self, event):
+        """
+        Return (date, place, date_full, date_mod) for the narration of the
+        event: the date as text, or the year if full dates are not used;
+        the place title, or None if the event has no place; whether the date
+        has a valid day; and whether the date has a modifier.
+        """
+        try:
+            return self.__event_info[event.handle]
+        except KeyError:
+            pass
+        date_obj = event.get_date_object()
+        if self.__use_fulldate:
+            date = self.__get_date(date_obj)
+        else:
+            date = date_obj.get_year()
+        place_handle = event.get_place_handle()
+        if place_handle:
+            place = self.__get_place_title(place_handle)
+        else:
+            place = None
+        info = (date, place, date_obj.get_day_valid(),
+                date_obj.get_modifier() != Date.MOD_NONE)
+        self.__event_info[event.handle] = info
+        return info
+
     def set_subject(self, person):
         """
         Start a new story about this person. The person's first name will be 
@@ -1442,18 +1497,10 @@ class Narrator(object):
         if birth_ref and birth_ref.ref:
             birth_event = self.__db.get_event_from_handle(birth_ref.ref)
             if birth_event:
-                if self.__use_fulldate :
-                    bdate = self.__get_date(birth_event.get_date_object())
-                else:
-                    bdate = birth_event.get_date_object().get_year()
-                bplace_handle = birth_event.get_place_handle()
-                if bplace_handle:
-                    place = self.__db.get_place_from_handle(bplace_handle)
-                    bplace = place.get_title()
-                bdate_obj = birth_event.get_date_object()
-                bdate_full = bdate_obj and bdate_obj.get_day_valid()
-                bdate_mod = bdate_obj and \
-                            bdate_obj.get_modifier() != Date.MOD_NONE
+                (bdate, place, bdate_full,
+                    bdate_mod) = self.__get_event_info(birth_event)
+                if place is not None:
+                    bplace = place
     
         value_map = {
             'name'                : self.__first_name, 
@@ -1505,7 +1552,7 @@ class Narrator(object):
                 text = ""
         
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
                 
             if birth_event:
                 text = text.rstrip(". ")
@@ -1551,18 +1598,10 @@ class Narrator(object):
         if death_ref and death_ref.ref:
             death_event = self.__db.get_event_from_handle(death_ref.ref)
             if death_event:
-                if self.__use_fulldate :
-                    ddate = self.__get_date(death_event.get_date_object())
-                else:
-                    ddate = death_event.get_date_object().get_year()
-                dplace_handle = death_event.get_place_handle()
-                if dplace_handle:
-                    place = self.__db.get_place_from_handle(dplace_handle)
-                    dplace = place.get_title()
-                ddate_obj = death_event.get_date_object()
-                ddate_full = ddate_obj and ddate_obj.get_day_valid()
-                ddate_mod = ddate_obj and \
-                            ddate_obj.get_modifier() != Date.MOD_NONE
+                (ddate, place, ddate_full,
+                    ddate_mod) = self.__get_event_info(death_event)
+                if place is not None:
+                    dplace = place
         
         if include_age:   
             age, age_index = self.__get_age_at_death()
@@ -1621,7 +1660,7 @@ class Narrator(object):
             text = died_no_date_no_place[2][age_index]
         
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
                 
             if death_event:
                 text = text.rstrip(". ")
@@ -1670,17 +1709,10 @@ class Narrator(object):
                 break
     
         if burial:
-            if self.__use_fulldate :
-                bdate = self.__get_date(burial.get_date_object())
-            else:
-                bdate = burial.get_date_object().get_year()
-            bplace_handle = burial.get_place_handle()
-            if bplace_handle:
-                place = self.__db.get_place_from_handle(bplace_handle)
-                bplace = place.get_title()
-            bdate_obj = burial.get_date_object()
-            bdate_full = bdate_obj and bdate_obj.get_day_valid()
-            bdate_mod = bdate_obj and bdate_obj.get_modifier() != Date.MOD_NONE
+            (bdate, place, bdate_full,
+                bdate_mod) = self.__get_event_info(burial)
+            if place is not None:
+                bplace = place
         else:
             return text
     
@@ -1736,7 +1768,7 @@ class Narrator(object):
             text = buried_no_date_no_place['succinct']
             
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
             text = text + " "
             
         return text
@@ -1780,17 +1812,10 @@ class Narrator(object):
                 break
     
         if baptism:
-            if self.__use_fulldate :
-                bdate = self.__get_date(baptism.get_date_object())
-            else:
-                bdate = baptism.get_date_object().get_year()
-            bplace_handle = baptism.get_place_handle()
-            if bplace_handle:
-                place = self.__db.get_place_from_handle(bplace_handle)
-                bplace = place.get_title()
-            bdate_obj = baptism.get_date_object()
-            bdate_full = bdate_obj and bdate_obj.get_day_valid()
-            bdate_mod = bdate_obj and bdate_obj.get_modifier() != Date.MOD_NONE
+            (bdate, place, bdate_full,
+                bdate_mod) = self.__get_event_info(baptism)
+            if place is not None:
+                bplace = place
         else:
             return text
     
@@ -1846,7 +1871,7 @@ class Narrator(object):
             text = baptised_no_date_no_place['succinct']
         
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
             text = text + " "
             
         return text
@@ -1890,17 +1915,10 @@ class Narrator(object):
                 break
     
         if christening:
-             if self.__use_fulldate :
-                cdate = self.__get_date(christening.get_date_object())
-             else:
-                cdate = christening.get_date_object().get_year()
-             cplace_handle = christening.get_place_handle()
-             if cplace_handle:
-                place = self.__db.get_place_from_handle(cplace_handle)
-                cplace = place.get_title()
-             cdate_obj = christening.get_date_object()
-             cdate_full = cdate_obj and cdate_obj.get_day_valid()
-             cdate_mod = cdate_obj and cdate_obj.get_modifier() != Date.MOD_NONE
+             (cdate, place, cdate_full,
+                 cdate_mod) = self.__get_event_info(christening)
+             if place is not None:
+                 cplace = place
         else:
             return text
     
@@ -1956,7 +1974,7 @@ class Narrator(object):
             text = christened_no_date_no_place['succinct']
             
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
             text = text + " "
             
         return text
@@ -1999,16 +2017,11 @@ class Narrator(object):
             spouse_name = self.__translate_text("Unknown") # not: _("Unknown")
 
         if event:
-            if self.__use_fulldate :
-                mdate = self.__get_date(event.get_date_object())
-            else:
-                mdate = event.get_date_object().get_year()
+            mdate, place_title = self.__get_event_info(event)[:2]
             if mdate:
                 date = mdate
-            place_handle = event.get_place_handle()
-            if place_handle:
-                place_obj = self.__db.get_place_from_handle(place_handle)
-                place = place_obj.get_title()
+            if place_title is not None:
+                place = place_title
         relationship = family.get_relationship()
     
         value_map = {
@@ -2161,7 +2174,7 @@ class Narrator(object):
                     text = relationship_also_only['succinct']
     
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
             text = text + " "
         return text
 
@@ -2216,7 +2229,7 @@ class Narrator(object):
             text = child_father[gender][2]
             
         if text:
-            text = self.__translate_text(text) % value_map
+            text = self.__translate(text) % value_map
             text = text + " "
             
         return text
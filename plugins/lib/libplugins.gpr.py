@@ -162,6 +162,60 @@ authors_email = ["gerald.britton@gmail.com"],
 #load_on_reg = True
   )
 
+#------------------------------------------------------------------------
+#
+# libduplicates
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libduplicates',
+name  = "duplicates lib",
+description =  _("Finds people that are possibly the same person.") ,
+version = '1.0',
+gramps_target_version = '4.1',
+status = STABLE,
+fname = 'libduplicates.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+#load_on_reg = True
+  )
+
+#------------------------------------------------------------------------
+#
+# libsynthetic
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libsynthetic',
+name  = "synthetic tree lib",
+description =  _("Generates large synthetic family trees.") ,
+version = '1.0',
+gramps_target_version = '4.1',
+status = STABLE,
+fname = 'libsynthetic.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+#load_on_reg = True
+  )
+
+#------------------------------------------------------------------------
+#
+# libwebmedia
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libwebmedia',
+name  = "web media lib",
+description =  _("Keeps the media files of the web reports up to date.") ,
+version = '1.0',
+gramps_target_version = '4.1',
+status = STABLE,
+fname = 'libwebmedia.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+#load_on_reg = True
+  )
+
 #------------------------------------------------------------------------
 #
 # libmapservice
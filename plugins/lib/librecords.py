@@ -35,10 +35,11 @@ import datetime
 #------------------------------------------------------------------------
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
-from gramps.gen.lib import (ChildRefType, Date, Span, Name, StyledText, 
-                            StyledTextTag, StyledTextTagType)
+from gramps.gen.lib import (ChildRefType, Date, Person, Span, Name, 
+                            StyledText, StyledTextTag, StyledTextTagType)
 from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.utils.alive import probably_alive
+from gramps.gen.utils.facts import get_person_facts
 
 #------------------------------------------------------------------------
 #
@@ -77,19 +78,6 @@ RECORDS = [
 def _good_date(date):
     return (date is not None and date.is_valid())
 
-def _find_death_date(db, person):
-    death_ref = person.get_death_ref()
-    if death_ref:
-        death = db.get_event_from_handle(death_ref.ref)
-        return death.get_date_object()
-    else:
-        event_list = person.get_primary_event_ref_list()
-        for event_ref in event_list:
-            event = db.get_event_from_handle(event_ref.ref)
-            if event.get_type().is_death_fallback():
-                return event.get_date_object()
-    return None
-
 def find_records(db, filter, top_size, callname,
                  trans_text=glocale.translation.sgettext):
     """
@@ -115,30 +103,35 @@ def find_records(db, filter, top_size, callname,
     person_oldestfather = []
     person_oldestmother = []
 
-    person_handle_list = db.iter_person_handles()
+    # birth, death, marriage and children data of everybody, in one go
+    facts = get_person_facts(db)
 
     if filter:
-        person_handle_list = filter.apply(db, person_handle_list)
-
-    for person_handle in person_handle_list:
-        person = db.get_person_from_handle(person_handle)
-
-        # FIXME this should check for a "fallback" birth also/instead
-        birth_ref = person.get_birth_ref()
+        # the filter loads the people anyway, keep them
+        people = list(filter.apply_objects(db, db.iter_person_handles()))
+        # the families are restricted to the same people
+        filtered = set(person_handle for (person_handle, person) in people)
+    else:
+        people = ((person_handle, None)
+                  for person_handle in db.iter_person_handles())
 
-        if not birth_ref:
-            # No birth event, so we can't calculate any age.
+    for person_handle, person in people:
+        index = facts.index.get(person_handle)
+        if index is None:
             continue
 
-        birth = db.get_event_from_handle(birth_ref.ref)
-        birth_date = birth.get_date_object()
-
-        death_date = _find_death_date(db, person)
+        # FIXME this should check for a "fallback" birth also/instead
+        birth_date = facts.birth[index]
 
         if not _good_date(birth_date):
-            # Birth date unknown or incomplete, so we can't calculate any age.
+            # No birth event, or birth date unknown or incomplete, so we 
+            # can't calculate any age.
             continue
 
+        death_date = facts.death_fallback[index]
+
+        if person is None:
+            person = db.get_person_from_handle(person_handle)
         name = _get_styled_primary_name(person, callname)
 
         if death_date is None:
@@ -153,21 +146,14 @@ def find_records(db, filter, top_size, callname,
                     death_date - birth_date, name, 'Person', person_handle,
                     top_size)
 
-        for family_handle in person.get_family_handle_list():
-            family = db.get_family_from_handle(family_handle)
-
-            marriage_date = None
-            divorce_date = None
-            for event_ref in family.get_event_ref_list():
-                event = db.get_event_from_handle(event_ref.ref)
-                if (event.get_type().is_marriage() and 
-                    (event_ref.get_role().is_family() or 
-                     event_ref.get_role().is_primary())):
-                    marriage_date = event.get_date_object()
-                elif (event.get_type().is_divorce() and 
-                      (event_ref.get_role().is_family() or 
-                       event_ref.get_role().is_primary())):
-                    divorce_date = event.get_date_object()
+        gender = facts.gender[index]
+        for family_handle in facts.families[index]:
+            family = facts.family_index.get(family_handle)
+            if family is None:
+                continue
+
+            marriage_date = facts.marriage[family]
+            divorce_date = facts.divorce[family]
 
             if _good_date(marriage_date):
                 _record(person_youngestmarried, person_oldestmarried,
@@ -179,34 +165,28 @@ def find_records(db, filter, top_size, callname,
                         divorce_date - birth_date,
                         name, 'Person', person_handle, top_size)
 
-            for child_ref in family.get_child_ref_list():
-                if person.get_gender() == person.MALE:
-                    relation = child_ref.get_father_relation()
-                elif person.get_gender() == person.FEMALE:
-                    relation = child_ref.get_mother_relation()
+            for child, father_relation, mother_relation in \
+                    facts.children[family]:
+                if gender == Person.MALE:
+                    relation = father_relation
+                elif gender == Person.FEMALE:
+                    relation = mother_relation
                 else:
                     continue
                 if relation != ChildRefType.BIRTH:
                     continue
 
-                child = db.get_person_from_handle(child_ref.ref)
-
                 # FIXME this should check for a "fallback" birth also/instead
-                child_birth_ref = child.get_birth_ref()
-                if not child_birth_ref:
-                    continue
-
-                child_birth = db.get_event_from_handle(child_birth_ref.ref)
-                child_birth_date = child_birth.get_date_object()
+                child_birth_date = facts.birth[child]
 
                 if not _good_date(child_birth_date):
                     continue
 
-                if person.get_gender() == person.MALE:
+                if gender == Person.MALE:
                     _record(person_youngestfather, person_oldestfather,
                             child_birth_date - birth_date,
                             name, 'Person', person_handle, top_size)
-                elif person.get_gender() == person.FEMALE:
+                elif gender == Person.FEMALE:
                     _record(person_youngestmother, person_oldestmother,
                             child_birth_date - birth_date,
                             name, 'Person', person_handle, top_size)
@@ -219,19 +199,20 @@ def find_records(db, filter, top_size, callname,
     family_shortest = []
     family_longest = []
 
-    for family in db.iter_families():
-        #family = db.get_family_from_handle(family_handle)
-
-        father_handle = family.get_father_handle()
-        if not father_handle:
+    for family, family_handle in enumerate(facts.family_handles):
+        father_index = facts.father[family]
+        if father_index < 0:
             continue
-        mother_handle = family.get_mother_handle()
-        if not mother_handle:
+        mother_index = facts.mother[family]
+        if mother_index < 0:
             continue
+        father_handle = facts.handles[father_index]
+        mother_handle = facts.handles[mother_index]
 
         # Test if either father or mother are in filter
         if filter:
-            if not filter.apply(db, [father_handle, mother_handle]):
+            if (father_handle not in filtered and 
+                    mother_handle not in filtered):
                 continue
 
         father = db.get_person_from_handle(father_handle)
@@ -242,32 +223,21 @@ def find_records(db, filter, top_size, callname,
                 'mother': _get_styled_primary_name(mother, callname)}
 
         _record(None, family_mostchildren,
-                len(family.get_child_ref_list()),
-                name, 'Family', family.handle, top_size)
-
-        marriage_date = None
-        divorce = None
-        divorce_date = None
-        for event_ref in family.get_event_ref_list():
-            event = db.get_event_from_handle(event_ref.ref)
-            if (event.get_type().is_marriage() and 
-                (event_ref.get_role().is_family() or 
-                 event_ref.get_role().is_primary())):
-                marriage_date = event.get_date_object()
-            if (event and event.get_type().is_divorce() and 
-                (event_ref.get_role().is_family() or 
-                 event_ref.get_role().is_primary())):
-                divorce = event
-                divorce_date = event.get_date_object()
-
-        father_death_date = _find_death_date(db, father)
-        mother_death_date = _find_death_date(db, mother)
+                len(facts.children[family]),
+                name, 'Family', family_handle, top_size)
+
+        marriage_date = facts.marriage[family]
+        # the divorce date is None only without divorce event
+        divorce_date = facts.divorce[family]
+
+        father_death_date = facts.death_fallback[father_index]
+        mother_death_date = facts.death_fallback[mother_index]
 
         if not _good_date(marriage_date):
             # Not married or marriage date unknown
             continue
 
-        if divorce is not None and not _good_date(divorce_date):
+        if divorce_date is not None and not _good_date(divorce_date):
             # Divorced but date unknown or inexact
             continue
 
@@ -286,7 +256,7 @@ def find_records(db, filter, top_size, callname,
             if probably_alive(father, db) and probably_alive(mother, db):
                 _record(family_youngestmarried, family_oldestmarried,
                         today_date - marriage_date,
-                        name, 'Family', family.handle, top_size)
+                        name, 'Family', family_handle, top_size)
         elif (_good_date(divorce_date) or 
               _good_date(father_death_date) or 
               _good_date(mother_death_date)):
@@ -305,7 +275,7 @@ def find_records(db, filter, top_size, callname,
             duration = end - marriage_date
 
             _record(family_shortest, family_longest,
-                    duration, name, 'Family', family.handle, top_size)
+                    duration, name, 'Family', family_handle, top_size)
     #python 3 workaround: assign locals to tmp so we work with runtime version
     tmp = locals()
     return [(trans_text(text), varname, tmp[varname]) 
@@ -0,0 +1,456 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Generate large synthetic family trees, for instance for benchmarks.
+
+The tree is made generation by generation: most people of a generation
+marry, mostly people that marry in, and the children of their families form
+the next generation.
+Events, places, sources, citations and media references are added with
+configurable rates. The same seed and parameters give the same tree,
+handles included, when it is generated into an empty database.
+
+All objects are added in one batch transaction, a person and a family are
+only written when they are complete.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import random
+
+#-------------------------------------------------------------------------
+#
+# GRAMPS modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+_ = glocale.translation.gettext
+from gramps.gen.lib import (ChildRef, Citation, Date, Event, EventRef,
+                            EventType, Family, FamilyRelType, MediaObject,
+                            MediaRef, Name, Person, Place, PlaceRef,
+                            PlaceType, RepoRef, Repository, RepositoryType,
+                            Source, Surname)
+from gramps.gen.db import DbTxn
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+_MALE_NAMES = ("John", "William", "James", "George", "Charles", "Thomas",
+               "Henry", "Joseph", "Robert", "Edward", "Samuel", "David",
+               "Richard", "Peter", "Frederick", "Arthur", "Albert", "Walter",
+               "Francis", "Daniel", "Jacob", "Isaac", "Martin", "Paul",
+               "Johann", "Pierre", "Jan", "Karl", "Anders", "Lars")
+_FEMALE_NAMES = ("Mary", "Elizabeth", "Sarah", "Anna", "Margaret", "Ann",
+                 "Jane", "Catherine", "Emma", "Alice", "Ellen", "Martha",
+                 "Susan", "Hannah", "Eliza", "Harriet", "Louisa", "Clara",
+                 "Rose", "Agnes", "Maria", "Johanna", "Marie", "Anne",
+                 "Kristina", "Ingrid", "Sophie", "Helena", "Julia", "Ruth")
+_SYLLABLES = ("an", "ber", "bro", "car", "da", "den", "el", "fal", "gar",
+              "ham", "har", "ken", "lan", "ley", "mar", "mil", "nor", "ol",
+              "par", "ren", "ros", "sel", "ston", "ter", "ton", "val", "wel",
+              "win", "wood", "yor")
+_OTHER_EVENTS = (EventType.BAPTISM, EventType.CENSUS, EventType.RESIDENCE,
+                 EventType.OCCUPATION, EventType.EDUCATION,
+                 EventType.IMMIGRATION, EventType.MILITARY_SERV,
+                 EventType.RELIGION)
+_OCCUPATIONS = ("farmer", "labourer", "miner", "weaver", "clerk", "teacher",
+                "smith", "carpenter", "servant", "merchant")
+
+# the last year of the generated events
+_LAST_YEAR = 2010
+# average years between the births of two generations
+_GENERATION_YEARS = 35
+
+#-------------------------------------------------------------------------
+#
+# TreeGenerator
+#
+#-------------------------------------------------------------------------
+class TreeGenerator(object):
+    """
+    Add a synthetic family tree to a database.
+    """
+
+    def __init__(self, db, seed=0, generations=10, events=2, places=0,
+                 citations=50, media=10):
+        """
+        @param: db -- the database, best empty
+        @param: seed -- the seed of the random numbers
+        @param: generations -- the number of generations
+        @param: events -- the average number of events of a person, besides
+            birth, death and burial
+        @param: places -- the number of places, 0 for one per 20 people
+        @param: citations -- the percentage of events with a citation
+        @param: media -- the percentage of people with a media reference
+        """
+        self.db = db
+        self.rng = random.Random(seed)
+        self.generations = max(1, generations)
+        self.events = max(0, events)
+        self.places = places
+        self.citations = citations
+        self.media = media
+
+        self.trans = None
+        self.surnames = []
+        self.place_handles = []
+        self.source_handles = []
+        self.media_handles = []
+        self.callback = None
+
+    def generate(self, person_count, callback=None):
+        """
+        Add about person_count people, with their families and other
+        objects.
+
+        @param: callback -- called once for every person added
+        @returns: the number of people added
+        """
+        self.callback = callback
+        rng = self.rng
+        per_generation = max(2, -(-person_count // self.generations))
+        year = _LAST_YEAR - 20 - _GENERATION_YEARS * self.generations
+
+        with DbTxn(_("Generate a synthetic tree"), self.db,
+                   batch=True) as self.trans:
+            self.db.disable_signals()
+            self.make_surnames(person_count)
+            self.make_places(self.places or person_count // 20 + 1)
+            self.make_sources(person_count // 200 + 1)
+            self.make_media(person_count // 50 + 1)
+
+            count = min(per_generation, person_count)
+            generation = [self.new_person(year + rng.randint(0, 20))
+                          for index in range(count)]
+            added = count
+            while added < person_count:
+                families, spouses = self.marry(generation,
+                                               person_count - added)
+                generation.extend(spouses)
+                added += len(spouses)
+                if not families:
+                    break
+                # about a third of the people of a generation married in
+                count = min(max(1, per_generation * 2 // 3),
+                            person_count - added)
+                children = []
+                for index in range(count):
+                    children.append(self.add_child(rng.choice(families)))
+                for item in generation:
+                    self.add_person(item)
+                for family in families:
+                    self.db.add_family(family[0], self.trans)
+                generation = children
+                added += count
+            for item in generation:
+                self.add_person(item)
+        self.db.enable_signals()
+        self.db.request_rebuild()
+        return added
+
+    def new_handle(self):
+        """
+        Return a new handle, made from the random numbers of the generator.
+        """
+        return "%08x%08x" % (self.rng.randint(0, 0xffffffff),
+                             self.rng.randint(0, 0xffffffff))
+
+    def pick(self, items):
+        """
+        Return an item of items, the first ones more often than the last.
+        """
+        return items[int(len(items) * self.rng.random() ** 2)]
+
+    def rand_word(self, syllables=2):
+        """
+        Return a made up capitalized word.
+        """
+        return "".join(self.rng.choice(_SYLLABLES)
+                       for index in range(syllables)).capitalize()
+
+    def rand_date(self, year, day=True):
+        """
+        Return a date in year, now and then an estimated or approximate one.
+        """
+        date = Date()
+        chance = self.rng.random()
+        if chance < 0.1:
+            date.set(Date.QUAL_ESTIMATED, Date.MOD_NONE, Date.CAL_GREGORIAN,
+                     (0, 0, year, False), "")
+        elif chance < 0.2:
+            date.set(Date.QUAL_NONE, Date.MOD_ABOUT, Date.CAL_GREGORIAN,
+                     (0, 0, year, False), "")
+        elif day:
+            date.set(Date.QUAL_NONE, Date.MOD_NONE, Date.CAL_GREGORIAN,
+                     (self.rng.randint(1, 28), self.rng.randint(1, 12),
+                      year, False), "")
+        else:
+            date.set(Date.QUAL_NONE, Date.MOD_NONE, Date.CAL_GREGORIAN,
+                     (0, self.rng.randint(1, 12), year, False), "")
+        return date
+
+    def make_surnames(self, person_count):
+        """
+        Make the surnames of the founders.
+        """
+        count = max(20, person_count // 50)
+        self.surnames = sorted(set(self.rand_word(self.rng.randint(1, 3))
+                                   for index in range(count)))
+
+    def make_places(self, count):
+        """
+        Add count places: countries, counties in a country and cities in a
+        county.
+        """
+        countries = []
+        counties = []
+        for index in range(count):
+            place = Place()
+            place.set_handle(self.new_handle())
+            name = self.rand_word(self.rng.randint(2, 3))
+            if len(countries) < max(1, count // 200):
+                place_type, parent = PlaceType.COUNTRY, None
+                title = name
+                countries.append((place.get_handle(), title))
+            else:
+                if len(counties) < max(1, count // 20):
+                    place_type, parents = PlaceType.COUNTY, countries
+                else:
+                    place_type, parents = PlaceType.CITY, counties
+                parent, parent_title = self.rng.choice(parents)
+                title = "%s, %s" % (name, parent_title)
+                if place_type == PlaceType.COUNTY:
+                    counties.append((place.get_handle(), title))
+                else:
+                    self.place_handles.append(place.get_handle())
+            place.set_type(place_type)
+            place.set_name(name)
+            place.set_title(title)
+            if parent is not None:
+                placeref = PlaceRef()
+                placeref.ref = parent
+                place.add_placeref(placeref)
+            self.db.add_place(place, self.trans)
+        if not self.place_handles:
+            # too few places for cities
+            self.place_handles = [handle for (handle, title)
+                                  in counties + countries]
+
+    def make_sources(self, count):
+        """
+        Add count sources, kept in a few repositories.
+        """
+        repositories = []
+        for index in range(count // 10 + 1):
+            repository = Repository()
+            repository.set_handle(self.new_handle())
+            repository.set_type(RepositoryType.ARCHIVE)
+            repository.set_name("%s Archives" % self.rand_word())
+            self.db.add_repository(repository, self.trans)
+            repositories.append(repository.get_handle())
+        for index in range(count):
+            source = Source()
+            source.set_handle(self.new_handle())
+            source.set_title("%s %s" % (self.rand_word(),
+                                        self.rng.choice(("Parish Register",
+                                                         "Census",
+                                                         "Civil Register",
+                                                         "Family Bible"))))
+            reporef = RepoRef()
+            reporef.set_reference_handle(self.rng.choice(repositories))
+            source.add_repo_reference(reporef)
+            self.db.add_source(source, self.trans)
+            self.source_handles.append(source.get_handle())
+
+    def make_media(self, count):
+        """
+        Add count media objects.
+        """
+        for index in range(count):
+            media = MediaObject()
+            media.set_handle(self.new_handle())
+            media.set_path("media/%06d.jpg" % index)
+            media.set_mime_type("image/jpeg")
+            media.set_description(self.rand_word(3))
+            self.db.add_object(media, self.trans)
+            self.media_handles.append(media.get_handle())
+
+    def add_event(self, event_type, year, description=""):
+        """
+        Add an event in year, return an EventRef to it.
+        """
+        event = Event()
+        event.set_handle(self.new_handle())
+        event.set_type(event_type)
+        event.set_date_object(self.rand_date(year))
+        event.set_description(description)
+        if self.rng.random() < 0.9:
+            event.set_place_handle(self.pick(self.place_handles))
+        if self.rng.randint(1, 100) <= self.citations:
+            citation = Citation()
+            citation.set_handle(self.new_handle())
+            citation.set_reference_handle(self.pick(self.source_handles))
+            citation.set_page("p. %d" % self.rng.randint(1, 500))
+            citation.set_confidence_level(self.rng.randint(0, 4))
+            self.db.add_citation(citation, self.trans)
+            event.add_citation(citation.get_handle())
+        self.db.add_event(event, self.trans)
+        event_ref = EventRef()
+        event_ref.set_reference_handle(event.get_handle())
+        return event_ref
+
+    def new_person(self, birth_year, surname=None, gender=None):
+        """
+        Return a new person, born in birth_year, that is not added yet.
+        The person is kept as a list of the Person and the birth year and
+        latest year it must live to.
+        """
+        person = Person()
+        person.set_handle(self.new_handle())
+        if gender is None:
+            gender = self.rng.choice((Person.MALE, Person.FEMALE))
+            if self.rng.random() < 0.01:
+                gender = Person.UNKNOWN
+        person.set_gender(gender)
+        name = Name()
+        if gender == Person.FEMALE:
+            name.set_first_name(self.pick(_FEMALE_NAMES))
+        else:
+            name.set_first_name(self.pick(_MALE_NAMES))
+        if self.rng.random() < 0.3:
+            # a second given name
+            name.set_first_name("%s %s" % (name.get_first_name(),
+                                           self.pick(_MALE_NAMES
+                                                     if gender == Person.MALE
+                                                     else _FEMALE_NAMES)))
+        name_surname = Surname()
+        name_surname.set_surname(surname or self.pick(self.surnames))
+        name.add_surname(name_surname)
+        person.set_primary_name(name)
+        return [person, birth_year, birth_year]
+
+    def marry(self, generation, limit):
+        """
+        Make families of most people of generation. Most spouses are new
+        people, that married in, some are of generation.
+
+        @param: limit -- the largest number of new spouses
+        @returns: (list of (family, marriage year, husband, wife),
+                   list of the new spouses)
+        """
+        rng = self.rng
+        order = generation[:]
+        rng.shuffle(order)
+        single = dict((gender, [item for item in order
+                                if item[0].get_gender() == gender])
+                      for gender in (Person.MALE, Person.FEMALE))
+        married = set()
+        families = []
+        spouses = []
+        for item in order:
+            gender = item[0].get_gender()
+            if (gender == Person.UNKNOWN or id(item) in married or
+                    rng.random() > 0.7):
+                continue
+            other = Person.FEMALE if gender == Person.MALE else Person.MALE
+            spouse = None
+            if rng.random() < 0.1:
+                candidates = [candidate for candidate in single[other][-5:]
+                              if id(candidate) not in married]
+                if candidates:
+                    spouse = candidates[0]
+            if spouse is None:
+                if len(spouses) >= limit:
+                    continue
+                spouse = self.new_person(item[1] + rng.randint(-5, 5),
+                                         gender=other)
+                spouses.append(spouse)
+            married.add(id(item))
+            married.add(id(spouse))
+            if gender == Person.MALE:
+                husband, wife = item, spouse
+            else:
+                husband, wife = spouse, item
+            family = Family()
+            family.set_handle(self.new_handle())
+            family.set_relationship(FamilyRelType.MARRIED)
+            family.set_father_handle(husband[0].get_handle())
+            family.set_mother_handle(wife[0].get_handle())
+            year = max(husband[1], wife[1]) + rng.randint(18, 30)
+            if year <= _LAST_YEAR and rng.random() < 0.8:
+                family.add_event_ref(self.add_event(EventType.MARRIAGE, year))
+            for partner in (husband, wife):
+                partner[0].add_family_handle(family.get_handle())
+                partner[2] = max(partner[2], year)
+            families.append((family, year, husband, wife))
+        return families, spouses
+
+    def add_child(self, family):
+        """
+        Return a new child of family, a (family, marriage year, husband,
+        wife) tuple. The child is not added yet.
+        """
+        family, marriage_year, husband, wife = family
+        birth_year = min(marriage_year + self.rng.randint(0, 20), _LAST_YEAR)
+        surname = husband[0].get_primary_name().get_surname()
+        child = self.new_person(birth_year, surname)
+        child[0].add_parent_family_handle(family.get_handle())
+        child_ref = ChildRef()
+        child_ref.set_reference_handle(child[0].get_handle())
+        family.add_child_ref(child_ref)
+        for item in (husband, wife):
+            item[2] = max(item[2], birth_year)
+        return child
+
+    def add_person(self, item):
+        """
+        Add the events of a person made by new_person, and the person.
+        """
+        rng = self.rng
+        person, birth_year, latest_year = item
+        if rng.random() < 0.95:
+            person.set_birth_ref(self.add_event(EventType.BIRTH, birth_year))
+        death_year = max(latest_year,
+                         birth_year + int(abs(rng.gauss(60, 25))))
+        for index in range(rng.randint(0, 2 * self.events)):
+            event_type = rng.choice(_OTHER_EVENTS)
+            year = rng.randint(birth_year,
+                               max(birth_year, min(death_year, _LAST_YEAR)))
+            description = ""
+            if event_type == EventType.OCCUPATION:
+                description = rng.choice(_OCCUPATIONS)
+            person.add_event_ref(self.add_event(event_type, year,
+                                                description))
+        if death_year <= _LAST_YEAR:
+            person.set_death_ref(self.add_event(EventType.DEATH, death_year))
+            if rng.random() < 0.5:
+                person.add_event_ref(self.add_event(EventType.BURIAL,
+                                                    death_year))
+        if self.media_handles and rng.randint(1, 100) <= self.media:
+            media_ref = MediaRef()
+            media_ref.set_reference_handle(self.pick(self.media_handles))
+            person.add_media_reference(media_ref)
+        self.db.add_person(person, self.trans)
+        if self.callback:
+            self.callback()
@@ -0,0 +1,329 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Media files of the web reports.
+
+A :class:`MediaStore` keeps, in a manifest in the target directory, the key
+of every media file written there: a hash of the content of the source file
+and the parameters used to make it, such as the size of a thumbnail or the
+region of a crop. A file whose key did not change is not written again.
+"""
+
+#------------------------------------------------------------------------
+#
+# Python modules
+#
+#------------------------------------------------------------------------
+import os
+import sys
+import gzip
+import json
+import errno
+import shutil
+import hashlib
+import uuid
+
+#------------------------------------------------------------------------
+#
+# Set up logging
+#
+#------------------------------------------------------------------------
+import logging
+LOG = logging.getLogger(".libwebmedia")
+
+#------------------------------------------------------------------------
+#
+# Constants
+#
+#------------------------------------------------------------------------
+_MANIFEST = ".media-manifest.gz"
+_MANIFEST_VERSION = 1
+_CHUNK_SIZE = 1 << 16
+
+# ioctl of Linux to share the blocks of a file with another, on copy on
+# write file systems (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+# flags of the temporary files
+_TEMP_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_EXCL |
+               getattr(os, 'O_BINARY', 0))
+
+#------------------------------------------------------------------------
+#
+# Functions
+#
+#------------------------------------------------------------------------
+def _stat_key(path):
+    """
+    Return (size, mtime) of path, or None if it is not a file.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime]
+
+def _create_temp(destdir):
+    """
+    Create a new temporary file in destdir, with the permissions of a new
+    file: unlike with tempfile.mkstemp, the umask applies.
+
+    :returns: (file descriptor, name)
+    """
+    while True:
+        fname = os.path.join(destdir, ".tmp" + uuid.uuid4().hex[:12])
+        try:
+            return os.open(fname, _TEMP_FLAGS, 0o666), fname
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+
+def _reflink(src, dest):
+    """
+    Make dest a copy on write clone of src. Return False if the file system
+    does not support it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, 'rb') as src_file:
+        with open(dest, 'wb') as dest_file:
+            try:
+                fcntl.ioctl(dest_file.fileno(), _FICLONE, src_file.fileno())
+            except (IOError, OSError):
+                return False
+    return True
+
+#------------------------------------------------------------------------
+#
+# MediaStore
+#
+#------------------------------------------------------------------------
+class MediaStore(object):
+    """
+    The media files written to the target directory of a web report.
+
+    Files are written to a temporary name and renamed, so that a file is
+    never written through a hard link to a source file.
+    """
+
+    def __init__(self, html_dir, hardlink=False):
+        """
+        @param: html_dir -- the target directory
+        @param: hardlink -- if True, plain copies are hard links to the
+            source file, where the file system allows it. Otherwise they are
+            copy on write clones where possible, and copies elsewhere.
+        """
+        self.html_dir = html_dir
+        self.hardlink = hardlink and hasattr(os, 'link')
+        self.hashes = {}
+        self.outputs = {}
+        self.new_hashes = {}
+        self.new_outputs = {}
+        manifest = None
+        fname = os.path.join(html_dir, _MANIFEST)
+        if os.path.isfile(fname):
+            try:
+                with gzip.open(fname, 'rb') as manifest_file:
+                    manifest = json.loads(manifest_file.read().decode('utf-8'))
+            except (IOError, OSError, ValueError) as msg:
+                LOG.warning("Ignoring media manifest %s: %s", fname, msg)
+        if manifest and manifest.get('version') == _MANIFEST_VERSION:
+            self.hashes = manifest['hashes']
+            self.outputs = manifest['outputs']
+
+    def content_hash(self, src):
+        """
+        Return the hash of the content of the file src, or None if it is not
+        a file. The hash of a file is only computed again when its size or
+        modification time changed.
+        """
+        stat = _stat_key(src)
+        if stat is None:
+            return None
+        cached = self.hashes.get(src)
+        if cached is not None and cached[:2] == stat:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(src, 'rb') as src_file:
+            for chunk in iter(lambda: src_file.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        cached = stat + [digest.hexdigest()]
+        self.hashes[src] = self.new_hashes[src] = cached
+        return cached[2]
+
+    def key(self, src, params=None):
+        """
+        Return the key of a file made from src with params, a repr-able
+        value, or None if src is not a file.
+        """
+        content = self.content_hash(src)
+        if content is None:
+            return None
+        return "%s %r" % (content, params)
+
+    def is_current(self, dest, src, params=None):
+        """
+        Return True if the file dest, relative to the target directory, was
+        made from the current content of src with the same params, and was
+        not changed since.
+        """
+        key = self.key(src, params)
+        output = self.outputs.get(dest)
+        if key is None or output is None or output[0] != key:
+            return False
+        return _stat_key(os.path.join(self.html_dir, dest)) == output[1:]
+
+    def record(self, dest, src, params=None):
+        """
+        Record that the file dest, relative to the target directory, was
+        made from src with params.
+        """
+        key = self.key(src, params)
+        if key is None:
+            return
+        output = [key] + _stat_key(os.path.join(self.html_dir, dest))
+        self.outputs[dest] = self.new_outputs[dest] = output
+
+    def copy(self, src, dest, origin=None, params=None):
+        """
+        Copy the file src to dest, relative to the target directory, unless
+        it is current.
+
+        @param: origin -- the file dest is made from, if it is not src, for
+            instance the image of a thumbnail. The key of dest is that of
+            origin and params.
+        @returns: True if the file was written
+        """
+        if origin is None:
+            origin = src
+        if self.is_current(dest, origin, params):
+            return False
+        with self.open_temp(dest) as (temp, fname):
+            temp.close()
+            os.remove(fname)
+            if not (self.hardlink and origin == src and
+                    self._link(src, fname)):
+                if not _reflink(src, fname):
+                    shutil.copyfile(src, fname)
+        self.record(dest, origin, params)
+        return True
+
+    def write(self, data, dest, src, params=None):
+        """
+        Write data, made from src with params, to dest, relative to the
+        target directory.
+        """
+        with self.open_temp(dest) as (temp, fname):
+            temp.write(data)
+        self.record(dest, src, params)
+
+    def open_temp(self, dest):
+        """
+        Return a context manager giving a (file, name) pair of a temporary
+        file next to dest, relative to the target directory. The file is
+        renamed to dest when the block ends without an error.
+        """
+        return _TempFile(os.path.join(self.html_dir, dest))
+
+    def _link(self, src, dest):
+        """
+        Make dest a hard link to src, return False if that is not possible.
+        """
+        try:
+            os.link(src, dest)
+        except OSError:
+            return False
+        return True
+
+    def take_new(self):
+        """
+        Return the hashes and outputs recorded since the previous call, for
+        :meth:`update` of the store of another process.
+        """
+        new = (self.new_hashes, self.new_outputs)
+        self.new_hashes = {}
+        self.new_outputs = {}
+        return new
+
+    def update(self, new):
+        """
+        Add the hashes and outputs returned by :meth:`take_new`.
+        """
+        hashes, outputs = new
+        self.hashes.update(hashes)
+        self.outputs.update(outputs)
+
+    def save(self):
+        """
+        Write the manifest, forgetting the files that no longer exist.
+        """
+        outputs = dict((dest, output)
+                       for (dest, output) in self.outputs.items()
+                       if os.path.isfile(os.path.join(self.html_dir, dest)))
+        hashes = dict((src, cached) for (src, cached) in self.hashes.items()
+                      if os.path.isfile(src))
+        manifest = {
+            'version' : _MANIFEST_VERSION,
+            'hashes'  : hashes,
+            'outputs' : outputs,
+            }
+        fname = os.path.join(self.html_dir, _MANIFEST)
+        with gzip.open(fname, 'wb') as manifest_file:
+            manifest_file.write(json.dumps(manifest).encode('utf-8'))
+
+class _TempFile(object):
+    """
+    Context manager of MediaStore.open_temp.
+    """
+    def __init__(self, dest):
+        self.dest = dest
+        self.fname = None
+
+    def __enter__(self):
+        destdir = os.path.dirname(self.dest)
+        if not os.path.isdir(destdir):
+            try:
+                os.makedirs(destdir)
+            except OSError as err:
+                # made by another process in the mean time
+                if err.errno != errno.EEXIST:
+                    raise
+        filed, self.fname = _create_temp(destdir)
+        self.file = os.fdopen(filed, 'wb')
+        return self.file, self.fname
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.file.closed:
+            self.file.close()
+        if exc_type is not None:
+            if os.path.exists(self.fname):
+                os.remove(self.fname)
+            return False
+        if os.path.exists(self.dest):
+            if sys.platform == 'win32':
+                # rename does not replace files on Windows
+                os.remove(self.dest)
+            elif os.path.samefile(self.fname, self.dest):
+                # a hard link to the same file, rename would do nothing
+                os.remove(self.fname)
+                return False
+        os.rename(self.fname, self.dest)
+        return False
@@ -498,13 +498,14 @@ class IndivCompleteReport(Report):
     def write_report(self):
         plist = self.database.get_person_handles(sort_handles=True)
         if self.filter:
-            ind_list = self.filter.apply(self.database, plist)
+            ind_list = self.filter.apply_objects(self.database, plist)
         else:
-            ind_list = plist
+            ind_list = ((person_handle,
+                         self.database.get_person_from_handle(person_handle))
+                        for person_handle in plist)
 
-        for count, person_handle in enumerate(ind_list):
-            self.person = self.database.get_person_from_handle(
-                person_handle)
+        for count, (person_handle, person) in enumerate(ind_list):
+            self.person = person
             self.write_person(count)
 
     def write_person(self, count):
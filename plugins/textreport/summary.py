@@ -48,7 +48,8 @@ from gramps.gen.plug.docgen import (IndexMark, FontStyle, ParagraphStyle,
                                     FONT_SANS_SERIF, INDEX_TYPE_TOC,
                                     PARA_ALIGN_CENTER)
 from gramps.gen.utils.file import media_path_full
-from gramps.gen.datehandler import get_date
+from gramps.gen.datehandler import displayer
+from gramps.gen.utils.facts import get_person_facts
 
 #------------------------------------------------------------------------
 #
@@ -101,61 +102,44 @@ class SummaryReport(Report):
         males = 0
         females = 0
         unknowns = 0
-        namelist = []
+        namelist = set()
         
         self.doc.start_paragraph("SR-Heading")
         self.doc.write_text(self._("Individuals"))
         self.doc.end_paragraph()
         
-        num_people = 0
-        for person in self.__db.iter_people():
-            num_people += 1
-            
+        # gender, birth, families, names and media of everybody
+        facts = get_person_facts(self.__db)
+        num_people = len(facts)
+        for index in range(num_people):
             # Count people with media.
-            length = len(person.get_media_list())
-            if length > 0:
+            if facts.nr_media[index] > 0:
                 with_media += 1
-            
+
             # Count people with incomplete names.
-            for name in [person.get_primary_name()] + person.get_alternate_names():
-                if name.get_first_name().strip() == "":
-                    incomp_names += 1
-                else:
-                    if name.get_surname_list():
-                        for surname in name.get_surname_list():
-                            if surname.get_surname().strip() == "":
-                                incomp_names += 1
-                    else:
-                        incomp_names += 1
-                    
+            incomp_names += facts.incomplete_names[index]
+
+            # Count unique surnames
+            namelist.update(facts.surnames[index])
+
             # Count people without families.
-            if (not person.get_main_parents_family_handle() and
-               not len(person.get_family_handle_list())):
+            if (not facts.parent_families[index] and
+                    not facts.families[index]):
                 disconnected += 1
-            
+
             # Count missing birthdays.
-            birth_ref = person.get_birth_ref()
-            if birth_ref:
-                birth = self.__db.get_event_from_handle(birth_ref.ref)
-                if not get_date(birth):
-                    missing_bday += 1
-            else:
+            birth_date = facts.birth[index]
+            if birth_date is None or not displayer.display(birth_date):
                 missing_bday += 1
-                
+
             # Count genders.
-            if person.get_gender() == Person.FEMALE:
+            if facts.gender[index] == Person.FEMALE:
                 females += 1
-            elif person.get_gender() == Person.MALE:
+            elif facts.gender[index] == Person.MALE:
                 males += 1
             else:
                 unknowns += 1
-                
-            # Count unique surnames
-            for name in [person.get_primary_name()] + person.get_alternate_names():
-                if not name.get_surname().strip() in namelist \
-                    and not name.get_surname().strip() == "":
-                    namelist.append(name.get_surname().strip())
-        
+
         self.doc.start_paragraph("SR-Normal")
         self.doc.write_text(self._("Number of individuals: %d") % num_people)
         self.doc.end_paragraph()
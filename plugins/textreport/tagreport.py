@@ -107,7 +107,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Person')
         filter = FilterClass()
         filter.add_rule(rules.person.HasTag([self.tag]))
-        ind_list = filter.apply(self.database, plist)
+        ind_list = list(filter.apply_objects(self.database, plist))
         
         if not ind_list:
             return
@@ -148,8 +148,7 @@ class TagReport(Report):
         
         self.doc.end_row()
 
-        for person_handle in ind_list:
-            person = self.database.get_person_from_handle(person_handle)
+        for person_handle, person in ind_list:
 
             self.doc.start_row()
             
@@ -194,7 +193,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Family')
         filter = FilterClass()
         filter.add_rule(rules.family.HasTag([self.tag]))
-        fam_list = filter.apply(self.database, flist)
+        fam_list = list(filter.apply_objects(self.database, flist))
         
         if not fam_list:
             return
@@ -235,8 +234,7 @@ class TagReport(Report):
         
         self.doc.end_row()
 
-        for family_handle in fam_list:
-            family = self.database.get_family_from_handle(family_handle)
+        for family_handle, family in fam_list:
             
             self.doc.start_row()
             
@@ -282,7 +280,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Event')
         filter = FilterClass()
         filter.add_rule(rules.event.HasTag([self.tag]))
-        event_list = filter.apply(self.database, elist)
+        event_list = list(filter.apply_objects(self.database, elist))
         
         if not event_list:
             return
@@ -323,8 +321,7 @@ class TagReport(Report):
         
         self.doc.end_row()
 
-        for event_handle in event_list:
-            event = self.database.get_event_from_handle(event_handle)
+        for event_handle, event in event_list:
             
             self.doc.start_row()
             
@@ -364,7 +361,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Place')
         filter = FilterClass()
         filter.add_rule(rules.place.HasTag([self.tag]))
-        place_list = filter.apply(self.database, plist)
+        place_list = list(filter.apply_objects(self.database, plist))
 
         if not place_list:
             return
@@ -405,8 +402,7 @@ class TagReport(Report):
 
         self.doc.end_row()
 
-        for place_handle in place_list:
-            place = self.database.get_place_from_handle(place_handle)
+        for place_handle, place in place_list:
 
             self.doc.start_row()
 
@@ -443,7 +439,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Note')
         filter = FilterClass()
         filter.add_rule(rules.note.HasTag([self.tag]))
-        note_list = filter.apply(self.database, nlist)
+        note_list = list(filter.apply_objects(self.database, nlist))
         
         if not note_list:
             return
@@ -478,8 +474,7 @@ class TagReport(Report):
         
         self.doc.end_row()
 
-        for note_handle in note_list:
-            note = self.database.get_note_from_handle(note_handle)
+        for note_handle, note in note_list:
             
             self.doc.start_row()
             
@@ -513,7 +508,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Media')
         filter = FilterClass()
         filter.add_rule(rules.media.HasTag([self.tag]))
-        media_list = filter.apply(self.database, mlist)
+        media_list = list(filter.apply_objects(self.database, mlist))
         
         if not media_list:
             return
@@ -554,8 +549,7 @@ class TagReport(Report):
         
         self.doc.end_row()
 
-        for media_handle in media_list:
-            media = self.database.get_object_from_handle(media_handle)
+        for media_handle, media in media_list:
 
             self.doc.start_row()
             
@@ -596,7 +590,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Repository')
         filter = FilterClass()
         filter.add_rule(rules.repository.HasTag([self.tag]))
-        repo_list = filter.apply(self.database, rlist)
+        repo_list = list(filter.apply_objects(self.database, rlist))
 
         if not repo_list:
             return
@@ -637,8 +631,7 @@ class TagReport(Report):
 
         self.doc.end_row()
 
-        for repo_handle in repo_list:
-            repo = self.database.get_repository_from_handle(repo_handle)
+        for repo_handle, repo in repo_list:
 
             self.doc.start_row()
 
@@ -680,7 +673,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Source')
         filter = FilterClass()
         filter.add_rule(rules.source.HasTag([self.tag]))
-        source_list = filter.apply(self.database, slist)
+        source_list = list(filter.apply_objects(self.database, slist))
 
         if not source_list:
             return
@@ -721,8 +714,7 @@ class TagReport(Report):
 
         self.doc.end_row()
 
-        for source_handle in source_list:
-            source = self.database.get_source_from_handle(source_handle)
+        for source_handle, source in source_list:
 
             self.doc.start_row()
 
@@ -759,7 +751,7 @@ class TagReport(Report):
         FilterClass = GenericFilterFactory('Citation')
         filter = FilterClass()
         filter.add_rule(rules.citation.HasTag([self.tag]))
-        citation_list = filter.apply(self.database, clist)
+        citation_list = list(filter.apply_objects(self.database, clist))
 
         if not citation_list:
             return
@@ -800,8 +792,7 @@ class TagReport(Report):
 
         self.doc.end_row()
 
-        for citation_handle in citation_list:
-            citation = self.database.get_citation_from_handle(citation_handle)
+        for citation_handle, citation in citation_list:
 
             self.doc.start_row()
 
@@ -72,6 +72,7 @@ from gramps.gen.utils.unknown import make_unknown
 from gramps.gen.utils.file import (media_path_full, find_file)
 from gramps.gui.managedwindow import ManagedWindow
 from gramps.gen.utils.file import create_checksum
+from gramps.gen.utils import trace
 from gramps.gui.plug import tool
 from gramps.gui.dialog import OkDialog, MissingMediaDialog
 from gramps.gen.display.name import displayer as _nd
@@ -194,11 +195,8 @@ class Check(tool.BatchTool):
             checker.check_family_references()
             checker.check_place_references()
             checker.check_source_references()
-            checker.check_citation_references()
-            checker.check_media_references()
             checker.check_repo_references()
-            checker.check_note_references()
-            checker.check_tag_references()
+            checker.check_object_references()
             checker.check_checksum()
             checker.check_media_sourceref()
         self.db.enable_signals()
@@ -257,6 +255,7 @@ class CheckIntegrity(object):
                len(self.duplicate_links)
                )
 
+    @trace.traced('check')
     def cleanup_deleted_name_formats(self):
         """
         Permanently remove deleted name formats from db.
@@ -316,6 +315,7 @@ class CheckIntegrity(object):
         if len(self.removed_name_format) == 0:
             logging.info('    OK: no invalid name formats found found')
 
+    @trace.traced('check')
     def cleanup_duplicate_spouses(self):
 
         self.progress.set_pass(_('Looking for duplicate spouses'),
@@ -341,6 +341,7 @@ class CheckIntegrity(object):
         if previous_errors == len(self.duplicate_links):
             logging.info('    OK: no duplicate spouses found')
 
+    @trace.traced('check')
     def fix_encoding(self):
         self.progress.set_pass(_('Looking for character encoding errors'),
                                self.db.get_number_of_media_objects())
@@ -382,6 +383,7 @@ class CheckIntegrity(object):
         if error_count == 0:
             logging.info('    OK: no encoding errors found')
 
+    @trace.traced('check')
     def fix_ctrlchars_in_notes(self):
         self.progress.set_pass(_('Looking for ctrl characters in notes'),
                                self.db.get_number_of_notes())
@@ -405,6 +407,7 @@ class CheckIntegrity(object):
         if error_count == 0:
             logging.info('    OK: no ctrl characters in notes found')
 
+    @trace.traced('check')
     def check_for_broken_family_links(self):
         # Check persons referenced by the family objects
 
@@ -609,6 +612,7 @@ class CheckIntegrity(object):
         if previous_errors == len(self.broken_parent_links + self.broken_links):
             logging.info('    OK: no broken family links found')
     
+    @trace.traced('check')
     def cleanup_missing_photos(self, cl=0):
 
         self.progress.set_pass(_('Looking for unused objects'),
@@ -750,6 +754,7 @@ class CheckIntegrity(object):
         if len(self.bad_photo + self.removed_photo) == 0:
             logging.info('    OK: no missing photos found')
     
+    @trace.traced('check')
     def cleanup_empty_objects(self):
         #the position of the change column in the primary objects
         CHANGE_PERSON = 17
@@ -901,6 +906,7 @@ class CheckIntegrity(object):
         else :
             return data[2:] == empty_data[2:]
 
+    @trace.traced('check')
     def cleanup_empty_families(self, automatic):
 
         fhandle_list = self.db.get_family_handles()
@@ -936,6 +942,7 @@ class CheckIntegrity(object):
                 self.db.commit_person(child, self.trans)
         self.db.remove_family(family_handle, self.trans)
 
+    @trace.traced('check')
     def check_parent_relationships(self):
         """Repair father=female or mother=male in hetero families
         """
@@ -978,6 +985,7 @@ class CheckIntegrity(object):
         if previous_errors == len(self.fam_rel):
             logging.info('    OK: no broken parent relationships found')
 
+    @trace.traced('check')
     def check_events(self):
         self.progress.set_pass(_('Looking for event problems'),
                                self.db.get_number_of_people()
@@ -1142,6 +1150,7 @@ class CheckIntegrity(object):
                 len(self.invalid_events) == 0:
             logging.info('    OK: no event problems found')
 
+    @trace.traced('check')
     def check_person_references(self):
         plist = self.db.get_person_handles()
         
@@ -1173,6 +1182,7 @@ class CheckIntegrity(object):
         if len (self.invalid_person_references) == 0:
             logging.info('    OK: no event problems found')
 
+    @trace.traced('check')
     def check_family_references(self):
         plist = self.db.get_person_handles()
 
@@ -1198,6 +1208,7 @@ class CheckIntegrity(object):
         if len (self.invalid_family_references) == 0:
             logging.info('    OK: no event problems found')
 
+    @trace.traced('check')
     def check_repo_references(self):
         slist = self.db.get_source_handles()
         
@@ -1229,6 +1240,7 @@ class CheckIntegrity(object):
         if len (self.invalid_repo_references) == 0:
             logging.info('    OK: no repository reference problems found')
 
+    @trace.traced('check')
     def check_place_references(self):
         plist = self.db.get_person_handles()
         flist = self.db.get_family_handles()
@@ -1330,143 +1342,87 @@ class CheckIntegrity(object):
         if len (self.invalid_place_references) == 0:
             logging.info('    OK: no place reference problems found')
 
-    def check_citation_references(self):
-        known_handles = [handle2internal(key) for key in 
-                                self.db.get_citation_handles()]
-
-        total = (
-                self.db.get_number_of_people() +
-                self.db.get_number_of_families() +
-                self.db.get_number_of_events() +
-                self.db.get_number_of_places() +
-                self.db.get_number_of_citations() +
-                self.db.get_number_of_sources() +
-                self.db.get_number_of_media_objects() +
-                self.db.get_number_of_repositories()
-                )
+    @trace.traced('check')
+    def check_object_references(self):
+        """
+        Look for references to citations, media objects, notes and tags that
+        do not exist in the database, and create these.
 
-        self.progress.set_pass(_('Looking for citation reference problems'),
+        Each table is read once, and the references of each object are
+        checked for all four kinds of objects.
+        """
+        # the kinds of references checked in the objects of each table
+        tables = [
+            (self.db.person_map, Person, self.db.commit_person,
+             ('Citation', 'MediaObject', 'Note', 'Tag')),
+            (self.db.family_map, Family, self.db.commit_family,
+             ('Citation', 'MediaObject', 'Note', 'Tag')),
+            (self.db.place_map, Place, self.db.commit_place,
+             ('Citation', 'MediaObject', 'Note')),
+            (self.db.citation_map, Citation, self.db.commit_citation,
+             ('Citation', 'MediaObject', 'Note')),
+            (self.db.repository_map, Repository, self.db.commit_repository,
+             ('Citation', 'Note')),
+            (self.db.media_map, MediaObject, self.db.commit_media_object,
+             ('Citation', 'Note', 'Tag')),
+            (self.db.event_map, Event, self.db.commit_event,
+             ('Citation', 'MediaObject', 'Note')),
+            (self.db.source_map, Source, self.db.commit_source,
+             ('MediaObject', 'Note')),
+            (self.db.note_map, Note, self.db.commit_note,
+             ('Tag',)),
+            ]
+        known_handles = {
+            'Citation' : set(handle2internal(key) for key in
+                             self.db.get_citation_handles()),
+            'MediaObject' : set(handle2internal(key) for key in
+                                self.db.get_media_object_handles(False)),
+            'Note' : set(handle2internal(key) for key in
+                         self.db.get_note_handles()),
+            'Tag' : set(handle2internal(key) for key in
+                        self.db.get_tag_handles()),
+            }
+        # the objects created for missing references by the checks before
+        # refer to the explanation, which is added below
+        known_handles['Note'].add(self.explanation.handle)
+        invalid_references = {
+            'Citation' : self.invalid_citation_references,
+            'MediaObject' : self.invalid_media_references,
+            'Note' : self.invalid_note_references,
+            'Tag' : self.invalid_tag_references,
+            }
+        replace_references = {
+            'Citation' : 'replace_citation_references',
+            'MediaObject' : 'replace_media_references',
+            'Note' : 'replace_note_references',
+            'Tag' : 'replace_tag_references',
+            }
+
+        total = sum(len(the_map) for (the_map, cls, commit, kinds) in tables)
+        self.progress.set_pass(_('Looking for object reference problems'),
                                total)
-        logging.info('Looking for citation reference problems')
-
-        for bhandle in self.db.person_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.person_map[bhandle]
-            person = Person()
-            person.unserialize(info)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_citation_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.family_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.family_map[bhandle]
-            family = Family()
-            family.unserialize(info)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_citation_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.place_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.place_map[bhandle]
-            place = Place()
-            place.unserialize(info)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_citation_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.citation_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.citation_map[bhandle]
-            citation = Citation()
-            citation.unserialize(info)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_citation_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.repository_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.repository_map[bhandle]
-            repository = Repository()
-            repository.unserialize(info)
-            handle_list = repository.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        repository.replace_citation_references(None, new_handle)
-                        self.db.commit_repository(repository, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.media_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.media_map[bhandle]
-            obj = MediaObject()
-            obj.unserialize(info)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_citation_references(None, new_handle)
-                        self.db.commit_media_object(obj, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for bhandle in self.db.event_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.event_map[bhandle]
-            event = Event()
-            event.unserialize(info)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
+        logging.info('Looking for citation, media object, note and tag '
+                     'reference problems')
+
+        for the_map, cls, commit, kinds in tables:
+            for bhandle in the_map.keys():
+                self.progress.step()
+                obj = cls()
+                obj.unserialize(the_map[bhandle])
+                changed = False
+                for (kind, handle) in obj.get_referenced_handles_recursively():
+                    if kind not in kinds:
+                        continue
+                    if handle is None:
                         new_handle = create_id()
-                        event.replace_citation_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
+                        getattr(obj, replace_references[kind])(None,
+                                                               new_handle)
+                        invalid_references[kind].add(new_handle)
+                        changed = True
+                    elif handle not in known_handles[kind]:
+                        invalid_references[kind].add(handle)
+                if changed:
+                    commit(obj, self.trans)
 
         for bad_handle in self.invalid_citation_references:
             created = make_unknown(bad_handle, self.explanation.handle,
@@ -1479,6 +1435,44 @@ class CheckIntegrity(object):
         if len(self.invalid_citation_references) == 0:
             logging.info('   OK: no citation reference problems found')
 
+        for bad_handle in self.invalid_media_references:
+            make_unknown(bad_handle, self.explanation.handle,
+                               self.class_object, self.commit_object, self.trans)
+
+        if len (self.invalid_media_references) == 0:
+            logging.info('    OK: no media reference problems found')
+
+        # the objects created for missing references refer to the
+        # explanation, add it if there are any
+        missing_references = (len(self.invalid_person_references) +
+                len(self.invalid_family_references) +
+                len(self.invalid_birth_events) +
+                len(self.invalid_death_events) +
+                len(self.invalid_events) +
+                len(self.invalid_place_references) +
+                len(self.invalid_citation_references) +
+                len(self.invalid_source_references) +
+                len(self.invalid_repo_references) +
+                len(self.invalid_media_references) +
+                len(self.invalid_note_references))
+        if missing_references:
+            self.db.add_note(self.explanation, self.trans, set_gid=True)
+
+        for bad_handle in self.invalid_note_references:
+            make_unknown(bad_handle, self.explanation.handle,
+                               self.class_note, self.commit_note, self.trans)
+
+        if len (self.invalid_note_references) == 0:
+            logging.info('    OK: no note reference problems found')
+
+        for bad_handle in self.invalid_tag_references:
+            make_unknown(bad_handle, None, self.class_tag,
+                               self.commit_tag, self.trans)
+
+        if len(self.invalid_tag_references) == 0:
+            logging.info('   OK: no tag reference problems found')
+
+    @trace.traced('check')
     def check_source_references(self):
         clist = self.db.get_citation_handles()
         self.progress.set_pass(_('Looking for source reference problems'),
@@ -1509,312 +1503,7 @@ class CheckIntegrity(object):
         if len(self.invalid_source_references) == 0:
             logging.info('   OK: no source reference problems found')
 
-    def check_media_references(self):
-        known_handles = [handle2internal(key) for key in 
-                            self.db.get_media_object_handles(False)]
-
-        total = (
-                self.db.get_number_of_people() + 
-                self.db.get_number_of_families() +
-                self.db.get_number_of_events() + 
-                self.db.get_number_of_places() +
-                self.db.get_number_of_citations() +
-                self.db.get_number_of_sources()
-                )
-
-        self.progress.set_pass(_('Looking for media object reference problems'),
-                               total)
-        logging.info('Looking for media object reference problems')
-        
-        for bhandle in self.db.person_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.person_map[bhandle]
-            person = Person()
-            person.unserialize(info)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_media_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for bhandle in self.db.family_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.family_map[bhandle]
-            family = Family()
-            family.unserialize(info)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_media_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for bhandle in self.db.place_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.place_map[bhandle]
-            place = Place()
-            place.unserialize(info)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_media_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-        
-        for bhandle in self.db.event_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.event_map[bhandle]
-            event = Event()
-            event.unserialize(info)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_media_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-        
-        for bhandle in self.db.citation_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.citation_map[bhandle]
-            citation = Citation()
-            citation.unserialize(info)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_media_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for bhandle in self.db.source_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.source_map[bhandle]
-            source = Source()
-            source.unserialize(info)
-            handle_list = source.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'MediaObject':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        source.replace_media_references(None, new_handle)
-                        self.db.commit_source(source, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for bad_handle in self.invalid_media_references:
-            make_unknown(bad_handle, self.explanation.handle,
-                               self.class_object, self.commit_object, self.trans)
-
-        if len (self.invalid_media_references) == 0:
-            logging.info('    OK: no media reference problems found')
-
-    def check_note_references(self):
-        # Here I assume check note_references runs after all the next checks.
-        missing_references = (len(self.invalid_person_references) +
-                len(self.invalid_family_references) +
-                len(self.invalid_birth_events) +
-                len(self.invalid_death_events) +
-                len(self.invalid_events) +
-                len(self.invalid_place_references) +
-                len(self.invalid_citation_references) +
-                len(self.invalid_source_references) +
-                len(self.invalid_repo_references) +
-                len(self.invalid_media_references))
-        if missing_references:
-            self.db.add_note(self.explanation, self.trans, set_gid=True)
-
-        known_handles = [handle2internal(key) for key in 
-                                    self.db.get_note_handles()]
-        bad_handles = []
-
-        total = (
-                self.db.get_number_of_people() + 
-                self.db.get_number_of_families() +
-                self.db.get_number_of_events() + 
-                self.db.get_number_of_places() +
-                self.db.get_number_of_media_objects() +
-                self.db.get_number_of_citations() +
-                self.db.get_number_of_sources() +
-                self.db.get_number_of_repositories()
-                )
-
-        self.progress.set_pass(_('Looking for note reference problems'),
-                               total)
-        logging.info('Looking for note reference problems')
-        
-        for bhandle in self.db.person_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.person_map[bhandle]
-            person = Person()
-            person.unserialize(info)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_note_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.family_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.family_map[bhandle]
-            family = Family()
-            family.unserialize(info)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_note_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.place_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.place_map[bhandle]
-            place = Place()
-            place.unserialize(info)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_note_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.citation_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.citation_map[bhandle]
-            citation = Citation()
-            citation.unserialize(info)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_note_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.source_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.source_map[bhandle]
-            source = Source()
-            source.unserialize(info)
-            handle_list = source.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        source.replace_note_references(None, new_handle)
-                        self.db.commit_source(source, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.media_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.media_map[bhandle]
-            obj = MediaObject()
-            obj.unserialize(info)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_note_references(None, new_handle)
-                        self.db.commit_media_object(obj, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.event_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.event_map[bhandle]
-            event = Event()
-            event.unserialize(info)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_note_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bhandle in self.db.repository_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.repository_map[bhandle]
-            repo = Repository()
-            repo.unserialize(info)
-            handle_list = repo.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        repo.replace_note_references(None, new_handle)
-                        self.db.commit_repository(repo, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for bad_handle in self.invalid_note_references:
-            make_unknown(bad_handle, self.explanation.handle,
-                               self.class_note, self.commit_note, self.trans)
-
-        if len (self.invalid_note_references) == 0:
-            logging.info('    OK: no note reference problems found')
-        else:
-            if not missing_references:
-                self.db.add_note(self.explanation, self.trans, set_gid=True)
-
+    @trace.traced('check')
     def check_checksum(self):
         self.progress.set_pass(_('Updating checksums on media'),
                                len(self.db.get_media_object_handles()))
@@ -1829,96 +1518,7 @@ class CheckIntegrity(object):
                 obj.checksum = new_checksum
                 self.db.commit_media_object(obj, self.trans)
 
-    def check_tag_references(self):
-        known_handles = [handle2internal(key) for key in 
-                                    self.db.get_tag_handles()]
-
-        total = (
-                self.db.get_number_of_people() +
-                self.db.get_number_of_families() +
-                self.db.get_number_of_media_objects() +
-                self.db.get_number_of_notes()
-                )
-
-        self.progress.set_pass(_('Looking for tag reference problems'),
-                               total)
-        logging.info('Looking for tag reference problems')
-
-        for bhandle in self.db.person_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.person_map[bhandle]
-            person = Person()
-            person.unserialize(info)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_tag_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for bhandle in self.db.family_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.family_map[bhandle]
-            family = Family()
-            family.unserialize(info)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_tag_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for bhandle in self.db.media_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.media_map[bhandle]
-            obj = MediaObject()
-            obj.unserialize(info)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_tag_references(None, new_handle)
-                        self.db.commit_media_object(obj, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for bhandle in self.db.note_map.keys():
-            handle = handle2internal(bhandle)
-            self.progress.step()
-            info = self.db.note_map[bhandle]
-            note = Note()
-            note.unserialize(info)
-            handle_list = note.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        note.replace_tag_references(None, new_handle)
-                        self.db.commit_note(note, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for bad_handle in self.invalid_tag_references:
-            make_unknown(bad_handle, None, self.class_tag,
-                               self.commit_tag, self.trans)
-
-        if len(self.invalid_tag_references) == 0:
-            logging.info('   OK: no tag reference problems found')
-
+    @trace.traced('check')
     def check_media_sourceref(self):
         """
         This repairs a problem with database upgrade from database schema
@@ -56,10 +56,9 @@ from gramps.gui.dialog import OkDialog
 from gramps.gui.display import display_help
 from gramps.gen.datehandler import get_date
 from gramps.gui.managedwindow import ManagedWindow
-from gramps.gen.merge import MergeCitationQuery
+from gramps.gen.merge import MergeCitationsQuery
 
 from gramps.gui.glade import Glade
-from gramps.gen.db import DbTxn
 from gramps.gen.lib import (Person, Family, Event, Place, MediaObject, Citation, 
                      Repository)
 from gramps.gen.errors import MergeError
@@ -188,7 +187,7 @@ class MergeCitations(tool.BatchTool,ManagedWindow):
         db = self.dbstate.db
         
         db.disable_signals()
-        num_merges = 0
+        merges = []
         for handle in db.iter_source_handles():
             dict = {}
             citation_handle_list = list(db.find_backlink_handles(handle))
@@ -206,23 +205,18 @@ class MergeCitations(tool.BatchTool,ManagedWindow):
                         conf_strings[citation.get_confidence_level()]
                 if key in dict and \
                     (not dont_merge_notes or len(citation.note_list) == 0):
-                    citation_match_handle = dict[key]
-                    citation_match = \
-                        db.get_citation_from_handle(citation_match_handle)
-                    try:
-                        query = MergeCitationQuery(
-                                self.dbstate, citation_match, citation)
-                        query.execute()
-                    except AssertionError:
-                        print("Tool/Family Tree processing/MergeCitations", \
-                        "citation1 gramps_id", citation_match.get_gramps_id(), \
-                        "citation2 gramps_id", citation.get_gramps_id() , \
-                        "citation backlink handles", \
-                        list(db.find_backlink_handles(citation.get_handle())))
-                    num_merges += 1
+                    merges.append((citation_handle, dict[key]))
                 elif (not dont_merge_notes or len(citation.note_list) == 0):
                     dict[key] = citation_handle
                 self.progress.step()
+        # merge all the citations found at once, every object referring to
+        # them is written only once
+        num_merges = len(merges)
+        if merges:
+            self.progress.set_pass(_('Merging citations'),
+                                   mode=ProgressMeter.MODE_ACTIVITY)
+            query = MergeCitationsQuery(self.dbstate, merges, batch=True)
+            query.execute()
         db.enable_signals()
         db.request_rebuild()
         self.progress.close()
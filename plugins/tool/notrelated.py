@@ -41,7 +41,7 @@ _ = glocale.translation.sgettext
 ngettext = glocale.translation.ngettext # else "nearby" comments are ignored
 from gramps.gen.const import URL_MANUAL_PAGE
 from gramps.gui.plug import tool
-from gramps.gen.plug.report import utils as ReportUtils
+from gramps.gen.utils.db import FamilyComponents
 from gramps.gui.editors import EditPerson, EditFamily
 from gramps.gui.managedwindow import ManagedWindow
 from gramps.gui.utils import ProgressMeter
@@ -153,13 +153,11 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
         self.numberOfUnrelatedPeople     = 0
 
         # create the sets used to track related and unrelated people
-        self.handlesOfPeopleToBeProcessed       = set()
         self.handlesOfPeopleAlreadyProcessed    = set()
         self.handlesOfPeopleNotRelated          = set()
 
         # build a set of all people related to the selected person
-        self.handlesOfPeopleToBeProcessed.add(person.get_handle())
-        self.findRelatedPeople()
+        self.findRelatedPeople(person.get_handle())
 
         # now that we have our list of related people, find everyone
         # in the database who isn't on our list
@@ -294,7 +292,7 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
         if progress:
             progress.close()
 
-    def findRelatedPeople(self) :
+    def findRelatedPeople(self, handle) :
 
         self.progress.set_pass(
             # translators: leave all/any {...} untranslated
@@ -303,68 +301,12 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
                      "Finding relationships between {number_of} people",
                      self.numberOfPeopleInDatabase
                     ).format(number_of=self.numberOfPeopleInDatabase),
-            self.numberOfPeopleInDatabase)
+            self.db.get_number_of_families())
 
-        # as long as we have people we haven't processed yet, keep looping
-        while len(self.handlesOfPeopleToBeProcessed) > 0:
-            handle = self.handlesOfPeopleToBeProcessed.pop()
-
-### DEBUG DEBUG DEBUG
-#            if len(self.handlesOfPeopleAlreadyProcessed) > 50:
-#                break
-###
-
-            # see if we've already processed this person
-            if handle in self.handlesOfPeopleAlreadyProcessed:
-                continue
-
-            person = self.db.get_person_from_handle(handle)
-
-            # if we get here, then we're dealing with someone new
-            self.progress.step()
-
-            # remember that we've now seen this person
-            self.handlesOfPeopleAlreadyProcessed.add(handle)
-
-            # we have 4 things to do:  find (1) spouses, (2) parents, siblings(3), and (4) children
-
-            # step 1 -- spouses
-            for familyHandle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                spouseHandle = ReportUtils.find_spouse(person, family)
-                if spouseHandle and \
-                  spouseHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(spouseHandle)
-
-            # step 2 -- parents
-            for familyHandle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                fatherHandle = family.get_father_handle()
-                motherHandle = family.get_mother_handle()
-                if fatherHandle and \
-                  fatherHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(fatherHandle)
-                if motherHandle and \
-                  motherHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(motherHandle)
-
-            # step 3 -- siblings
-            for familyHandle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                for childRef in family.get_child_ref_list():
-                    childHandle = childRef.ref
-                    if childHandle and \
-                      childHandle not in self.handlesOfPeopleAlreadyProcessed:
-                        self.handlesOfPeopleToBeProcessed.add(childHandle)
-
-            # step 4 -- children
-            for familyHandle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                for childRef in family.get_child_ref_list():
-                    childHandle = childRef.ref
-                    if childHandle and \
-                      childHandle not in self.handlesOfPeopleAlreadyProcessed:
-                        self.handlesOfPeopleToBeProcessed.add(childHandle)
+        # group everyone connected through spouses, parents, siblings and
+        # children in one pass over the families
+        components = FamilyComponents(self.db, self.progress.step)
+        self.handlesOfPeopleAlreadyProcessed = components.get_connected(handle)
 
 
     def findUnrelatedPeople(self) :
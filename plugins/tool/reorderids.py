@@ -78,94 +78,76 @@ class ReorderIds(tool.BatchTool):
                 self.progress.set_pass(_('Reordering People IDs'),
                                        db.get_number_of_people())
             self.reorder(Person,
-                         db.get_person_from_gramps_id,
-                         db.get_person_from_handle,
-                         db.find_next_person_gramps_id,
                          db.person_map,
                          db.commit_person,
-                         db.person_prefix)
+                         db.person_prefix,
+                         'pmap_index')
 
             if uistate:
                 self.progress.set_pass(_('Reordering Family IDs'),
                                        db.get_number_of_families())
             self.reorder(Family,
-                         db.get_family_from_gramps_id,
-                         db.get_family_from_handle,
-                         db.find_next_family_gramps_id,
                          db.family_map,
                          db.commit_family,
-                         db.family_prefix)
+                         db.family_prefix,
+                         'fmap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Event IDs'),
                                        db.get_number_of_events())
             self.reorder(Event,
-                         db.get_event_from_gramps_id,
-                         db.get_event_from_handle,
-                         db.find_next_event_gramps_id,
                          db.event_map,
                          db.commit_event,
-                         db.event_prefix)
+                         db.event_prefix,
+                         'emap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Media Object IDs'),
                                        db.get_number_of_media_objects())
             self.reorder(MediaObject,
-                         db.get_object_from_gramps_id,
-                         db.get_object_from_handle,
-                         db.find_next_object_gramps_id,
                          db.media_map,
                          db.commit_media_object,
-                         db.mediaobject_prefix)
+                         db.mediaobject_prefix,
+                         'omap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Source IDs'),
                                        db.get_number_of_sources())
             self.reorder(Source,
-                         db.get_source_from_gramps_id,
-                         db.get_source_from_handle,
-                         db.find_next_source_gramps_id,
                          db.source_map,
                          db.commit_source,
-                         db.source_prefix)
+                         db.source_prefix,
+                         'smap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Citation IDs'),
                                        db.get_number_of_citations())
             self.reorder(Citation,
-                         db.get_citation_from_gramps_id,
-                         db.get_citation_from_handle,
-                         db.find_next_citation_gramps_id,
                          db.citation_map,
                          db.commit_citation,
-                         db.citation_prefix)
+                         db.citation_prefix,
+                         'cmap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Place IDs'),
                                        db.get_number_of_places())
             self.reorder(Place,
-                         db.get_place_from_gramps_id,
-                         db.get_place_from_handle,
-                         db.find_next_place_gramps_id,
                          db.place_map,
                          db.commit_place,
-                         db.place_prefix)
+                         db.place_prefix,
+                         'lmap_index')
             if uistate:
                 self.progress.set_pass(_('Reordering Repository IDs'),
                                        db.get_number_of_repositories())
             self.reorder(Repository,
-                         db.get_repository_from_gramps_id,
-                         db.get_repository_from_handle,
-                         db.find_next_repository_gramps_id,
                          db.repository_map,
                          db.commit_repository,
-                         db.repository_prefix)
+                         db.repository_prefix,
+                         'rmap_index')
     #add reorder notes ID
             if uistate:
                 self.progress.set_pass(_('Reordering Note IDs'),
                                        db.get_number_of_notes())
             self.reorder(Note,
-                         db.get_note_from_gramps_id,
-                         db.get_note_from_handle,
-                         db.find_next_note_gramps_id,
                          db.note_map,
                          db.commit_note,
-                         db.note_prefix)
+                         db.note_prefix,
+                         'nmap_index')
             if uistate:
                 self.progress.close()
             else:
@@ -174,72 +156,125 @@ class ReorderIds(tool.BatchTool):
         db.enable_signals()
         db.request_rebuild()
         
-    def reorder(self, class_type, find_from_id, find_from_handle,
-                find_next_id, table, commit, prefix):
-        dups = []
-        newids = {}
-
-        formatmatch = _parseformat.match(prefix)
+    def reorder(self, class_type, table, commit, prefix, index_name):
+        """
+        Give the objects of table IDs of the scheme prefix.
 
+        The new IDs are chosen from the IDs in the table, kept in memory,
+        before any object is written. Only the objects whose ID changes
+        are written. index_name is the attribute of the database with the
+        index where find_next_<object>_gramps_id looks for a free ID.
+        """
+        objects = []
         for handle in list(table.keys()):
             if self.uistate:
                 self.progress.step()
+            objects.append((handle, table[handle][1]))
 
-            sdata = table[handle]
+        changes, map_index = _new_ids(prefix, objects,
+                                      getattr(self.db, index_name))
+        setattr(self.db, index_name, map_index)
 
+        if self.uistate:
+            self.progress.set_pass(_('Assigning new IDs'), len(changes))
+        for handle, newgramps_id in changes:
+            if self.uistate:
+                self.progress.step()
             obj = class_type()
-            obj.unserialize(sdata)
-            gramps_id = obj.get_gramps_id()
-            # attempt to extract integer, if we can't, treat it as a
-            # duplicate
-
-            try:
-                match = _findint.match(gramps_id)
-                if match:
-                    # get the integer, build the new handle. Make sure it
-                    # hasn't already been chosen. If it has, put this
-                    # in the duplicate handle list
-
-                    index = match.groups()[0]
-
-                    if formatmatch:
-                        if int(index) > int("9" * int(formatmatch.groups()[0])):
-                            newgramps_id = find_next_id()
-                        else:
-                            newgramps_id = prefix % int(index)
-                    else:
-                        # the prefix does not contain a number after %, eg I%d
-                        newgramps_id = prefix % int(index)
-
-                    if newgramps_id == gramps_id:
-                        if newgramps_id in newids:
-                            dups.append(obj.get_handle())
-                        else:
-                            newids[newgramps_id] = gramps_id
-                    elif find_from_id(newgramps_id) is not None:
-                        dups.append(obj.get_handle())
+            obj.unserialize(table[handle])
+            obj.set_gramps_id(newgramps_id)
+            commit(obj, self.trans)
+
+def _new_ids(prefix, objects, map_index):
+    """
+    Return the new IDs of the scheme prefix of objects, a list of (handle,
+    gramps_id).
+
+    IDs that do not fit in the scheme and duplicate IDs get free IDs, in
+    the order of the database find_next_<object>_gramps_id methods:
+    starting from map_index, the index of the database.
+
+    :returns: (changes, map_index), changes is a list of (handle, new
+        gramps_id) of the objects whose ID changes, map_index the index of
+        the database after the free IDs given.
+    """
+    # number of objects holding each ID
+    used = {}
+    for handle, gramps_id in objects:
+        used[gramps_id] = used.get(gramps_id, 0) + 1
+
+    formatmatch = _parseformat.match(prefix)
+    if formatmatch:
+        maximum = int("9" * int(formatmatch.groups()[0]))
+
+    dups = []
+    newids = {}
+    changes = []
+    for handle, gramps_id in objects:
+        # attempt to extract integer, if we can't, treat it as a
+        # duplicate
+        try:
+            match = _findint.match(gramps_id)
+            if match:
+                # get the integer, build the new handle. Make sure it
+                # hasn't already been chosen. If it has, put this
+                # in the duplicate handle list
+
+                index = int(match.groups()[0])
+
+                if formatmatch and index > maximum:
+                    map_index, newgramps_id = _find_next_id(prefix, used,
+                                                            map_index)
+                else:
+                    # the prefix may not contain a number after %,
+                    # eg I%d
+                    newgramps_id = prefix % index
+
+                if newgramps_id == gramps_id:
+                    if newgramps_id in newids:
+                        dups.append((handle, gramps_id))
                     else:
-                        obj.set_gramps_id(newgramps_id)
-                        commit(obj, self.trans)
                         newids[newgramps_id] = gramps_id
+                elif used.get(newgramps_id):
+                    dups.append((handle, gramps_id))
                 else:
-                    dups.append(handle)
-            except:
-                dups.append(handle)
+                    _move_id(used, gramps_id, newgramps_id)
+                    changes.append((handle, newgramps_id))
+                    newids[newgramps_id] = gramps_id
+            else:
+                dups.append((handle, gramps_id))
+        except:
+            dups.append((handle, gramps_id))
+
+    # give the duplicates the next available IDs that match the new
+    # scheme
+    for handle, gramps_id in dups:
+        map_index, newgramps_id = _find_next_id(prefix, used, map_index)
+        _move_id(used, gramps_id, newgramps_id)
+        changes.append((handle, newgramps_id))
+    return changes, map_index
+
+def _find_next_id(prefix, used, map_index):
+    """
+    Return the next ID of the scheme prefix that no object holds, like the
+    find_next_<object>_gramps_id methods of the database.
+
+    :returns: (map_index, gramps_id), map_index is the index to continue
+        from.
+    """
+    gramps_id = prefix % map_index
+    while used.get(gramps_id):
+        map_index += 1
+        gramps_id = prefix % map_index
+    return map_index + 1, gramps_id
+
+def _move_id(used, old_id, new_id):
+    """
+    Record in used that an object changes its ID from old_id to new_id.
+    """
+    used[old_id] -= 1
+    used[new_id] = used.get(new_id, 0) + 1
 
-        # go through the duplicates, looking for the first available
-        # handle that matches the new scheme.
-    
-        if self.uistate:
-            self.progress.set_pass(_('Finding and assigning unused IDs'),
-                                   len(dups))
-        for handle in dups:
-            if self.uistate:
-                self.progress.step()
-            obj = find_from_handle(handle)
-            obj.set_gramps_id(find_next_id())
-            commit(obj, self.trans)
-    
 #------------------------------------------------------------------------
 #
 # 
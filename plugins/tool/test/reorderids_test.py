@@ -0,0 +1,75 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the new IDs given by the Reorder IDs tool.
+"""
+
+import unittest
+
+from gramps.plugins.tool.reorderids import _new_ids
+
+class NewIdsTest(unittest.TestCase):
+
+    def test_unchanged(self):
+        objects = [('a', 'I0000'), ('b', 'I0001')]
+        self.assertEqual(_new_ids('I%04d', objects, 2), ([], 2))
+
+    def test_reformat(self):
+        objects = [('a', 'I1'), ('b', 'P0002')]
+        changes, map_index = _new_ids('I%04d', objects, 2)
+        self.assertEqual(changes, [('a', 'I0001'), ('b', 'I0002')])
+        self.assertEqual(map_index, 2)
+
+    def test_duplicate_skips_low_gap(self):
+        """
+        A duplicate ID gets the next ID from the index of the database, not
+        the free I0001 below it.
+        """
+        objects = [('a', 'I0000'), ('b', 'I0002'), ('c', 'I0002')]
+        changes, map_index = _new_ids('I%04d', objects, 3)
+        self.assertEqual(changes, [('c', 'I0003')])
+        self.assertEqual(map_index, 4)
+
+    def test_over_width(self):
+        """
+        IDs with more digits than the scheme get the next free ID, after
+        the IDs in use.
+        """
+        objects = [('a', 'I0000'), ('b', 'I12345'), ('c', 'I0002'),
+                   ('d', 'I0003')]
+        changes, map_index = _new_ids('I%04d', objects, 1)
+        self.assertEqual(changes, [('b', 'I0001')])
+        self.assertEqual(map_index, 2)
+        changes, map_index = _new_ids('I%04d', objects, 4)
+        self.assertEqual(changes, [('b', 'I0004')])
+        self.assertEqual(map_index, 5)
+
+    def test_index_continues(self):
+        """
+        Taken IDs from the index on are skipped, and the index continues
+        after the last ID given.
+        """
+        objects = [('a', 'I0002'), ('b', 'I0003'), ('c', 'I0003'),
+                   ('d', 'X'), ('e', 'I0005')]
+        changes, map_index = _new_ids('I%04d', objects, 2)
+        self.assertEqual(changes, [('c', 'I0004'), ('d', 'I0006')])
+        self.assertEqual(map_index, 7)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -79,6 +79,7 @@ from gramps.gen.utils.lds import TEMPLES
 from gramps.gen.db.dbconst import *
 from gramps.gen.const import ICON, LOGO, SPLASH
 from gramps.gen.constfunc import cuni
+from gramps.plugins.lib.libsynthetic import TreeGenerator
 
 #-------------------------------------------------------------------------
 #
@@ -213,6 +214,11 @@ class TestcaseGenerator(tool.BatchTool):
         self.check_persons.connect('clicked', self.on_dummy_data_clicked)
         self.top.vbox.pack_start(self.check_persons,0,0,5)
 
+        self.check_synthetic = Gtk.CheckButton(label=_("Generate a large "
+                                "realistic tree instead of dummy data"))
+        self.check_synthetic.set_active( self.options.handler.options_dict['synthetic'])
+        self.top.vbox.pack_start(self.check_synthetic,0,0,5)
+
         self.check_longnames = Gtk.CheckButton(label=_("Generate long names"))
         self.check_longnames.set_active( self.options.handler.options_dict['long_names'])
         self.top.vbox.pack_start(self.check_longnames,0,0,5)
@@ -252,6 +258,8 @@ class TestcaseGenerator(tool.BatchTool):
             self.check_bugs.get_active())
         self.options.handler.options_dict['persons']  = int(
             self.check_persons.get_active())
+        self.options.handler.options_dict['synthetic']  = int(
+            self.check_synthetic.get_active())
         self.options.handler.options_dict['long_names']  = int(
             self.check_longnames.get_active())
         self.options.handler.options_dict['specialchars']  = int(
@@ -272,6 +280,7 @@ class TestcaseGenerator(tool.BatchTool):
     def on_dummy_data_clicked(self, obj):
         self.label.set_sensitive(obj.get_active())
         self.entry_count.set_sensitive(obj.get_active())
+        self.check_synthetic.set_sensitive(obj.get_active())
         
     def run_tool(self, cli=False):
         self.cli = cli
@@ -294,7 +303,10 @@ class TestcaseGenerator(tool.BatchTool):
         if self.options.handler.options_dict['bugs']:
             self.generate_data_errors()
         
-        if self.options.handler.options_dict['persons']:
+        if (self.options.handler.options_dict['persons'] and
+                self.options.handler.options_dict['synthetic']):
+            self.generate_synthetic_tree()
+        elif self.options.handler.options_dict['persons']:
             self.progress.set_pass(_('Generating families'),
                             self.options.handler.options_dict['person_count'])
             self.person_count = 0
@@ -322,6 +334,22 @@ class TestcaseGenerator(tool.BatchTool):
         if( not cli):
             self.top.destroy()
         
+    def generate_synthetic_tree(self):
+        """
+        Generate a large realistic tree in one batch transaction, see
+        :class:`.TreeGenerator`.
+        """
+        options = self.options.handler.options_dict
+        self.progress.set_pass(_('Generating a synthetic tree'),
+                               options['person_count'])
+        generator = TreeGenerator(self.db, seed=options['seed'],
+                                  generations=options['generations'],
+                                  events=options['events'],
+                                  places=options['places'],
+                                  citations=options['citations'],
+                                  media=options['media'])
+        generator.generate(options['person_count'], self.progress.step)
+
     def generate_data_errors(self):
         """This generates errors in the database to test src/plugins/tool/Check
         The module names correspond to the checking methods in 
@@ -2015,6 +2043,13 @@ class TestcaseGeneratorOptions(tool.ToolOptions):
             'specialchars'  : 0,
             'add_serial'    : 0,
             'add_linebreak' : 0,
+            'synthetic'     : 0,
+            'seed'          : 0,
+            'generations'   : 10,
+            'events'        : 2,
+            'places'        : 0,
+            'citations'     : 50,
+            'media'         : 10,
         }
         self.options_help = {
             'lowlevel'      : ("=0/1",
@@ -2048,4 +2083,30 @@ class TestcaseGeneratorOptions(tool.ToolOptions):
                                 "Whether to add a line break to every text field",
                                 ["No linebreak","Add line break"],
                                 True),
+            'synthetic'     : ("=0/1",
+                                "Whether to create a large realistic tree "
+                                "in one batch instead of dummy persons",
+                                ["Dummy persons","Realistic tree"],
+                                True),
+            'seed'          : ("=int",
+                                "Seed of the random numbers of the "
+                                "realistic tree",
+                                "Random seed"),
+            'generations'   : ("=int",
+                                "Number of generations of the realistic tree",
+                                "Number of generations"),
+            'events'        : ("=int",
+                                "Average number of events per person besides "
+                                "birth, death and burial",
+                                "Number of events"),
+            'places'        : ("=int",
+                                "Number of places of the realistic tree, "
+                                "0 for one per 20 persons",
+                                "Number of places"),
+            'citations'     : ("=int",
+                                "Percentage of events with a citation",
+                                "Percentage"),
+            'media'         : ("=int",
+                                "Percentage of persons with a media reference",
+                                "Percentage"),
         }
@@ -35,6 +35,7 @@ from __future__ import division, print_function
 
 import os
 import sys
+from collections import namedtuple
 if sys.version_info[0] < 3:
     import cPickle as pickle
 else:
@@ -84,166 +85,207 @@ WIKI_HELP_SEC = _('manual|Verify_the_Data...')
 
 #-------------------------------------------------------------------------
 #
-# temp storage and related functions
+# Precomputed data
 #
 #-------------------------------------------------------------------------
-_person_cache = {}
-_family_cache = {}
-_event_cache = {}
 _today = Today().get_sort_value()
 
-def find_event(db, handle):
-    if handle in _event_cache:
-        obj = _event_cache[handle]
-    else:
-        obj = db.get_event_from_handle(handle)
-        _event_cache[handle] = obj
-    return obj
-
-def find_person(db, handle):
-    if handle in _person_cache:
-        obj = _person_cache[handle]
-    else:
-        obj = db.get_person_from_handle(handle)
-        _person_cache[handle] = obj
-    return obj
+# The facts of a person the rules test. birth, death, bapt and bury are
+# (date, estimated date) pairs of sort values. A date is 0 if it is unknown
+# or, unless it is estimated, if its day or month is unknown. The estimated
+# birth and death dates fall back to baptism and burial. bury is
+# (None, None) if the person has no burial in the primary role.
+PersonData = namedtuple('PersonData',
+                        'handle gramps_id name gender birth death bapt bury '
+                        'birth_surname n_parents n_families n_children '
+                        'invalid_birth invalid_death')
+
+# The facts of a family the rules test. marriage is the sort value of the
+# marriage date, or 0.
+FamilyData = namedtuple('FamilyData',
+                        'handle gramps_id father mother children marriage '
+                        'married')
+
+# ref is the handle of the child, mrel and frel whether the child is a
+# birth child of the mother and father
+ChildData = namedtuple('ChildData', 'ref mrel frel')
+
+def _event_date(event, estimate):
+    """
+    Return the date of a (type, sort value, exact, valid) event summary.
+    """
+    if event is None:
+        return 0
+    if not estimate and not event[2]:
+        return 0
+    return event[1]
 
-def find_family(db, handle):
-    if handle in _family_cache:
-        obj = _family_cache[handle]
-    else:
-        obj = db.get_family_from_handle(handle)
-        _family_cache[handle] = obj
-    return obj
+class VerifyData(object):
+    """
+    The facts of all the people and families the rules test, read in one
+    pass over the events, the families and the people.
+    """
 
-def clear_cache():
-    _person_cache.clear()
-    _family_cache.clear()
-    _event_cache.clear()   
+    def __init__(self, db, callback=None):
+        """
+        :param callback: called once for each event, family and person read
+        """
+        self.db = db
+        events = {}
+        for event in db.iter_events():
+            if callback:
+                callback()
+            date = event.get_date_object()
+            events[event.get_handle()] = (
+                event.get_type().value, date.get_sort_value(),
+                date.get_day() != 0 and date.get_month() != 0,
+                date.get_valid())
+
+        self.families = {}
+        self.family_list = []
+        for family in db.iter_families():
+            if callback:
+                callback()
+            marriage = 0
+            for event_ref in family.get_event_ref_list():
+                event = events.get(event_ref.ref)
+                if (event and event[0] == EventType.MARRIAGE and
+                        event_ref.get_role() in (EventRoleType.FAMILY,
+                                                 EventRoleType.PRIMARY)):
+                    marriage = event[1]
+                    break
+            children = tuple(
+                ChildData(child_ref.ref, child_ref.mrel == ChildRefType.BIRTH,
+                          child_ref.frel == ChildRefType.BIRTH)
+                for child_ref in family.get_child_ref_list())
+            data = FamilyData(
+                family.get_handle(), family.get_gramps_id(),
+                family.get_father_handle(), family.get_mother_handle(),
+                children, marriage,
+                family.get_relationship() == FamilyRelType.MARRIED)
+            self.families[data.handle] = data
+            self.family_list.append(data)
+
+        self.people = {}
+        self.person_list = []
+        for person in db.iter_people():
+            if callback:
+                callback()
+            data = self.__person_data(person, events)
+            self.people[data.handle] = data
+            self.person_list.append(data)
+
+    def __person_data(self, person, events):
+        birth_ref = person.get_birth_ref()
+        birth = events.get(birth_ref.ref) if birth_ref else None
+        death_ref = person.get_death_ref()
+        death = events.get(death_ref.ref) if death_ref else None
+        bapt = bury = None
+        for event_ref in person.get_event_ref_list():
+            event = events.get(event_ref.ref)
+            if event is None:
+                continue
+            if event[0] == EventType.BAPTISM:
+                if bapt is None:
+                    bapt = event
+            elif (event[0] == EventType.BURIAL and bury is None and
+                  event_ref.get_role() == EventRoleType.PRIMARY):
+                bury = event
+
+        bapt_dates = (_event_date(bapt, False), _event_date(bapt, True))
+        if bury is None:
+            bury_dates = (None, None)
+        else:
+            bury_dates = (_event_date(bury, False), _event_date(bury, True))
+        birth_dates = (_event_date(birth, False),
+                       _event_date(birth, True) or bapt_dates[1])
+        death_dates = (_event_date(death, False),
+                       _event_date(death, True) or bury_dates[1] or 0)
+
+        name = person.get_primary_name()
+        if name.get_type() == NameType.BIRTH:
+            birth_surname = name.get_surname()
+        else:
+            birth_surname = None
+
+        n_children = 0
+        for family_handle in person.get_family_handle_list():
+            family = self.families.get(family_handle)
+            if family:
+                n_children += len(family.children)
+
+        return PersonData(
+            person.get_handle(), person.get_gramps_id(), name.get_name(),
+            person.get_gender(), birth_dates, death_dates, bapt_dates,
+            bury_dates, birth_surname,
+            len(person.get_parent_family_handle_list()),
+            len(person.get_family_handle_list()), n_children,
+            birth is not None and not birth[3],
+            death is not None and not death[3])
 
 #-------------------------------------------------------------------------
 #
 # helper functions
 #
 #-------------------------------------------------------------------------
-def get_date_from_event_handle(db, event_handle, estimate=False):
-    if not event_handle:
-        return 0
-    event =  find_event(db,event_handle)
-    if event:
-        date_obj = event.get_date_object()
-        if not estimate and \
-           (date_obj.get_day() == 0 or date_obj.get_month() == 0):
-            return 0
-        return date_obj.get_sort_value()
-    else:
-        return 0
-
-def get_date_from_event_type(db, person, event_type, estimate=False):
-    if not person:
-        return 0
-    for event_ref in person.get_event_ref_list():
-        event = find_event(db,event_ref.ref)
-        if event:
-            if event_ref.get_role() != EventRoleType.PRIMARY and \
-                event.get_type() == EventType.BURIAL:
-                continue
-            if event.get_type() == event_type:
-                date_obj = event.get_date_object()
-                if not estimate and \
-                   (date_obj.get_day() == 0 or date_obj.get_month() == 0):
-                    return 0
-                return date_obj.get_sort_value()
-    return 0
+def find_person(data, handle):
+    return data.people.get(handle)
 
-def get_bapt_date(db, person, estimate=False):
-    return get_date_from_event_type(db, person, 
-                                    EventType.BAPTISM, estimate)
+def get_bapt_date(data, person, estimate=False):
+    return person.bapt[bool(estimate)]
 
-def get_bury_date(db, person, estimate=False):
-    # check role on burial event
-    for event_ref in person.get_event_ref_list():
-        event = find_event(db, event_ref.ref)
-        if event and event.get_type() == EventType.BURIAL and \
-        event_ref.get_role() == EventRoleType.PRIMARY:
-            return get_date_from_event_type(db, person, 
-                                            EventType.BURIAL, estimate)
+def get_bury_date(data, person, estimate=False):
+    return person.bury[bool(estimate)]
 
-def get_birth_date(db, person, estimate=False):
+def get_birth_date(data, person, estimate=False):
     if not person:
         return 0
-    birth_ref = person.get_birth_ref()
-    if not birth_ref:
-        ret = 0
-    else:
-        ret = get_date_from_event_handle(db,birth_ref.ref,estimate)
-    if estimate and (ret == 0):
-        ret = get_bapt_date(db,person,estimate)
-    return ret
+    return person.birth[bool(estimate)]
 
-def get_death_date(db, person, estimate=False):
+def get_death_date(data, person, estimate=False):
     if not person:
         return 0
-    death_ref = person.get_death_ref()
-    if not death_ref:
-        ret = 0
-    else:
-        ret = get_date_from_event_handle(db,death_ref.ref,estimate)
-    if estimate and (ret == 0):
-        ret = get_bury_date(db,person,estimate)
-    return ret
-
-def get_age_at_death(db, person, estimate):
-    birth_date = get_birth_date(db,person,estimate)
-    death_date = get_death_date(db,person,estimate)
+    return person.death[bool(estimate)]
+
+def get_age_at_death(data, person, estimate):
+    birth_date = get_birth_date(data,person,estimate)
+    death_date = get_death_date(data,person,estimate)
     if (birth_date > 0) and (death_date > 0):
         return death_date - birth_date
     return 0
 
-def get_father(db, family):
+def get_father(data, family):
     if not family:
         return None
-    father_handle = family.get_father_handle()
+    father_handle = family.father
     if father_handle:
-        return find_person(db,father_handle)
+        return find_person(data,father_handle)
     return None
 
-def get_mother(db, family):
+def get_mother(data, family):
     if not family:
         return None
-    mother_handle = family.get_mother_handle()
+    mother_handle = family.mother
     if mother_handle:
-        return find_person(db, mother_handle)
+        return find_person(data, mother_handle)
     return None
 
-def get_child_birth_dates(db, family, estimate):
+def get_child_birth_dates(data, family, estimate):
     dates = []
-    for child_ref in family.get_child_ref_list():
-        child = find_person(db,child_ref.ref)
-        child_birth_date = get_birth_date(db, child, estimate)
+    for child_ref in family.children:
+        child = find_person(data,child_ref.ref)
+        child_birth_date = get_birth_date(data, child, estimate)
         if child_birth_date > 0:
             dates.append(child_birth_date)
     return dates
 
-def get_n_children(db, person):
-    n = 0
-    for family_handle in person.get_family_handle_list():
-        family = find_family(db,family_handle)
-        if family:
-            n += len(family.get_child_ref_list())
-    return n
+def get_n_children(data, person):
+    return person.n_children
 
-def get_marriage_date(db, family):
+def get_marriage_date(data, family):
     if not family:
         return 0
-    for event_ref in family.get_event_ref_list():
-        event = find_event(db,event_ref.ref)
-        if event.get_type() == EventType.MARRIAGE and \
-        (event_ref.get_role() == EventRoleType.FAMILY or 
-        event_ref.get_role() == EventRoleType.PRIMARY ):
-            date_obj = event.get_date_object()
-            return date_obj.get_sort_value()
-    return 0
+    return family.marriage
 
 #-------------------------------------------------------------------------
 #
@@ -365,76 +407,34 @@ class Verify(tool.Tool, ManagedWindow, UpdateCallback):
 
     def run_tool(self,cli=False):
 
-        person_handles = self.db.iter_person_handles()
-        
-        for option, value in \
-          self.options.handler.options_dict.items():
-            exec('%s = %s' % (option, value), globals())
+        options = self.options.handler.options_dict
 
         if self.vr:
             self.vr.real_model.clear()
 
-        self.set_total(self.db.get_number_of_people() +
-                       self.db.get_number_of_families())
-
-        for person_handle in person_handles:
-            person = find_person(self.db, person_handle)
-
-            rule_list = [
-                BirthAfterBapt(self.db, person),
-                DeathBeforeBapt(self.db, person),
-                BirthAfterBury(self.db, person),
-                DeathAfterBury(self.db, person),
-                BirthAfterDeath(self.db, person),
-                BaptAfterBury(self.db, person),
-                OldAge(self.db, person, oldage, estimate_age),
-                OldAgeButNoDeath(self.db, person, oldage, estimate_age),
-                UnknownGender(self.db, person),
-                MultipleParents(self.db, person),
-                MarriedOften(self.db, person, wedder),
-                OldUnmarried(self.db, person, oldunm, estimate_age),
-                TooManyChildren(self.db, person, mxchilddad, mxchildmom),
-                Disconnected(self.db, person),
-                InvalidBirthDate(self.db, person, invdate),
-                InvalidDeathDate(self.db, person, invdate),
-                ]
-
-            for rule in rule_list:
+        # reading the data, then testing each person and family
+        self.set_total(self.db.get_number_of_events() +
+                       2 * (self.db.get_number_of_people() +
+                            self.db.get_number_of_families()))
+
+        data = VerifyData(self.db, None if cli else self.update)
+
+        for person in data.person_list:
+            for rule_class, option_names in PERSON_RULES:
+                params = [options[name] for name in option_names]
+                rule = rule_class(data, person, *params)
                 if rule.broken():
                     self.add_results(rule.report_itself())
-
-            clear_cache()
             if not cli:
                 self.update()
 
         # Family-based rules
-        for family_handle in self.db.iter_family_handles():
-            family = find_family(self.db,family_handle)
-
-            rule_list = [
-                SameSexFamily(self.db,family),
-                FemaleHusband(self.db,family),
-                MaleWife(self.db,family),
-                SameSurnameFamily(self.db,family),
-                LargeAgeGapFamily(self.db,family, hwdif,estimate_age),
-                MarriageBeforeBirth(self.db,family,estimate_age),
-                MarriageAfterDeath(self.db,family,estimate_age),
-                EarlyMarriage(self.db,family,yngmar,estimate_age),
-                LateMarriage(self.db,family, oldmar,estimate_age),
-                OldParent(self.db,family, oldmom, olddad,estimate_age),
-                YoungParent(self.db,family,yngmom,yngdad,estimate_age),
-                UnbornParent(self.db,family,estimate_age),
-                DeadParent(self.db,family,estimate_age),
-                LargeChildrenSpan(self.db,family,cbspan,estimate_age),
-                LargeChildrenAgeDiff(self.db,family,cspace,estimate_age),
-                MarriedRelation(self.db,family),
-                ]
-
-            for rule in rule_list:
+        for family in data.family_list:
+            for rule_class, option_names in FAMILY_RULES:
+                params = [options[name] for name in option_names]
+                rule = rule_class(data, family, *params)
                 if rule.broken():
                     self.add_results(rule.report_itself())
-                
-            clear_cache()
             if not cli:
                 self.update()
 
@@ -802,8 +802,13 @@ class Rule(object):
 
     SEVERITY = WARNING
 
-    def __init__(self,db, obj):
-        self.db = db
+    def __init__(self, data, obj):
+        """
+        :param data: the :class:`VerifyData` of the database
+        :param obj: the :class:`PersonData` or :class:`FamilyData` to test
+        """
+        self.data = data
+        self.db = data.db
         self.obj = obj
 
     def broken(self):
@@ -850,7 +855,7 @@ class PersonRule(Rule):
     """
     TYPE = 'Person'
     def get_name(self):
-        return self.obj.get_primary_name().get_name()
+        return self.obj.name
 
 class FamilyRule(Rule):
     """
@@ -858,7 +863,8 @@ class FamilyRule(Rule):
     """
     TYPE = 'Family'
     def get_name(self):
-        return family_name(self.obj,self.db)
+        family = self.db.get_family_from_handle(self.obj.handle)
+        return family_name(family,self.db)
 
 #-------------------------------------------------------------------------
 #
@@ -869,8 +875,8 @@ class BirthAfterBapt(PersonRule):
     ID = 1
     SEVERITY = Rule.ERROR
     def broken(self):
-        birth_date = get_birth_date(self.db,self.obj)
-        bapt_date = get_bapt_date(self.db,self.obj)
+        birth_date = get_birth_date(self.data,self.obj)
+        bapt_date = get_bapt_date(self.data,self.obj)
         birth_ok = birth_date > 0 if birth_date is not None else False
         bapt_ok = bapt_date > 0 if bapt_date is not None else False
         return (birth_ok and bapt_ok and birth_date > bapt_date)
@@ -882,8 +888,8 @@ class DeathBeforeBapt(PersonRule):
     ID = 2
     SEVERITY = Rule.ERROR
     def broken(self):
-        death_date = get_death_date(self.db,self.obj)
-        bapt_date = get_bapt_date(self.db,self.obj)
+        death_date = get_death_date(self.data,self.obj)
+        bapt_date = get_bapt_date(self.data,self.obj)
         bapt_ok = bapt_date > 0 if bapt_date is not None else False
         death_ok = death_date > 0 if death_date is not None else False
         return (death_ok and bapt_ok and bapt_date > death_date)
@@ -895,8 +901,8 @@ class BirthAfterBury(PersonRule):
     ID = 3
     SEVERITY = Rule.ERROR
     def broken(self):
-        birth_date = get_birth_date(self.db, self.obj)
-        bury_date = get_bury_date(self.db, self.obj)
+        birth_date = get_birth_date(self.data, self.obj)
+        bury_date = get_bury_date(self.data, self.obj)
         birth_ok = birth_date > 0 if birth_date is not None else False
         bury_ok = bury_date > 0 if bury_date is not None else False
         return (birth_ok and bury_ok and birth_date > bury_date)
@@ -908,8 +914,8 @@ class DeathAfterBury(PersonRule):
     ID = 4
     SEVERITY = Rule.ERROR
     def broken(self):
-        death_date = get_death_date(self.db,self.obj)
-        bury_date = get_bury_date(self.db,self.obj)
+        death_date = get_death_date(self.data,self.obj)
+        bury_date = get_bury_date(self.data,self.obj)
         death_ok = death_date > 0 if death_date is not None else False
         bury_ok = bury_date > 0 if bury_date is not None else False
         return (death_ok and bury_ok and death_date > bury_date)
@@ -921,8 +927,8 @@ class BirthAfterDeath(PersonRule):
     ID = 5
     SEVERITY = Rule.ERROR
     def broken(self):
-        birth_date = get_birth_date(self.db,self.obj)
-        death_date = get_death_date(self.db,self.obj)
+        birth_date = get_birth_date(self.data,self.obj)
+        death_date = get_death_date(self.data,self.obj)
         birth_ok = birth_date > 0 if birth_date is not None else False
         death_ok = death_date > 0 if death_date is not None else False
         return (birth_ok and death_ok and birth_date > death_date)
@@ -934,8 +940,8 @@ class BaptAfterBury(PersonRule):
     ID = 6
     SEVERITY = Rule.ERROR
     def broken(self):
-        bapt_date = get_bapt_date(self.db,self.obj)
-        bury_date = get_bury_date(self.db,self.obj)
+        bapt_date = get_bapt_date(self.data,self.obj)
+        bury_date = get_bury_date(self.data,self.obj)
         bapt_ok = bapt_date > 0 if bapt_date is not None else False
         bury_ok = bury_date > 0 if bury_date is not None else False
         return (bapt_ok and bury_ok and bapt_date > bury_date)
@@ -946,8 +952,8 @@ class BaptAfterBury(PersonRule):
 class OldAge(PersonRule):
     ID = 7
     SEVERITY = Rule.WARNING
-    def __init__(self,db,person, old_age,est):
-        PersonRule.__init__(self,db,person)
+    def __init__(self,data,person, old_age,est):
+        PersonRule.__init__(self,data,person)
         self.old_age = old_age
         self.est = est
 
@@ -955,7 +961,7 @@ class OldAge(PersonRule):
         return (self.old_age,self.est)
 
     def broken(self):
-        age_at_death = get_age_at_death(self.db, self.obj, self.est)
+        age_at_death = get_age_at_death(self.data, self.obj, self.est)
         return (age_at_death/365 > self.old_age)
 
     def get_message(self):
@@ -965,8 +971,8 @@ class UnknownGender(PersonRule):
     ID = 8
     SEVERITY = Rule.WARNING
     def broken(self):
-        female = self.obj.get_gender() == Person.FEMALE
-        male = self.obj.get_gender() == Person.MALE
+        female = self.obj.gender == Person.FEMALE
+        male = self.obj.gender == Person.MALE
         return not (male or female)
 
     def get_message(self):
@@ -976,7 +982,7 @@ class MultipleParents(PersonRule):
     ID = 9
     SEVERITY = Rule.WARNING
     def broken(self):
-        n_parent_sets = len(self.obj.get_parent_family_handle_list())
+        n_parent_sets = self.obj.n_parents
         return (n_parent_sets>1)
 
     def get_message(self):
@@ -985,15 +991,15 @@ class MultipleParents(PersonRule):
 class MarriedOften(PersonRule):
     ID = 10
     SEVERITY = Rule.WARNING
-    def __init__(self,db,person,wedder):
-        PersonRule.__init__(self,db,person)
+    def __init__(self,data,person,wedder):
+        PersonRule.__init__(self,data,person)
         self.wedder = wedder
 
     def _get_params(self):
         return (self.wedder,)
 
     def broken(self):
-        n_spouses = len(self.obj.get_family_handle_list())
+        n_spouses = self.obj.n_families
         return (n_spouses>self.wedder)
 
     def get_message(self):
@@ -1002,8 +1008,8 @@ class MarriedOften(PersonRule):
 class OldUnmarried(PersonRule):
     ID = 11
     SEVERITY = Rule.WARNING
-    def __init__(self,db,person, old_unm,est):
-        PersonRule.__init__(self,db,person)
+    def __init__(self,data,person, old_unm,est):
+        PersonRule.__init__(self,data,person)
         self.old_unm = old_unm
         self.est = est
 
@@ -1011,8 +1017,8 @@ class OldUnmarried(PersonRule):
         return (self.old_unm,self.est)
 
     def broken(self):
-        age_at_death = get_age_at_death(self.db,self.obj,self.est)
-        n_spouses = len(self.obj.get_family_handle_list())
+        age_at_death = get_age_at_death(self.data,self.obj,self.est)
+        n_spouses = self.obj.n_families
         return (age_at_death/365 > self.old_unm and n_spouses==0)
 
     def get_message(self):
@@ -1021,8 +1027,8 @@ class OldUnmarried(PersonRule):
 class TooManyChildren(PersonRule):
     ID = 12
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj,mx_child_dad,mx_child_mom):
-        PersonRule.__init__(self,db, obj)
+    def __init__(self,data, obj,mx_child_dad,mx_child_mom):
+        PersonRule.__init__(self,data, obj)
         self.mx_child_dad = mx_child_dad
         self.mx_child_mom = mx_child_mom
 
@@ -1030,13 +1036,13 @@ class TooManyChildren(PersonRule):
         return (self.mx_child_dad,self.mx_child_mom)
 
     def broken(self):
-        n_child = get_n_children(self.db,self.obj)
+        n_child = get_n_children(self.data,self.obj)
 
-        if (self.obj.get_gender == Person.MALE
+        if (self.obj.gender == Person.MALE
                and n_child > self.mx_child_dad):
             return True
 
-        if (self.obj.get_gender == Person.FEMALE
+        if (self.obj.gender == Person.FEMALE
                and n_child > self.mx_child_mom):
             return True
 
@@ -1049,12 +1055,12 @@ class SameSexFamily(FamilyRule):
     ID = 13
     SEVERITY = Rule.WARNING
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
         same_sex = (mother and father and
-                    (mother.get_gender() == father.get_gender()))
+                    (mother.gender == father.gender))
         unknown_sex = (mother and
-                       (mother.get_gender() == Person.UNKNOWN))
+                       (mother.gender == Person.UNKNOWN))
         return (same_sex and not unknown_sex)
 
     def get_message(self):
@@ -1064,8 +1070,8 @@ class FemaleHusband(FamilyRule):
     ID = 14
     SEVERITY = Rule.WARNING
     def broken(self):
-        father = get_father(self.db,self.obj)
-        return (father and (father.get_gender() == Person.FEMALE))
+        father = get_father(self.data,self.obj)
+        return (father and (father.gender == Person.FEMALE))
 
     def get_message(self):
         return _("Female husband")
@@ -1074,8 +1080,8 @@ class MaleWife(FamilyRule):
     ID = 15
     SEVERITY = Rule.WARNING
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        return (mother and (mother.get_gender() == Person.MALE))
+        mother = get_mother(self.data,self.obj)
+        return (mother and (mother.gender == Person.MALE))
 
     def get_message(self):
         return _("Male wife")
@@ -1084,22 +1090,20 @@ class SameSurnameFamily(FamilyRule):
     ID = 16
     SEVERITY = Rule.WARNING
     def broken(self):
-        mother = get_mother(self.db, self.obj)
-        father = get_father(self.db, self.obj)
+        mother = get_mother(self.data, self.obj)
+        father = get_father(self.data, self.obj)
         _broken = False
         
         # Make sure both mother and father exist.
         if mother and father:
-            mname = mother.get_primary_name()
-            fname = father.get_primary_name()
+            mname = mother.birth_surname
+            fname = father.birth_surname
             # Only compare birth names (not married names).
-            if mname.get_type() == NameType.BIRTH and \
-               fname.get_type() == NameType.BIRTH:
+            if mname is not None and fname is not None:
                 # Empty names don't count.
-                if len(mname.get_surname()) != 0 and \
-                   len(fname.get_surname()) != 0:
+                if len(mname) != 0 and len(fname) != 0:
                     # Finally, check if the names are the same.
-                    if mname.get_surname() == fname.get_surname():
+                    if mname == fname:
                         _broken = True
 
         return _broken
@@ -1110,8 +1114,8 @@ class SameSurnameFamily(FamilyRule):
 class LargeAgeGapFamily(FamilyRule):
     ID = 17
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj, hw_diff,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj, hw_diff,est):
+        FamilyRule.__init__(self,data, obj)
         self.hw_diff = hw_diff
         self.est = est
 
@@ -1119,10 +1123,10 @@ class LargeAgeGapFamily(FamilyRule):
         return (self.hw_diff,self.est)
 
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
         large_diff = \
@@ -1135,21 +1139,21 @@ class LargeAgeGapFamily(FamilyRule):
 class MarriageBeforeBirth(FamilyRule):
     ID = 18
     SEVERITY = Rule.ERROR
-    def __init__(self,db, obj,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,est):
+        FamilyRule.__init__(self,data, obj)
         self.est = est
 
     def _get_params(self):
         return (self.est,)
 
     def broken(self):
-        marr_date = get_marriage_date(self.db,self.obj)
+        marr_date = get_marriage_date(self.data,self.obj)
         marr_date_ok = marr_date > 0
 
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
@@ -1166,21 +1170,21 @@ class MarriageBeforeBirth(FamilyRule):
 class MarriageAfterDeath(FamilyRule):
     ID = 19
     SEVERITY = Rule.ERROR
-    def __init__(self,db, obj,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,est):
+        FamilyRule.__init__(self,data, obj)
         self.est = est
 
     def _get_params(self):
         return (self.est,)
 
     def broken(self):
-        marr_date = get_marriage_date(self.db,self.obj)
+        marr_date = get_marriage_date(self.data,self.obj)
         marr_date_ok = marr_date > 0
 
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_death_date = get_death_date(self.db,mother,self.est)
-        father_death_date = get_death_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_death_date = get_death_date(self.data,mother,self.est)
+        father_death_date = get_death_date(self.data,father,self.est)
         mother_death_date_ok = mother_death_date > 0
         father_death_date_ok = father_death_date > 0
 
@@ -1197,8 +1201,8 @@ class MarriageAfterDeath(FamilyRule):
 class EarlyMarriage(FamilyRule):
     ID = 20
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj,yng_mar,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,yng_mar,est):
+        FamilyRule.__init__(self,data, obj)
         self.yng_mar = yng_mar
         self.est = est
 
@@ -1206,13 +1210,13 @@ class EarlyMarriage(FamilyRule):
         return (self.yng_mar,self.est,)
 
     def broken(self):
-        marr_date = get_marriage_date(self.db,self.obj)
+        marr_date = get_marriage_date(self.data,self.obj)
         marr_date_ok = marr_date > 0
 
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
@@ -1231,8 +1235,8 @@ class EarlyMarriage(FamilyRule):
 class LateMarriage(FamilyRule):
     ID = 21
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj, old_mar,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj, old_mar,est):
+        FamilyRule.__init__(self,data, obj)
         self.old_mar = old_mar
         self.est = est
 
@@ -1240,13 +1244,13 @@ class LateMarriage(FamilyRule):
         return (self.old_mar,self.est)
 
     def broken(self):
-        marr_date = get_marriage_date(self.db,self.obj)
+        marr_date = get_marriage_date(self.data,self.obj)
         marr_date_ok = marr_date > 0
 
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
@@ -1282,8 +1286,8 @@ class LateMarriage(FamilyRule):
 class OldParent(FamilyRule):
     ID = 22
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj, old_mom, old_dad,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj, old_mom, old_dad,est):
+        FamilyRule.__init__(self,data, obj)
         self.old_mom = old_mom
         self.old_dad = old_dad
         self.est = est
@@ -1292,16 +1296,16 @@ class OldParent(FamilyRule):
         return (self.old_mom,self.old_dad,self.est)
 
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db,child_ref.ref)
-            child_birth_date = get_birth_date(self.db,child,self.est)
+        for child_ref in self.obj.children:
+            child = find_person(self.data,child_ref.ref)
+            child_birth_date = get_birth_date(self.data,child,self.est)
             child_birth_date_ok = child_birth_date > 0
             if not child_birth_date_ok:
                 continue
@@ -1327,8 +1331,8 @@ class OldParent(FamilyRule):
 class YoungParent(FamilyRule):
     ID = 23
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj,yng_mom,yng_dad,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,yng_mom,yng_dad,est):
+        FamilyRule.__init__(self,data, obj)
         self.yng_dad = yng_dad
         self.yng_mom = yng_mom
         self.est = est
@@ -1337,16 +1341,16 @@ class YoungParent(FamilyRule):
         return (self.yng_mom,self.yng_dad,self.est)
 
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db,child_ref.ref)
-            child_birth_date = get_birth_date(self.db,child,self.est)
+        for child_ref in self.obj.children:
+            child = find_person(self.data,child_ref.ref)
+            child_birth_date = get_birth_date(self.data,child,self.est)
             child_birth_date_ok = child_birth_date > 0
             if not child_birth_date_ok:
                 continue
@@ -1372,24 +1376,24 @@ class YoungParent(FamilyRule):
 class UnbornParent(FamilyRule):
     ID = 24
     SEVERITY = Rule.ERROR
-    def __init__(self,db, obj,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,est):
+        FamilyRule.__init__(self,data, obj)
         self.est = est
 
     def _get_params(self):
         return (self.est,)
 
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_birth_date = get_birth_date(self.db,mother,self.est)
-        father_birth_date = get_birth_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_birth_date = get_birth_date(self.data,mother,self.est)
+        father_birth_date = get_birth_date(self.data,father,self.est)
         mother_birth_date_ok = mother_birth_date > 0
         father_birth_date_ok = father_birth_date > 0
 
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db,child_ref.ref)
-            child_birth_date = get_birth_date(self.db,child,self.est)
+        for child_ref in self.obj.children:
+            child = find_person(self.data,child_ref.ref)
+            child_birth_date = get_birth_date(self.data,child,self.est)
             child_birth_date_ok = child_birth_date > 0
             if not child_birth_date_ok:
                 continue
@@ -1414,30 +1418,30 @@ class UnbornParent(FamilyRule):
 class DeadParent(FamilyRule):
     ID = 25
     SEVERITY = Rule.ERROR
-    def __init__(self,db, obj,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,est):
+        FamilyRule.__init__(self,data, obj)
         self.est = est
 
     def _get_params(self):
         return (self.est,)
 
     def broken(self):
-        mother = get_mother(self.db,self.obj)
-        father = get_father(self.db,self.obj)
-        mother_death_date = get_death_date(self.db,mother,self.est)
-        father_death_date = get_death_date(self.db,father,self.est)
+        mother = get_mother(self.data,self.obj)
+        father = get_father(self.data,self.obj)
+        mother_death_date = get_death_date(self.data,mother,self.est)
+        father_death_date = get_death_date(self.data,father,self.est)
         mother_death_date_ok = mother_death_date > 0
         father_death_date_ok = father_death_date > 0
 
-        for child_ref in self.obj.get_child_ref_list():
-            child = find_person(self.db,child_ref.ref)
-            child_birth_date = get_birth_date(self.db,child,self.est)
+        for child_ref in self.obj.children:
+            child = find_person(self.data,child_ref.ref)
+            child_birth_date = get_birth_date(self.data,child,self.est)
             child_birth_date_ok = child_birth_date > 0
             if not child_birth_date_ok:
                 continue
 
-            hasBirthRelToMother = child_ref.mrel == ChildRefType.BIRTH    
-            hasBirthRelToFather = child_ref.frel == ChildRefType.BIRTH
+            hasBirthRelToMother = child_ref.mrel
+            hasBirthRelToFather = child_ref.frel
             
             father_broken = (hasBirthRelToFather
                              and father_death_date_ok
@@ -1462,8 +1466,8 @@ class DeadParent(FamilyRule):
 class LargeChildrenSpan(FamilyRule):
     ID = 26
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj,cb_span,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,cb_span,est):
+        FamilyRule.__init__(self,data, obj)
         self.cb_span = cb_span
         self.est = est
 
@@ -1471,7 +1475,7 @@ class LargeChildrenSpan(FamilyRule):
         return (self.cb_span,self.est)
 
     def broken(self):
-        child_birh_dates = get_child_birth_dates(self.db,self.obj,self.est)
+        child_birh_dates = get_child_birth_dates(self.data,self.obj,self.est)
         child_birh_dates.sort()
         
         return (child_birh_dates and ((child_birh_dates[-1]
@@ -1484,8 +1488,8 @@ class LargeChildrenSpan(FamilyRule):
 class LargeChildrenAgeDiff(FamilyRule):
     ID = 27
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj,c_space,est):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj,c_space,est):
+        FamilyRule.__init__(self,data, obj)
         self.c_space = c_space
         self.est = est
 
@@ -1493,7 +1497,7 @@ class LargeChildrenAgeDiff(FamilyRule):
         return (self.c_space,self.est)
 
     def broken(self):
-        child_birh_dates = get_child_birth_dates(self.db,self.obj,self.est)
+        child_birh_dates = get_child_birth_dates(self.data,self.obj,self.est)
         child_birh_dates_diff = [child_birh_dates[i+1] - child_birh_dates[i]
                                  for i in range(len(child_birh_dates)-1) ]
         
@@ -1507,8 +1511,8 @@ class Disconnected(PersonRule):
     ID = 28
     SEVERITY = Rule.WARNING
     def broken(self):
-        return (len(self.obj.get_parent_family_handle_list())
-                + len(self.obj.get_family_handle_list()) == 0)
+        return (self.obj.n_parents
+                + self.obj.n_families == 0)
 
     def get_message(self):
         return _("Disconnected individual")
@@ -1516,21 +1520,13 @@ class Disconnected(PersonRule):
 class InvalidBirthDate(PersonRule):
     ID = 29
     SEVERITY = Rule.ERROR
-    def __init__(self, db, person, invdate):
-        PersonRule.__init__(self, db, person)
+    def __init__(self, data, person, invdate):
+        PersonRule.__init__(self, data, person)
         self._invdate = invdate
 
     def broken(self):
         if not self._invdate: return False # should we check?
-        # if so, let's get the birth date
-        person = self.obj
-        birth_ref = person.get_birth_ref()
-        if birth_ref:
-            birth_event = self.db.get_event_from_handle(birth_ref.ref)
-            birth_date = birth_event.get_date_object()
-            if birth_date and not birth_date.get_valid():
-                return True
-        return False
+        return self.obj.invalid_birth
 
     def get_message(self):
         return _("Invalid birth date")
@@ -1538,21 +1534,13 @@ class InvalidBirthDate(PersonRule):
 class InvalidDeathDate(PersonRule):
     ID = 30
     SEVERITY = Rule.ERROR
-    def __init__(self, db, person, invdate):
-        PersonRule.__init__(self, db, person)
+    def __init__(self, data, person, invdate):
+        PersonRule.__init__(self, data, person)
         self._invdate = invdate
 
     def broken(self):
         if not self._invdate: return False # should we check?
-        # if so, let's get the death date
-        person = self.obj
-        death_ref = person.get_death_ref()
-        if death_ref:
-            death_event = self.db.get_event_from_handle(death_ref.ref)
-            death_date = death_event.get_date_object()
-            if death_date and not death_date.get_valid():
-                return True
-        return False
+        return self.obj.invalid_death
 
     def get_message(self):
         return _("Invalid death date")
@@ -1560,13 +1548,13 @@ class InvalidDeathDate(PersonRule):
 class MarriedRelation(FamilyRule):
     ID = 31
     SEVERITY = Rule.WARNING
-    def __init__(self,db, obj):
-        FamilyRule.__init__(self,db, obj)
+    def __init__(self,data, obj):
+        FamilyRule.__init__(self,data, obj)
 
     def broken(self):          
-        marr_date = get_marriage_date(self.db,self.obj)
+        marr_date = get_marriage_date(self.data,self.obj)
         marr_date_ok = marr_date > 0
-        married = self.obj.get_relationship() == FamilyRelType.MARRIED
+        married = self.obj.married
         if not married and marr_date_ok:
             return self.get_message
 
@@ -1576,8 +1564,8 @@ class MarriedRelation(FamilyRule):
 class OldAgeButNoDeath(PersonRule):
     ID = 32
     SEVERITY = Rule.WARNING
-    def __init__(self,db,person, old_age,est):
-        PersonRule.__init__(self,db,person)
+    def __init__(self,data,person, old_age,est):
+        PersonRule.__init__(self,data,person)
         self.old_age = old_age
         self.est = est
 
@@ -1585,8 +1573,8 @@ class OldAgeButNoDeath(PersonRule):
         return (self.old_age,self.est)
 
     def broken(self):
-        birth_date = get_birth_date(self.db,self.obj,self.est)
-        dead = get_death_date(self.db,self.obj,True) # if no death use burial
+        birth_date = get_birth_date(self.data,self.obj,self.est)
+        dead = get_death_date(self.data,self.obj,True) # if no death use burial
         if dead or not birth_date:
             return 0
         age = ( _today - birth_date ) / 365
@@ -1595,3 +1583,58 @@ class OldAgeButNoDeath(PersonRule):
     def get_message(self):
         return _("Old age but no death")
 
+#-------------------------------------------------------------------------
+#
+# The rules of the tool
+#
+#-------------------------------------------------------------------------
+# (rule class, names of the options passed to the rule after the object)
+PERSON_RULES = []
+FAMILY_RULES = []
+
+def register_rule(rule_class, *option_names):
+    """
+    Add a rule to the rules the tool tests. rule_class is a
+    :class:`PersonRule` or :class:`FamilyRule`, created for each person or
+    family with the :class:`VerifyData` of the database, the
+    :class:`PersonData` or :class:`FamilyData` to test, and the values of the
+    options named by option_names.
+    """
+    if issubclass(rule_class, FamilyRule):
+        FAMILY_RULES.append((rule_class, option_names))
+    else:
+        PERSON_RULES.append((rule_class, option_names))
+
+register_rule(BirthAfterBapt)
+register_rule(DeathBeforeBapt)
+register_rule(BirthAfterBury)
+register_rule(DeathAfterBury)
+register_rule(BirthAfterDeath)
+register_rule(BaptAfterBury)
+register_rule(OldAge, 'oldage', 'estimate_age')
+register_rule(OldAgeButNoDeath, 'oldage', 'estimate_age')
+register_rule(UnknownGender)
+register_rule(MultipleParents)
+register_rule(MarriedOften, 'wedder')
+register_rule(OldUnmarried, 'oldunm', 'estimate_age')
+register_rule(TooManyChildren, 'mxchilddad', 'mxchildmom')
+register_rule(Disconnected)
+register_rule(InvalidBirthDate, 'invdate')
+register_rule(InvalidDeathDate, 'invdate')
+
+register_rule(SameSexFamily)
+register_rule(FemaleHusband)
+register_rule(MaleWife)
+register_rule(SameSurnameFamily)
+register_rule(LargeAgeGapFamily, 'hwdif', 'estimate_age')
+register_rule(MarriageBeforeBirth, 'estimate_age')
+register_rule(MarriageAfterDeath, 'estimate_age')
+register_rule(EarlyMarriage, 'yngmar', 'estimate_age')
+register_rule(LateMarriage, 'oldmar', 'estimate_age')
+register_rule(OldParent, 'oldmom', 'olddad', 'estimate_age')
+register_rule(YoungParent, 'yngmom', 'yngdad', 'estimate_age')
+register_rule(UnbornParent, 'estimate_age')
+register_rule(DeadParent, 'estimate_age')
+register_rule(LargeChildrenSpan, 'cbspan', 'estimate_age')
+register_rule(LargeChildrenAgeDiff, 'cspace', 'estimate_age')
+register_rule(MarriedRelation)
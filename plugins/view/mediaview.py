@@ -33,6 +33,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 import os
 import sys
+import threading
 if sys.version_info[0] < 3:
     from urlparse import urlparse
     from urllib2 import url2pathname
@@ -49,6 +50,7 @@ else:
 #
 #-------------------------------------------------------------------------
 from gi.repository import Gtk
+from gi.repository import GLib
 
 #-------------------------------------------------------------------------
 #
@@ -56,6 +58,7 @@ from gi.repository import Gtk
 #
 #-------------------------------------------------------------------------
 from gramps.gui.utils import open_file_with_default_application
+from gramps.gui.thumbnails import find_media_sources, generate_thumbnails
 from gramps.gui.views.listview import ListView, TEXT, MARKUP, ICON
 from gramps.gui.views.treemodels import MediaModel
 from gramps.gen.constfunc import win, cuni, conv_to_unicode
@@ -147,10 +150,46 @@ class MediaView(ListView):
             })
 
         self.additional_uis.append(self.additional_ui())
+        # database for which the thumbnails were generated
+        self._thumbnail_db = None
 
     def navigation_type(self):
         return 'Media'
 
+    def build_tree(self, force_sidebar=False):
+        """
+        Build the view, and create the missing thumbnails of the media
+        objects in the background when the view is first shown for a
+        database.
+        """
+        ListView.build_tree(self, force_sidebar)
+        if (self.active and self.dbstate.db.is_open() and
+                self._thumbnail_db is not self.dbstate.db):
+            self._thumbnail_db = self.dbstate.db
+            sources = find_media_sources(self.dbstate.db)
+            thread = threading.Thread(target=self.__generate_thumbnails,
+                                      args=(sources,))
+            thread.daemon = True
+            thread.start()
+
+    def __generate_thumbnails(self, sources):
+        """
+        Create the thumbnails in worker threads, run in a thread.
+        """
+        count = generate_thumbnails(sources)
+        if count:
+            GLib.idle_add(self.__thumbnails_generated, count)
+
+    def __thumbnails_generated(self, count):
+        """
+        Report the generated thumbnails in the main loop.
+        """
+        self.uistate.push_message(self.dbstate,
+            glocale.translation.ngettext("%d thumbnail generated",
+                                         "%d thumbnails generated",
+                                         count) % count)
+        return False
+
     def drag_info(self):
         """
         Return the type of DND targets that this view will accept. For Media 
@@ -32,11 +32,13 @@ from __future__ import unicode_literals, division
 from cgi import escape
 import math
 import sys
-import os
+import threading
 if sys.version_info[0] < 3:
     import cPickle as pickle
+    import Queue as queue
 else:
     import pickle
+    import queue
 
 #-------------------------------------------------------------------------
 #
@@ -44,11 +46,11 @@ else:
 #
 #-------------------------------------------------------------------------
 from gi.repository import GObject
+from gi.repository import GLib
 from gi.repository import Gdk
 from gi.repository import Gtk
 from gi.repository import GdkPixbuf
 from gi.repository import PangoCairo
-import cairo
 
 #-------------------------------------------------------------------------
 #
@@ -63,13 +65,14 @@ from gramps.gen.utils.alive import probably_alive
 from gramps.gen.utils.file import media_path_full
 from gramps.gen.utils.db import find_children, find_parents, find_witnessed_people
 from gramps.gen.utils.libformatting import FormattingHelper
-from gramps.gui.thumbnails import get_thumbnail_path
+from gramps.gui.thumbnails import (get_thumbnail_path, get_thumbnail_image,
+                                   get_cached_thumbnail_image)
 from gramps.gen.errors import WindowActiveError
 from gramps.gui.editors import EditPerson, EditFamily
 from gramps.gui.ddtargets import DdTargets
 from gramps.gen.config import config
 from gramps.gui.views.bookmarks import PersonBookmarks
-from gramps.gen.const import CUSTOM_FILTERS
+from gramps.gen.const import CUSTOM_FILTERS, THUMBSCALE
 from gramps.gen.constfunc import is_quartz, win
 from gramps.gui.dialog import RunDatabaseRepair, ErrorDialog
 from gramps.gui.utils import color_graph_box, hex_to_rgb_float, is_right_click
@@ -91,6 +94,76 @@ _CHRI = _('short for christened|chr.')
 _BURI = _('short for buried|bur.')
 _CREM = _('short for cremated|crem.')
 
+#-------------------------------------------------------------------------
+#
+# _ImageLoader
+#
+#-------------------------------------------------------------------------
+class _ImageLoader(object):
+    """
+    Load the thumbnails of the person boxes in a worker thread.
+
+    Creating a thumbnail and decoding it can take long for large images, so
+    this is not done in the GTK main loop. Decoded thumbnails are kept in the
+    shared thumbnail cache, the widgets waiting for an image are updated in
+    the main loop once it is available.
+    """
+    def __init__(self):
+        self.pending = {}
+        self.queue = queue.Queue()
+        self.thread = None
+
+    def load(self, path, rectangle, widget):
+        """
+        Return the thumbnail for path and rectangle if it is cached.
+        Otherwise start loading it and return None, widget.set_image is
+        called when the image is available.
+        """
+        pixbuf = get_cached_thumbnail_image(path, rectangle)
+        if pixbuf is not None:
+            return pixbuf
+        key = (path, rectangle)
+        if key in self.pending:
+            self.pending[key].append(widget)
+            return None
+        self.pending[key] = [widget]
+        self.queue.put(key)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.__run)
+            self.thread.daemon = True
+            self.thread.start()
+        return None
+
+    def cancel(self, widget):
+        """
+        Stop waiting for the image of widget, it is destroyed.
+        """
+        widget.img_pending = False
+        for widgets in self.pending.values():
+            if widget in widgets:
+                widgets.remove(widget)
+
+    def __run(self):
+        """
+        Worker thread: create and decode the requested thumbnails.
+        """
+        while True:
+            key = self.queue.get()
+            try:
+                pixbuf = get_thumbnail_image(key[0], rectangle=key[1])
+            except (GObject.GError, IOError, OSError, MemoryError):
+                pixbuf = None
+            GLib.idle_add(self.__loaded, key, pixbuf)
+
+    def __loaded(self, key, pixbuf):
+        """
+        Called in the main loop when an image has been loaded. Widgets
+        destroyed in the meantime, by a rebuild of the view, are cancelled.
+        """
+        for widget in self.pending.pop(key, []):
+            widget.set_image(pixbuf)
+        return False
+
 class _PersonWidgetBase(Gtk.DrawingArea):
     """
     Default set up for person widgets.
@@ -157,11 +230,11 @@ class _PersonWidgetBase(Gtk.DrawingArea):
             return True
         return False
         
-    def get_image(self, dbstate, person):
+    def get_image_source(self, dbstate, person):
         """
-        Return a thumbnail image for the given person.
+        Return the media path and rectangle of the image for the given
+        person, or None if the person has no image.
         """
-        image_path = None
         media_list = person.get_media_list()
         if media_list:
             photo = media_list[0]
@@ -171,11 +244,18 @@ class _PersonWidgetBase(Gtk.DrawingArea):
             if obj:
                 mtype = obj.get_mime_type()
                 if mtype and mtype[0:5] == "image":
-                    image_path = get_thumbnail_path(
-                                media_path_full(
-                                            dbstate.db,
-                                            obj.get_path()),
-                                rectangle=photo.get_rectangle())
+                    return (media_path_full(dbstate.db, obj.get_path()),
+                            photo.get_rectangle())
+        return None
+
+    def get_image(self, dbstate, person):
+        """
+        Return a thumbnail image for the given person.
+        """
+        image_path = None
+        source = self.get_image_source(dbstate, person)
+        if source:
+            image_path = get_thumbnail_path(source[0], rectangle=source[1])
         return image_path
 
 class PersonBoxWidgetCairo(_PersonWidgetBase):
@@ -203,12 +283,19 @@ class PersonBoxWidgetCairo(_PersonWidgetBase):
         self.bgcolor = hex_to_rgb_float(self.bgcolor)
         self.bordercolor = hex_to_rgb_float(self.bordercolor)
 
-        self.img_surf = None    
+        self.img_pixbuf = None
+        self.img_pending = False
+        self.press_handler = None
         if image:
-            image_path = self.get_image(dbstate, person)
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as image:
-                    self.img_surf = cairo.ImageSurface.create_from_png(image)
+            source = self.get_image_source(dbstate, person)
+            if source:
+                # the image is loaded in the background, meanwhile a
+                # placeholder of thumbnail size is shown
+                self.img_pixbuf = view.image_loader.load(source[0], source[1],
+                                                         self)
+                self.img_pending = self.img_pixbuf is None
+                if self.img_pending:
+                    self.connect("destroy", view.image_loader.cancel)
 
         # enable mouse-over
         self.connect("enter-notify-event", self.cb_on_enter)
@@ -217,6 +304,15 @@ class PersonBoxWidgetCairo(_PersonWidgetBase):
         self.context = None
         self.textlayout = None
 
+    def set_image(self, pixbuf):
+        """Show the image loaded in the background"""
+        if not self.img_pending:
+            # destroyed, or the image is already set
+            return
+        self.img_pixbuf = pixbuf
+        self.img_pending = False
+        self.queue_draw()
+
     def cb_on_enter(self, widget, event):
         """On mouse-over highlight border"""
         if self.person or self.force_mouse_over:
@@ -265,9 +361,11 @@ class PersonBoxWidgetCairo(_PersonWidgetBase):
         size = self.textlayout.get_pixel_size()
         xmin = size[0] + 12
         ymin = size[1] + 11
-        if self.img_surf:
-            xmin += self.img_surf.get_width()
-            ymin = max(ymin, self.img_surf.get_height()+4)
+        if self.img_pixbuf:
+            xmin += self.img_pixbuf.get_width()
+            ymin = max(ymin, self.img_pixbuf.get_height()+4)
+        elif self.img_pending:
+            xmin += int(THUMBSCALE)
         self.set_size_request(max(xmin, minw), max(ymin, minh))
 
         alloc = self.get_allocation()
@@ -305,10 +403,16 @@ class PersonBoxWidgetCairo(_PersonWidgetBase):
         context.stroke()
 
         # image
-        if self.img_surf:
-            context.set_source_surface(self.img_surf,
-                alloc.width-4-self.img_surf.get_width(), 1)
+        if self.img_pixbuf:
+            Gdk.cairo_set_source_pixbuf(context, self.img_pixbuf,
+                alloc.width-4-self.img_pixbuf.get_width(), 1)
             context.paint()
+        elif self.img_pending:
+            # placeholder while the image is loaded
+            context.rectangle(alloc.width-4-THUMBSCALE, 1,
+                              THUMBSCALE, alloc.height-5)
+            context.set_source_rgba(*(self.bordercolor[:3] + (0.2,)))
+            context.fill()
 
         # Mark deceased
         context.new_path()
@@ -529,6 +633,14 @@ class PedigreeView(NavigationView):
         uistate.connect('nameformat-changed', self.person_rebuild)
         
         self.format_helper = FormattingHelper(self.dbstate)
+        # Thumbnails are loaded in the background
+        self.image_loader = _ImageLoader()
+        # Person boxes of the shown tree, kept for reuse on navigation.
+        # Keyed by person handle and display settings.
+        self._boxes = {}
+        self._old_boxes = {}
+        # probably_alive results, cleared on any database change
+        self._alive_cache = {}
         
         # Depth of tree.
         self._depth = 1
@@ -706,6 +818,8 @@ class PedigreeView(NavigationView):
         self._add_db_signal('family-add', self.person_rebuild)
         self._add_db_signal('family-delete', self.person_rebuild)
         self._add_db_signal('family-rebuild', self.person_rebuild)
+        self._add_db_signal('media-update', self.media_rebuild)
+        self._add_db_signal('media-delete', self.media_rebuild)
         
     def change_db(self, db):
         """
@@ -716,6 +830,9 @@ class PedigreeView(NavigationView):
         from self.state.db
         """
         self._change_db(db)
+        self.format_helper.clear_cache()
+        self._boxes = {}
+        self._alive_cache = {}
         if self.active:
             self.bookmarks.redraw()
         self.build_tree()
@@ -759,13 +876,31 @@ class PedigreeView(NavigationView):
         if self.active:
             self.bookmarks.redraw()
 
-    def person_rebuild(self, dummy=None):
-        """Callback function for signals of change database."""
-        self.format_helper.clear_cache()
+    def person_rebuild(self, handle_list=None):
+        """
+        Callback function for signals of change database.
+        If handle_list is given, only the cached data of these people and
+        families is cleared.
+        """
+        self.format_helper.clear_cache(handle_list)
+        self._alive_cache = {}
+        if handle_list is None:
+            self._boxes = {}
+        else:
+            for key in list(self._boxes):
+                if key[0] in handle_list:
+                    del self._boxes[key]
         self.dirty = True
         if self.active:
             self.rebuild_trees(self.get_active())
 
+    def media_rebuild(self, dummy=None):
+        """
+        Callback function for signals of changed media, the person boxes
+        know the path of their image.
+        """
+        self.person_rebuild()
+
     def rebuild_trees(self, person_handle):
         """
         Rebuild tree with root person_handle.
@@ -856,13 +991,46 @@ class PedigreeView(NavigationView):
         lst = [None] * (2**self.force_size)
         self.find_tree(person, 0, 1, lst)
 
-        # Purge current table content
+        # Purge current table content, person boxes are kept for reuse
+        reusable = set(id(pbw) for boxes in self._boxes.values()
+                                for pbw in boxes)
         for child in self.table.get_children():
-            child.destroy()
+            if id(child) in reusable:
+                self.table.remove(child)
+            else:
+                child.destroy()
         ##self.table = Gtk.Grid()
 
+        self._old_boxes = self._boxes
+        self._boxes = {}
         if person:
             self.rebuild(self.table, pos, lst, self.force_size)
+        # destroy the boxes of people no longer shown
+        for boxes in self._old_boxes.values():
+            for pbw in boxes:
+                pbw.destroy()
+        self._old_boxes = {}
+
+    def get_person_box(self, person, alive, maxlines, image):
+        """
+        Return a person box, reusing a box of the previous tree if one with
+        the same display settings exists.
+        """
+        colors = color_graph_box(alive, person.get_gender())
+        key = (person.handle, alive, maxlines, image, colors)
+        boxes = self._old_boxes.get(key)
+        if boxes:
+            pbw = boxes.pop()
+            pbw.hightlight = False
+            pbw.in_drag = False
+            if pbw.press_handler is not None:
+                pbw.disconnect(pbw.press_handler)
+                pbw.press_handler = None
+        else:
+            pbw = PersonBoxWidgetCairo(self, self.format_helper,
+                    self.dbstate, person, alive, maxlines, image)
+        self._boxes.setdefault(key, []).append(pbw)
+        return pbw
 
     def rebuild(self, table_widget, positions, lst, size):
         """
@@ -953,8 +1121,7 @@ class PedigreeView(NavigationView):
                    i < ((2**size-1) // 2) or self.tree_style == 2):
                     image = True
 
-                pbw = PersonBoxWidgetCairo(self, self.format_helper,
-                        self.dbstate, lst[i][0], lst[i][3], height, image)
+                pbw = self.get_person_box(lst[i][0], lst[i][3], height, image)
                 lst[i][4] = pbw
                 if height < 7:
                     pbw.set_tooltip_text(self.format_helper.format_person(
@@ -963,7 +1130,7 @@ class PedigreeView(NavigationView):
                 fam_h = None
                 if lst[i][2]:
                     fam_h = lst[i][2].get_handle()
-                pbw.connect("button-press-event",
+                pbw.press_handler = pbw.connect("button-press-event",
                             self.cb_person_button_press,
                             lst[i][0].get_handle(), fam_h)
 
@@ -1496,12 +1663,15 @@ class PedigreeView(NavigationView):
         if self._depth < depth:
             self._depth = depth
 
-        try:
-            alive = probably_alive(person, self.dbstate.db)
-        except RuntimeError:
-            ErrorDialog(_('Relationship loop detected'),
-                        _('A person was found to be his/her own ancestor.'))
-            alive = False
+        alive = self._alive_cache.get(person.handle)
+        if alive is None:
+            try:
+                alive = probably_alive(person, self.dbstate.db)
+            except RuntimeError:
+                ErrorDialog(_('Relationship loop detected'),
+                            _('A person was found to be his/her own ancestor.'))
+                alive = False
+            self._alive_cache[person.handle] = alive
         lst[index] = [person, val, None, alive, None]
 
         parent_families = person.get_parent_family_handle_list()
@@ -32,6 +32,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 ngettext = glocale.translation.ngettext # else "nearby" comments are ignored
 import cgi
+from collections import OrderedDict
 
 #-------------------------------------------------------------------------
 #
@@ -114,6 +115,7 @@ _KP_ENTER = Gdk.keyval_from_name("KP_Enter")
 _SPACE = Gdk.keyval_from_name("space")
 _LEFT_BUTTON = 1
 _RIGHT_BUTTON = 3
+_PAGE_CACHE_SIZE = 10
 
 class AttachList(object):
 
@@ -155,7 +157,7 @@ class RelationshipView(NavigationView):
             })
 
         dbstate.connect('database-changed', self.change_db)
-        uistate.connect('nameformat-changed', self.build_tree)
+        uistate.connect('nameformat-changed', self.nameformat_changed)
         self.redrawing = False
 
         self.child = None
@@ -163,6 +165,13 @@ class RelationshipView(NavigationView):
 
         self.reorder_sensitive = False
         self.collapsed_items = {}
+        # per person render data, see get_person_data
+        self.person_data = {}
+        self.person_deps = {}
+        # handles of all objects the page shown depends on
+        self.shown_handles = set()
+        # pages built recently, by active person, see _change_person
+        self.pages = OrderedDict()
 
         self.additional_uis.append(self.additional_ui())
 
@@ -178,7 +187,7 @@ class RelationshipView(NavigationView):
         Register the callbacks we need.
         """
         # Add a signal to pick up event changes, bug #1416
-        self.callman.add_db_signal('event-update', self.family_update)
+        self.callman.add_db_signal('event-update', self.event_update)
 
         self.callman.add_db_signal('person-update', self.person_update)
         self.callman.add_db_signal('person-rebuild', self.person_rebuild)
@@ -187,7 +196,7 @@ class RelationshipView(NavigationView):
         self.callman.add_db_signal('family-delete', self.family_delete)
         self.callman.add_db_signal('family-rebuild', self.family_rebuild)
 
-        self.callman.add_db_signal('person-delete', self.redraw)
+        self.callman.add_db_signal('person-delete', self.person_update)
 
     def navigation_type(self):
         return 'Person'
@@ -206,17 +215,50 @@ class RelationshipView(NavigationView):
         self.use_shade = self._config.get('preferences.relation-shade')
         self.toolbar_visible = config.get('interface.toolbar-on')
         self.uistate.modify_statusbar(self.dbstate)
+        self.pages.clear()
         self.redraw()
 
     def config_update(self, client, cnxn_id, entry, data):
         self.show_siblings = self._config.get('preferences.family-siblings')
         self.show_details = self._config.get('preferences.family-details')
+        self.pages.clear()
         self.redraw()
 
     def build_tree(self):
         self.redraw()
 
-    def person_update(self, handle_list):
+    def nameformat_changed(self):
+        self.clear_person_data()
+        self.pages.clear()
+        self.build_tree()
+
+    def clear_person_data(self, handle_list=None):
+        """
+        Remove the cached render data of the people in handle_list, and of 
+        the people that depend on the families or events in handle_list.
+        Without handle_list, all cached data is removed.
+        """
+        if handle_list is None:
+            self.person_data = {}
+            self.person_deps = {}
+            self.pages.clear()
+            return
+        for handle in handle_list:
+            self.person_data.pop(handle, None)
+            for person_handle in self.person_deps.pop(handle, ()):
+                self.person_data.pop(person_handle, None)
+
+    def update_shown(self, handle_list):
+        """
+        Redraw the page if it shows one of the objects in handle_list.
+        Changes to other objects do not affect it, so the widgets are kept.
+        Kept pages of other people showing these objects are dropped.
+        """
+        for handle, page in list(self.pages.items()):
+            if not page[2].isdisjoint(handle_list):
+                del self.pages[handle]
+        if self.shown_handles.isdisjoint(handle_list):
+            return
         if self.active:
             person  = self.get_active()
             if person:
@@ -227,8 +269,17 @@ class RelationshipView(NavigationView):
         else:
             self.dirty = True
 
+    def person_update(self, handle_list):
+        self.clear_person_data(handle_list)
+        self.update_shown(handle_list)
+
+    def event_update(self, handle_list):
+        self.clear_person_data(handle_list)
+        self.update_shown(handle_list)
+
     def person_rebuild(self):
         """Large change to person database"""
+        self.clear_person_data()
         if self.active:
             self.bookmarks.redraw()
             person  = self.get_active()
@@ -241,17 +292,11 @@ class RelationshipView(NavigationView):
             self.dirty = True
 
     def family_update(self, handle_list):
-        if self.active:
-            person  = self.get_active()
-            if person:
-                while not self.change_person(person):
-                    pass
-            else:
-                self.change_person(None)
-        else:
-            self.dirty = True
+        self.clear_person_data(handle_list)
+        self.update_shown(handle_list)
 
     def family_add(self, handle_list):
+        self.pages.clear()
         if self.active:
             person  = self.get_active()
             if person:
@@ -263,17 +308,11 @@ class RelationshipView(NavigationView):
             self.dirty = True
 
     def family_delete(self, handle_list):
-        if self.active:
-            person  = self.get_active()
-            if person:
-                while not self.change_person(person):
-                    pass
-            else:
-                self.change_person(None)
-        else:
-            self.dirty = True
+        self.clear_person_data(handle_list)
+        self.update_shown(handle_list)
 
     def family_rebuild(self):
+        self.clear_person_data()
         if self.active:
             person  = self.get_active()
             if person:
@@ -448,6 +487,8 @@ class RelationshipView(NavigationView):
     def change_db(self, db):
         #reset the connects
         self._change_db(db)
+        self.clear_person_data()
+        self.shown_handles = set()
         if self.child:
             list(map(self.vbox.remove, self.vbox.get_children()))
             list(map(self.header.remove, self.header.get_children()))
@@ -458,16 +499,50 @@ class RelationshipView(NavigationView):
 
     def get_name(self, handle, use_gender=False):
         if handle:
-            person = self.dbstate.db.get_person_from_handle(handle)
-            name = name_displayer.display(person)
-            if use_gender:
-                gender = _GenderCode[person.gender]
-            else:
+            name, gender = self.get_person_data(handle)[:2]
+            if not use_gender:
                 gender = ""
             return (name, gender)
         else:
             return (_("Unknown"), "")
 
+    def get_person_data(self, handle):
+        """
+        Return (name, gender code, has parents, has children, info string)
+        of the person with handle, as needed to show a person on the page.
+        The data is kept until the person, or one of the families or events
+        it is computed from, changes. The person is marked as shown.
+        """
+        try:
+            data, deps = self.person_data[handle]
+        except KeyError:
+            db = self.dbstate.db
+            person = db.get_person_from_handle(handle)
+            data = (name_displayer.display(person),
+                    _GenderCode[person.gender],
+                    len(person.get_parent_family_handle_list()) > 0,
+                    has_children(db, person),
+                    self._info_string(person))
+            # any event may become the birth or death fallback
+            deps = (person.get_family_handle_list() + 
+                    [ref.ref for ref in person.get_event_ref_list()])
+            for dep in deps:
+                self.person_deps.setdefault(dep, set()).add(handle)
+            self.person_data[handle] = (data, deps)
+        self.shown_handles.add(handle)
+        self.shown_handles.update(deps)
+        return data
+
+    def show_family(self, family):
+        """
+        Mark the family and its members as shown on the page.
+        """
+        self.shown_handles.add(family.handle)
+        self.shown_handles.add(family.get_father_handle())
+        self.shown_handles.add(family.get_mother_handle())
+        self.shown_handles.update(ref.ref
+                                  for ref in family.get_child_ref_list())
+
     def redraw(self, *obj):
         active_person = self.get_active()
         if active_person:
@@ -508,6 +583,24 @@ class RelationshipView(NavigationView):
         for old_child in self.header.get_children():
             self.header.remove(old_child)
 
+        if obj in self.pages:
+            # nothing shown changed since the page was built, reuse it
+            page = self.pages.pop(obj)
+            self.pages[obj] = page
+            (self.child, title, self.shown_handles, 
+             self.reorder_sensitive) = page
+            self.family_action.set_sensitive(True)
+            self.header.pack_start(title, False, True, 0)
+            self.vbox.pack_start(self.child, False, True, 0)
+            self.scroll.get_vadjustment().set_value(old_vadjust)
+            self.redrawing = False
+            self.uistate.modify_statusbar(self.dbstate)
+            self.order_action.set_sensitive(self.reorder_sensitive)
+            self.dirty = False
+            return True
+
+        self.shown_handles = set()
+
         person = self.dbstate.db.get_person_from_handle(obj)
         if not person:
             self.family_action.set_sensitive(False)
@@ -516,7 +609,12 @@ class RelationshipView(NavigationView):
             return
         self.family_action.set_sensitive(True)
 
-        self.write_title(person)
+        self.shown_handles.add(person.handle)
+        self.shown_handles.update(person.get_family_handle_list())
+        self.shown_handles.update(person.get_parent_family_handle_list())
+        self.shown_handles.update(ref.ref 
+                                  for ref in person.get_event_ref_list())
+        title = self.write_title(person)
 
         self.attach = AttachList()
         self.row = 0
@@ -587,6 +685,10 @@ class RelationshipView(NavigationView):
         self.order_action.set_sensitive(self.reorder_sensitive)
         self.dirty = False
 
+        self.pages[obj] = (self.child, title, self.shown_handles,
+                           self.reorder_sensitive)
+        if len(self.pages) > _PAGE_CACHE_SIZE:
+            self.pages.popitem(last=False)
         return True
 
     def write_title(self, person):
@@ -703,6 +805,7 @@ class RelationshipView(NavigationView):
 
         mbox.show_all()
         self.header.pack_start(mbox, False, True, 0)
+        return mbox
 
     def view_photo(self, photo):
         """
@@ -866,6 +969,7 @@ class RelationshipView(NavigationView):
         family = self.dbstate.db.get_family_from_handle(family_handle)
         if not family:
             return
+        self.show_family(family)
         if person and self.check_collapsed(person.handle, family_handle):
             # don't show rest
             self.write_label("%s:" % _('Parents'), family, True, person)
@@ -1048,8 +1152,7 @@ class RelationshipView(NavigationView):
         
         if handle:
             name = self.get_name(handle, True)
-            person = self.dbstate.db.get_person_from_handle(handle)
-            parent = len(person.get_parent_family_handle_list()) > 0
+            parent = self.get_person_data(handle)[2]
             format = ''
             relation_display_theme = self._config.get(
                                     'preferences.relation-display-theme')
@@ -1115,8 +1218,7 @@ class RelationshipView(NavigationView):
                 frame.add(vbox)
             original_vbox.add(frame)
         
-        parent = has_children(self.dbstate.db,
-                              self.dbstate.db.get_person_from_handle(handle))
+        parent = self.get_person_data(handle)[3]
 
         format = ''
         relation_display_theme = self._config.get(
@@ -1170,10 +1272,14 @@ class RelationshipView(NavigationView):
         box.add(widgets.BasicLabel(title))
 
     def info_string(self, handle):
-        person = self.dbstate.db.get_person_from_handle(handle)
-        if not person:
+        if not handle:
+            return None
+        if (handle not in self.person_data and
+                not self.dbstate.db.has_person_handle(handle)):
             return None
+        return self.get_person_data(handle)[4]
 
+    def _info_string(self, person):
         birth = get_birth_or_fallback(self.dbstate.db, person)
         if birth and birth.get_type() != EventType.BIRTH:
             sdate = get_date(birth)
@@ -1233,6 +1339,7 @@ class RelationshipView(NavigationView):
                     self.collapsed_items[object.handle].append(handle)
             else:
                 self.collapsed_items[object.handle] = [handle]
+            self.pages.clear()
             self.redraw()
 
     def _button_press(self, obj, event, handle):
@@ -1280,6 +1387,7 @@ class RelationshipView(NavigationView):
         value = False
         for event_ref in family.get_event_ref_list():
             handle = event_ref.ref
+            self.shown_handles.add(handle)
             event = self.dbstate.db.get_event_from_handle(handle)
             if (event and event.get_type().is_relationship_event() and
                 (event_ref.get_role() == EventRoleType.FAMILY or 
@@ -1333,6 +1441,7 @@ class RelationshipView(NavigationView):
                 _('Broken family detected'),
                 _('Please run the Check and Repair Database tool'))
             return
+        self.show_family(family)
         
         father_handle = family.get_father_handle()
         mother_handle = family.get_mother_handle()
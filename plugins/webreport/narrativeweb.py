@@ -81,10 +81,26 @@ import shutil
 import codecs
 import tarfile
 import tempfile
+import threading
+import zlib
+import gzip
+import json
+import multiprocessing
+from multiprocessing.util import Finalize
 if sys.version_info[0] < 3:
     from cStringIO import StringIO
+    from io import BytesIO
+    from Queue import Queue
 else:
     from io import StringIO, BytesIO, TextIOWrapper
+    from queue import Queue
+try:
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
 from textwrap import TextWrapper
 from unicodedata import normalize
 from collections import defaultdict
@@ -124,10 +140,14 @@ from gramps.gen.utils.config import get_researcher
 from gramps.gen.utils.string import conf_strings
 from gramps.gen.utils.file import media_path_full
 from gramps.gen.utils.alive import probably_alive
-from gramps.gen.utils.db import get_source_and_citation_referents
+from gramps.gen.utils.db import (get_source_and_citation_referents,
+                                  can_copy_database, open_database_copy,
+                                  close_database_copy)
 from gramps.gen.constfunc import win, cuni, conv_to_unicode, UNITYPE, get_curr_dir
 from gramps.gen.config import config
-from gramps.gui.thumbnails import get_thumbnail_path, run_thumbnailer
+from gramps.gen.user import User
+from gramps.gui.thumbnails import (get_thumbnail_path, run_thumbnailer,
+                                   generate_thumbnails)
 from gramps.gen.utils.image import image_size, resize_to_jpeg_buffer
 from gramps.gen.mime import get_description
 from gramps.gen.display.name import displayer as _nd
@@ -136,10 +156,11 @@ from gramps.gen.proxy import PrivateProxyDb, LivingProxyDb
 from gramps.plugins.lib.libhtmlconst import _CHARACTER_SETS, _CC, _COPY_OPTIONS
 
 # import HTML Class from src/plugins/lib/libhtml.py
-from gramps.plugins.lib.libhtml import Html, xml_lang
+from gramps.plugins.lib.libhtml import Html, HtmlFragment, xml_lang
 
 # import styled notes from src/plugins/lib/libhtmlbackend.py
 from gramps.plugins.lib.libhtmlbackend import HtmlBackend, process_spaces
+from gramps.plugins.lib.libwebmedia import MediaStore
 
 from gramps.plugins.lib.libgedcom import make_gedcom_date
 from gramps.gen.utils.place import conv_lat_lon
@@ -435,6 +456,10 @@ _SHADOW = 5
 _XOFFSET = 5
 _WRONGMEDIAPATH = []
 
+# manifest of the pages of the previous run, for incremental runs
+_MANIFEST = ".narrativeweb-manifest.gz"
+_MANIFEST_VERSION = 2
+
 _NAME_STYLE_SHORT = 2
 _NAME_STYLE_DEFAULT = 1
 _NAME_STYLE_FIRST = 0
@@ -529,6 +554,83 @@ def format_date(date):
         return val
     return ""
 
+#################################################
+#
+#    Compressed archives
+#
+#################################################
+# compression of archives: (name, file extension)
+_ARCHIVE_COMPRESSIONS = [("gzip", ".tar.gz")]
+if _zstd is not None:
+    _ARCHIVE_COMPRESSIONS.append(("zstd", ".tar.zst"))
+
+class CompressedWriter(object):
+    """
+    A file to write a tar stream to, which is compressed and written to the
+    archive file in a separate thread.
+    """
+    def __init__(self, fname, compression="gzip"):
+        if compression == "zstd":
+            self.compressor = _zstd.ZstdCompressor()
+            if hasattr(self.compressor, 'compressobj'):
+                # the zstandard module
+                self.compressor = self.compressor.compressobj()
+        else:
+            self.compressor = zlib.compressobj(9, zlib.DEFLATED,
+                                               16 + zlib.MAX_WBITS)
+        self.fname = fname
+        self.file = open(fname, 'wb')
+        self.queue = Queue(256)
+        self.error = None
+        self.discarded = False
+        self.thread = threading.Thread(target=self.__compress)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __compress(self):
+        """
+        Compress the data of the queue into the file, until None is queued.
+        """
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.error is None and not self.discarded:
+                try:
+                    self.file.write(self.compressor.compress(data))
+                except Exception as err:
+                    self.error = err
+        if self.error is None and not self.discarded:
+            try:
+                self.file.write(self.compressor.flush())
+            except Exception as err:
+                self.error = err
+
+    def write(self, data):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(data)
+
+    def close(self, discard=False):
+        """
+        Finish the compression and close the file. If discard is True, or
+        the compression failed, the incomplete file is removed.
+        """
+        if discard:
+            self.discarded = True
+        try:
+            self.queue.put(None)
+            self.thread.join()
+        finally:
+            self.file.close()
+            if discard or self.error is not None:
+                try:
+                    os.remove(self.fname)
+                except OSError:
+                    pass
+        if self.error is not None and not discard:
+            raise self.error
+
 def copy_thumbnail(report, handle, photo, region=None):
     """
     Given a handle (and optional region) make (if needed) an
@@ -541,17 +643,20 @@ def copy_thumbnail(report, handle, photo, region=None):
         ('%d,%d-%d,%d.png' % region) if region else '.png'
         )
     
+    origin = None
+    params = ('thumb', tuple(region) if region else None)
     if photo.get_mime_type():
-        from_path = get_thumbnail_path(media_path_full(
-                                                  report.database,
-                                                  photo.get_path()),
-                                                  photo.get_mime_type(),
-                                                  region)
+        origin = media_path_full(report.database, photo.get_path())
+        if (report.media_store is not None and
+                report.media_store.is_current(to_path, origin, params)):
+            return to_path
+        from_path = get_thumbnail_path(origin, photo.get_mime_type(), region)
         if not os.path.isfile(from_path):
             from_path = CSS["Document"]["filename"]
+            origin = None
     else:
         from_path = CSS["Document"]["filename"]
-    report.copy_file(from_path, to_path)
+    report.copy_file(from_path, to_path, origin=origin, params=params)
     return to_path
 
 '''
@@ -1571,11 +1676,44 @@ class BasePage(object):
             self.dump_attribute(attr) for attr in attrlist
         )
  
+    def cached_fragment(self, key, build):
+        """
+        Return the Html block made by build(), as a fragment that is
+        serialized once and shared by all the pages with the same key. The
+        key must include everything the block depends on, such as self.up
+        for the relative links.
+
+        @param: key -- a hashable key of the block
+        @param: build -- function without arguments that makes the block
+        """
+        report = self.report
+        fragment = report.fragments.get(key)
+        recorder = report.recorder
+        if fragment is None:
+            if recorder is not None:
+                handles = recorder.take()
+            fragment = HtmlFragment(build())
+            fragment.handles = frozenset()
+            if recorder is not None:
+                # the objects the block depends on, for incremental runs
+                fragment.handles = frozenset(recorder.take())
+                recorder.handles = handles
+            report.fragments[key] = fragment
+        if recorder is not None:
+            recorder.handles.update(fragment.handles)
+        return fragment
+
     def write_footer(self):
         """
         Will create and display the footer section of each page...
 
-        @param: bottom -- whether to specify location of footer section or not?
+        The footer is the same on all pages at the same depth.
+        """
+        return self.cached_fragment(("footer", self.up), self.__build_footer)
+
+    def __build_footer(self):
+        """
+        Create the footer section, see write_footer
         """
 
         # begin footer division
@@ -1650,6 +1788,48 @@ class BasePage(object):
         if self.ext in [".php", ".php3", ".cgi"]:
             del page[0]
 
+        # add additional meta and link tags, the same for all pages at the
+        # same depth
+        head += self.cached_fragment(("meta",), self.__build_meta)
+        head += self.cached_fragment(("links", self.up), self.__build_links)
+
+        # begin header section
+        body += self.cached_fragment(("header", self.up),
+                                     self.__build_site_header)
+
+        # Begin Navigation Menu--
+        # is the style sheet either Basic-Blue or Visually Impaired,
+        # and menu layout is Drop Down?
+        if (self.report.css == _("Basic-Blue") or 
+            self.report.css == _("Visually Impaired")) and \
+            self.report.navigation == "dropdown":
+            body += self.cached_fragment(("dropmenu", self.up),
+                                         self.display_drop_menu)
+        else: 
+            # the menu item of the current section depends on the title,
+            # if it is the text of a menu item, and on the kind of the page
+            if title not in (_("Html|Home"), _("Introduction"),
+                             _("Individuals"), _("Surnames"), _("Families"),
+                             _("Events"), _("Places"), _("Sources"),
+                             _("Repositories"), _("Media"), _("Thumbnails"),
+                             _("Download"), _("Address Book"), _("Contact")):
+                current = None
+            else:
+                current = title
+            section = tuple(code in self.report.cur_fname for code in
+                            ("srn", "ppl", "fam", "src", "plc", "evt", "img",
+                             "addr")) + (_("Surnames") in title,)
+            body += self.cached_fragment(("nav", current, section, self.up),
+                                         partial(self.display_nav_links,
+                                                 title))
+
+        # return page, head, and body to its classes...
+        return page, head, body
+
+    def __build_meta(self):
+        """
+        Create the meta tags of the head section, see write_header
+        """
         # Header constants
         _META1 = 'name ="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=1"'
         _META2 = 'name ="apple-mobile-web-app-capable" content="yes"'
@@ -1663,7 +1843,12 @@ class BasePage(object):
                 Html("meta", attr = _META3, indent =False),
                 Html("meta", attr = _META4, indent = False)
         )
+        return meta
 
+    def __build_links(self):
+        """
+        Create the link tags of the head section, see write_header
+        """
         # Link to _NARRATIVESCREEN  stylesheet
         fname = "/".join(["css", _NARRATIVESCREEN])
         url2 = self.report.build_url_fname(fname, None, self.up)
@@ -1688,15 +1873,15 @@ class BasePage(object):
             url = self.report.build_url_fname(fname, None, self.up)
             links += Html("link", type = "text/css", href = url, media = "screen", rel = "stylesheet", indent = False)
 
-        # add additional meta and link tags
-        head += meta
-        head += links
+        return links
 
-        # begin header section
+    def __build_site_header(self):
+        """
+        Create the header section of the body, see write_header
+        """
         headerdiv = Html("div", id = 'header') + (
             Html("h1", html_escape(self.title_str), id = "SiteTitle", inline = True)
         )
-        body += headerdiv
 
         header_note = self.report.options['headernote']
         if header_note:
@@ -1708,19 +1893,7 @@ class BasePage(object):
  
             # attach note
             user_header += note
-
-        # Begin Navigation Menu--
-        # is the style sheet either Basic-Blue or Visually Impaired,
-        # and menu layout is Drop Down?
-        if (self.report.css == _("Basic-Blue") or 
-            self.report.css == _("Visually Impaired")) and \
-            self.report.navigation == "dropdown":
-            body += self.display_drop_menu()
-        else: 
-            body += self.display_nav_links(title)
-
-        # return page, head, and body to its classes...
-        return page, head, body
+        return headerdiv
 
     def display_nav_links(self, currentsection):
         """
@@ -2833,7 +3006,7 @@ class BasePage(object):
             src/plugins/lib/libhtml.py
         """
 
-        htmlinstance.write(partial(print, file=of)) 
+        of.write(htmlinstance.serialize())
 
         # closes the file
         self.report.close_file(of, sio)
@@ -3038,9 +3211,17 @@ class FamilyPages(BasePage):
             self.FamilyListPage(self.report, title,
                                 self.report.obj_dict[Family].keys())
 
-            for family_handle in self.report.obj_dict[Family]:
-                step()
-                self.FamilyPage(self.report, title, family_handle)
+            self.report.write_object_pages("Family",
+                    [(title, family_handle)
+                     for family_handle in self.report.obj_dict[Family]], step)
+
+    def write_object_page(self, title, family_handle):
+        """
+        Write the page of a family, unless it is current.
+        """
+        if self.report.page_is_current(Family, family_handle, "fam"):
+            return
+        self.FamilyPage(self.report, title, family_handle)
     
     def FamilyListPage(self, report, title, fam_list):
         self.dbase_ = report.database
@@ -3315,10 +3496,17 @@ class PlacePages(BasePage):
             self.PlaceListPage(self.report, title,
                                self.report.obj_dict[Place].keys())
 
-            for place_handle in self.report.obj_dict[Place]:
-                step()
-                self.PlacePage(self.report, title, place_handle)
-        pass
+            self.report.write_object_pages("Place",
+                    [(title, place_handle)
+                     for place_handle in self.report.obj_dict[Place]], step)
+
+    def write_object_page(self, title, place_handle):
+        """
+        Write the page of a place, unless it is current.
+        """
+        if self.report.page_is_current(Place, place_handle, "plc"):
+            return
+        self.PlacePage(self.report, title, place_handle)
 
     def PlaceListPage(self, report, title, place_handles):
         self.dbase_ = report.database
@@ -3597,9 +3785,17 @@ class EventPages(BasePage):
                                   len(event_handle_list) + 1) as step:
             self.EventListPage(self.report, title, event_types, event_handle_list)
 
-            for event_handle in event_handle_list:
-                step()
-                self.EventPage(self.report, title, event_handle)
+            self.report.write_object_pages("Event",
+                    [(title, event_handle)
+                     for event_handle in event_handle_list], step)
+
+    def write_object_page(self, title, event_handle):
+        """
+        Write the page of an event, unless it is current.
+        """
+        if self.report.page_is_current(Event, event_handle, "evt"):
+            return
+        self.EventPage(self.report, title, event_handle)
 
     
     def EventListPage(self, report, title, event_types, event_handle_list):
@@ -4142,9 +4338,17 @@ class SourcePages(BasePage):
             self.SourceListPage(self.report, title,
                                 self.report.obj_dict[Source].keys())
 
-            for source_handle in self.report.obj_dict[Source]:
-                step()
-                self.SourcePage(self.report, title, source_handle)
+            self.report.write_object_pages("Source",
+                    [(title, source_handle)
+                     for source_handle in self.report.obj_dict[Source]], step)
+
+    def write_object_page(self, title, source_handle):
+        """
+        Write the page of a source, unless it is current.
+        """
+        if self.report.page_is_current(Source, source_handle, "src"):
+            return
+        self.SourcePage(self.report, title, source_handle)
 
     
     def SourceListPage(self, report, title, source_handles):
@@ -4232,7 +4436,8 @@ class SourcePages(BasePage):
         @param: title -- the web site title
         @param: source_handle -- the handle of the source to be output
         """
-        source = self.db.get_source_from_handle(source_handle)
+        self.dbase_ = report.database
+        source = self.dbase_.get_source_from_handle(source_handle)
         if not source:
             return
 
@@ -4361,13 +4566,24 @@ class MediaPages(BasePage):
             prev = None
             total = len(sorted_media_handles)
             index = 1
+            jobs = []
             for handle in sorted_media_handles:
-                gc.collect() # Reduce memory usage when there are many images.
                 next = None if index == total else sorted_media_handles[index]
-                step()
-                self.MediaPage(self.report, title, handle, (prev, next, index, total))
+                jobs.append((title, handle, (prev, next, index, total)))
                 prev = handle
                 index += 1
+            self.report.write_object_pages("Media", jobs, step)
+
+    def write_object_page(self, title, handle, info):
+        """
+        Write the page of a media object, unless it is current.
+
+        @param: info -- (prev, next, index, total) of the page in the gallery
+        """
+        gc.collect() # Reduce memory usage when there are many images.
+        if self.report.page_is_current(MediaObject, handle, "img", info):
+            return
+        self.MediaPage(self.report, title, handle, info)
 
     def MediaListPage(self, report, title, sorted_media_handles):
         """
@@ -4563,10 +4779,20 @@ class MediaPages(BasePage):
                             scale = min(scale_w, scale_h, 1.0)
                             new_width = int(width*scale)
                             new_height = int(height*scale)
-                            if scale < 0.8:
+                            store = self.report.media_store
+                            initial_image_path = '%s_init.jpg' % os.path.splitext(newpath)[0]
+                            size = [new_width, new_height]
+                            params = ('init', tuple(size))
+                            if scale >= 0.8:
+                                # not worth actually making a smaller image
+                                initial_image_path = newpath
+                            elif store is not None and store.is_current(
+                                    initial_image_path, orig_image_path, params):
+                                # made by a previous run
+                                (new_width, new_height) = image_size(
+                                    os.path.join(self.html_dir, initial_image_path))
+                            else:
                                 # scale factor is significant enough to warrant making a smaller image
-                                initial_image_path = '%s_init.jpg' % os.path.splitext(newpath)[0]
-                                size = [new_width, new_height]
                                 initial_image_data = resize_to_jpeg_buffer(orig_image_path, size)
                                 new_width = size[0] # In case it changed because of keeping the ratio
                                 new_height = size[1]
@@ -4577,12 +4803,9 @@ class MediaPages(BasePage):
                                     self.report.archive.add(dest, initial_image_path)
                                     os.unlink(dest)
                                 else:
-                                    filed = open(os.path.join(self.html_dir, initial_image_path), 'wb')
-                                    filed.write(initial_image_data)
-                                    filed.close()
-                            else:
-                                # not worth actually making a smaller image
-                                initial_image_path = newpath
+                                    store.write(initial_image_data,
+                                                initial_image_path,
+                                                orig_image_path, params)
 
                             # TODO. Convert disk path to URL.
                             url = self.report.build_url_fname(initial_image_path, None, self.up)
@@ -4613,22 +4836,30 @@ class MediaPages(BasePage):
                                          alt = html_escape(self.page_title))
                                 )
                     else:
-                        dirname = tempfile.mkdtemp()
-                        thmb_path = os.path.join(dirname, "document.png")
-                        if run_thumbnailer(mime_type,
-                                           media_path_full(self.dbase_, media.get_path()),
-                                           thmb_path, 320):
-                            try:
-                                path = self.report.build_path("preview", media.get_handle())
-                                npath = os.path.join(path, media.get_handle()) + ".png"
-                                self.report.copy_file(thmb_path, npath)
-                                path = npath
-                                os.unlink(thmb_path)
-                            except EnvironmentError:
-                                path = os.path.join("images", "document.png")
+                        src_path = media_path_full(self.dbase_, media.get_path())
+                        path = self.report.build_path("preview", media.get_handle())
+                        npath = os.path.join(path, media.get_handle()) + ".png"
+                        params = ('preview', 320)
+                        store = self.report.media_store
+                        if (store is not None and
+                                store.is_current(npath, src_path, params)):
+                            path = npath
                         else:
-                            path = os.path.join("images", "document.png")
-                        os.rmdir(dirname)
+                            dirname = tempfile.mkdtemp()
+                            thmb_path = os.path.join(dirname, "document.png")
+                            if run_thumbnailer(mime_type, src_path,
+                                               thmb_path, 320):
+                                try:
+                                    self.report.copy_file(thmb_path, npath,
+                                                          origin=src_path,
+                                                          params=params)
+                                    path = npath
+                                    os.unlink(thmb_path)
+                                except EnvironmentError:
+                                    path = os.path.join("images", "document.png")
+                            else:
+                                path = os.path.join("images", "document.png")
+                            os.rmdir(dirname)
 
                         with Html("div", id = "GalleryDisplay") as mediadisplay:
                             summaryarea += mediadisplay
@@ -4746,11 +4977,7 @@ class MediaPages(BasePage):
             if self.report.archive:
                 self.report.archive.add(fullpath, str(newpath))
             else:
-                to_dir = os.path.join(self.html_dir, to_dir)
-                if not os.path.isdir(to_dir):
-                    os.makedirs(to_dir)
-                shutil.copyfile(fullpath,
-                                os.path.join(self.html_dir, newpath))
+                self.report.media_store.copy(fullpath, newpath)
             return newpath
         except (IOError, OSError) as msg:
             error = _("Missing media object:") +                               \
@@ -5154,10 +5381,18 @@ class PersonPages(BasePage):
                                   len(self.report.obj_dict[Person]) + 1) as step:
             self.IndividualListPage(self.report, title,
                                     self.report.obj_dict[Person].keys())
-            for person_handle in self.report.obj_dict[Person]:
-                step()
-                person = self.report.database.get_person_from_handle(person_handle)
-                self.IndividualPage(self.report, title, person)
+            self.report.write_object_pages("Person",
+                    [(title, person_handle)
+                     for person_handle in self.report.obj_dict[Person]], step)
+
+    def write_object_page(self, title, person_handle):
+        """
+        Write the individual page of a person, unless it is current.
+        """
+        if self.report.page_is_current(Person, person_handle, "ppl"):
+            return
+        person = self.report.database.get_person_from_handle(person_handle)
+        self.IndividualPage(self.report, title, person)
         
 #################################################
 #
@@ -6544,11 +6779,17 @@ class RepositoryPages(BasePage):
             # RepositoryListPage Class
             self.RepositoryListPage(self.report, title, repos_dict, keys)
 
-            for index, key in enumerate(keys):
-                (repo, handle) = repos_dict[key]
+            self.report.write_object_pages("Repository",
+                    [(title, repos_dict[key][1]) for key in keys], step)
 
-                step()
-                self.RepositoryPage(self.report, title, repo, handle)
+    def write_object_page(self, title, handle):
+        """
+        Write the page of a repository, unless it is current.
+        """
+        if self.report.page_is_current(Repository, handle, "repo"):
+            return
+        repo = self.report.database.get_repository_from_handle(handle)
+        self.RepositoryPage(self.report, title, repo, handle)
 
     def RepositoryListPage(self, report, title, repos_dict, keys):
         self.dbase_ = report.database
@@ -6815,6 +7056,101 @@ class AddressBookPage(BasePage):
         # and close the file
         self.XHTMLWriter(addressbookpage, of, sio)
 
+class DependencyRecorder(object):
+    """
+    A database wrapper that records the handles of the objects fetched
+    with the get_*_from_handle methods. Together with the handles of the
+    pages linked to, these are the objects a page depends on, for
+    incremental runs.
+    """
+    def __init__(self, dbase):
+        self.__db = dbase
+        self.handles = set()
+
+    def __getattr__(self, name):
+        attr = getattr(self.__db, name)
+        if name.startswith('get_') and name.endswith('_from_handle'):
+            get = attr
+            def attr(handle, *args, **kwargs):
+                obj = get(handle, *args, **kwargs)
+                if obj is not None:
+                    self.handles.add(handle)
+                return obj
+        # do not come back here for the next lookup
+        setattr(self, name, attr)
+        return attr
+
+    def take(self):
+        """
+        Return the handles recorded since the previous call.
+        """
+        handles = self.handles
+        self.handles = set()
+        return handles
+
+    def unwrap(self):
+        """
+        Return the wrapped database.
+        """
+        return self.__db
+
+#################################################
+#
+#    Worker processes writing object pages
+#
+#################################################
+_PAGE_WORKER = {}
+
+class _ArchiveSpool(object):
+    """
+    Stands in for the archive in a worker process. The members are kept
+    until the report process adds them to the archive: files are linked,
+    or copied, into the spool directory, page data is kept in memory.
+    """
+    def __init__(self, spool_dir):
+        self.spool_dir = spool_dir
+        self.members = []
+
+    def add(self, name, arcname=None):
+        if arcname is None:
+            arcname = name
+        filed, spool = tempfile.mkstemp(dir=self.spool_dir)
+        os.close(filed)
+        os.remove(spool)
+        try:
+            os.link(name, spool)
+        except (OSError, AttributeError):
+            shutil.copyfile(name, spool)
+        self.members.append(('file', spool, arcname))
+
+    def addfile(self, tarinfo, fileobj):
+        self.members.append(('data', tarinfo.name, tarinfo.mtime,
+                             fileobj.read(tarinfo.size)))
+
+def _init_page_worker():
+    """
+    Initialize a worker process, forked by NavWebReport._start_workers:
+    open a private copy of the database.
+    """
+    report = _PAGE_WORKER['report']
+    source_db = _PAGE_WORKER['db']
+    database, tmpdir = open_database_copy(source_db.__class__,
+                                          source_db.get_save_path(),
+                                          "gramps-web-")
+    database.name_formats = source_db.name_formats
+    Finalize(None, close_database_copy, args=(database, tmpdir),
+             exitpriority=10)
+    report._init_worker(database)
+
+def _write_object_page(args):
+    """
+    Write one object page in a worker process.
+    """
+    tab_name, job = args
+    report = _PAGE_WORKER['report']
+    report.tab[tab_name].write_object_page(*job)
+    return report.take_worker_output()
+
 class NavWebReport(Report):
     
     def __init__(self, database, options, user):
@@ -6837,19 +7173,7 @@ class NavWebReport(Report):
             menuopt = menu.get_option_by_name(optname)
             self.options[optname] = menuopt.get_value()
 
-        if not self.options['incpriv']:
-            self.database = PrivateProxyDb(database)
-        else:
-            self.database = database
-
-        livinginfo = self.options['living']
-        yearsafterdeath = self.options['yearsafterdeath']
-
-        if livinginfo != _INCLUDE_LIVING_VALUE:
-            self.database = LivingProxyDb(self.database,
-                                          livinginfo,
-                                          None,
-                                          yearsafterdeath)
+        self.database = self._proxy_database(database)
 
         filters_option = menu.get_option_by_name('filter')
         self.filter = filters_option.get_filter()
@@ -6930,6 +7254,7 @@ class NavWebReport(Report):
             self.intro_fname = None
 
         self.archive = None
+        self.archive_writer = None
         self.cur_fname = None            # Internal use. The name of the output file, 
                                          # to be used for the tar archive.
         self.string_io = None
@@ -6939,6 +7264,39 @@ class NavWebReport(Report):
             self.html_dir = self.target_path
         self.warn_dir = True        # Only give warning once.
 
+        # only regenerate the pages of changed objects, see page_is_current
+        self.incremental = self.options['incremental'] and not self.use_archive
+        self.recorder = None
+        self.manifest_signatures = {}
+
+        # blocks shared by many pages, see BasePage.cached_fragment
+        self.fragments = {}
+
+        # the media files of the site, not copied again when current
+        self.media_store = None
+
+        # processes writing the object pages, see write_object_pages
+        self.workers = self.options['workers']
+        self.pool = None
+        self.spool_dir = None
+
+    def _proxy_database(self, database):
+        """
+        Return database behind the proxies of the privacy options.
+        """
+        if not self.options['incpriv']:
+            database = PrivateProxyDb(database)
+
+        livinginfo = self.options['living']
+        yearsafterdeath = self.options['yearsafterdeath']
+
+        if livinginfo != _INCLUDE_LIVING_VALUE:
+            database = LivingProxyDb(database,
+                                     livinginfo,
+                                     None,
+                                     yearsafterdeath)
+        return database
+
     def write_report(self):
 
         _WRONGMEDIAPATH = []
@@ -6984,17 +7342,59 @@ class NavWebReport(Report):
                       image_dir_name + "\n" + value[1]
                 self.user.notify_error(msg)
                 return
+            self.media_store = MediaStore(self.html_dir,
+                                          self.options['hardlinkmedia'])
         else:
             if os.path.isdir(self.target_path):
                 self.user.notify_error(_('Invalid file name'),
                         _('The archive file must be a file, not a directory'))
                 return
             try:
-                self.archive = tarfile.open(self.target_path, "w:gz")
+                # a tar stream, compressed in another thread
+                self.archive_writer = CompressedWriter(
+                    self.target_path, self.options['archive_compression'])
+                try:
+                    self.archive = tarfile.open(fileobj=self.archive_writer,
+                                                mode="w|")
+                except:
+                    self.archive_writer.close(discard=True)
+                    raise
             except (OSError, IOError) as value:
                 self.user.notify_error(_("Could not create %s") % self.target_path,
                             str(value))
                 return
+        complete = False
+        try:
+            self._write_site()
+            if self.archive:
+                self.archive.close()
+            complete = True
+        finally:
+            # an archive is closed in any case, and removed if incomplete
+            if self.archive_writer is not None:
+                if not complete:
+                    # the rest of the tar stream is dropped by the writer
+                    self.archive_writer.discarded = True
+                    if self.archive:
+                        try:
+                            self.archive.close()
+                        except Exception:
+                            pass
+                self.archive_writer.close(discard=not complete)
+        
+        if len(_WRONGMEDIAPATH) > 0:
+            error = '\n'.join([_('ID=%(grampsid)s, path=%(dir)s') % {
+                            'grampsid': x[0],
+                            'dir': x[1]} for x in _WRONGMEDIAPATH[:10]])
+            if len(_WRONGMEDIAPATH) > 10:
+                error += '\n ...'
+            self.user.warn(_("Missing media objects:"), error)
+
+    def _write_site(self):
+        """
+        Write the pages and copy the files of the site, to the target
+        directory or the archive opened by write_report.
+        """
         config.set('paths.website-directory',
                    os.path.dirname(self.target_path) + os.sep)
 
@@ -7054,67 +7454,427 @@ class NavWebReport(Report):
         #################################################
         
         self._build_obj_dict()
-            
+
+        if self.incremental:
+            self._start_incremental()
+        elif self.html_dir:
+            # the pages of this run do not match the manifest any more
+            manifest = os.path.join(self.html_dir, _MANIFEST)
+            if os.path.isfile(manifest):
+                os.remove(manifest)
+
+        if self.media_store is not None and self.workers > 1:
+            self._make_thumbnails()
+
         #################################################
         # 
         # Pass 2 Generate the web pages
         #
         #################################################
         
-        self.base_pages()
+        self._start_workers()
+        try:
+            self.base_pages()
 
-        # build classes IndividualListPage and IndividualPage
-        self.tab["Person"].display_pages(self.title)
+            # build classes IndividualListPage and IndividualPage
+            self.tab["Person"].display_pages(self.title)
         
-        self.build_gendex(self.obj_dict[Person])
+            self.build_gendex(self.obj_dict[Person])
 
-        # build classes SurnameListPage and SurnamePage
-        self.surname_pages(self.obj_dict[Person])
+            # build classes SurnameListPage and SurnamePage
+            self.surname_pages(self.obj_dict[Person])
 
-        # build classes FamilyListPage and FamilyPage
-        if self.inc_families:
-            self.tab["Family"].display_pages(self.title)
+            # build classes FamilyListPage and FamilyPage
+            if self.inc_families:
+                self.tab["Family"].display_pages(self.title)
 
-        # build classes EventListPage and EventPage
-        if self.inc_events:
-            self.tab["Event"].display_pages(self.title)
+            # build classes EventListPage and EventPage
+            if self.inc_events:
+                self.tab["Event"].display_pages(self.title)
 
-        # build classes PlaceListPage and PlacePage
-        self.tab["Place"].display_pages(self.title)
+            # build classes PlaceListPage and PlacePage
+            self.tab["Place"].display_pages(self.title)
 
-        # build classes RepositoryListPage and RepositoryPage
-        if self.inc_repository:
-            self.tab["Repository"].display_pages(self.title)
+            # build classes RepositoryListPage and RepositoryPage
+            if self.inc_repository:
+                self.tab["Repository"].display_pages(self.title)
 
-        # build classes MediaListPage and MediaPage
-        if self.inc_gallery:
-            if not self.create_thumbs_only:
-                self.tab["Media"].display_pages(self.title)
+            # build classes MediaListPage and MediaPage
+            if self.inc_gallery:
+                if not self.create_thumbs_only:
+                    self.tab["Media"].display_pages(self.title)
 
-            # build Thumbnail Preview Page...
-            self.thumbnail_preview_page()
+                # build Thumbnail Preview Page...
+                self.thumbnail_preview_page()
 
-        # build classes AddressBookListPage and AddressBookPage
-        if self.inc_addressbook:
-            self.addressbook_pages(self.obj_dict[Person])
+            # build classes AddressBookListPage and AddressBookPage
+            if self.inc_addressbook:
+                self.addressbook_pages(self.obj_dict[Person])
 
-        # build classes SourceListPage and SourcePage
-        self.tab["Source"].display_pages(self.title)
+            # build classes SourceListPage and SourcePage
+            self.tab["Source"].display_pages(self.title)
+        finally:
+            self._stop_workers()
 
         # copy all of the neccessary files
         self.copy_narrated_files()
 
-        # if an archive is being used, close it?
+        if self.media_store is not None:
+            self.media_store.save()
+
+        if self.incremental:
+            self._finish_incremental()
+
+    ###########################################################################
+    #
+    # Worker processes. The object pages are written in a pool of processes
+    # forked after the object dictionaries are built, so that these are
+    # shared. Each worker reads its own copy of the database, opened
+    # read-only. Members of an archive are handed back to this process, which
+    # is the only one to write the archive.
+    #
+    ###########################################################################
+
+    def _make_thumbnails(self):
+        """
+        Create the thumbnails and region crops of the media of the site that
+        are not current, in worker threads, before the pages need them.
+        """
+        database = self.database
+        getters = {Person : database.get_person_from_handle,
+                   Family : database.get_family_from_handle,
+                   Event : database.get_event_from_handle,
+                   Place : database.get_place_from_handle,
+                   Source : database.get_source_from_handle,
+                   Citation : database.get_citation_from_handle}
+        sources = []
+        for handle in self.obj_dict[MediaObject]:
+            photo = database.get_object_from_handle(handle)
+            mime_type = photo.get_mime_type()
+            if not mime_type:
+                continue
+            full_path = media_path_full(database, photo.get_path())
+            regions = set([None])
+            for (bkref_class, bkref_handle) in \
+                    self.bkref_dict[MediaObject].get(handle, ()):
+                if bkref_class not in getters:
+                    continue
+                obj = getters[bkref_class](bkref_handle)
+                for mediaref in obj.get_media_list() if obj else []:
+                    if mediaref.ref == handle and mediaref.rect is not None:
+                        regions.add(tuple(mediaref.rect))
+            for region in regions:
+                to_path = os.path.join(self.build_path('thumb', handle),
+                                       handle) + (
+                    ('%d,%d-%d,%d.png' % region) if region else '.png')
+                if not self.media_store.is_current(to_path, full_path,
+                                                   ('thumb', region)):
+                    sources.append((full_path, mime_type, region))
+        if sources:
+            generate_thumbnails(sources, threads=self.workers)
+
+    def _start_workers(self):
+        """
+        Start the pool of worker processes, if more than one worker is asked
+        for and the database can be copied.
+        """
+        if self.workers < 2 or not hasattr(os, 'fork'):
+            return
+        if self.recorder is not None:
+            database = self.recorder.unwrap()
+        else:
+            database = self.database
+        while hasattr(database, 'basedb'):
+            # the real database behind the proxies
+            database = database.basedb
+        if not can_copy_database(database):
+            log.warning("Can not copy the database, writing all pages "
+                        "in one process")
+            return
+        database.sync()
         if self.archive:
-            self.archive.close()
-        
-        if len(_WRONGMEDIAPATH) > 0:
-            error = '\n'.join([_('ID=%(grampsid)s, path=%(dir)s') % {
-                            'grampsid': x[0],
-                            'dir': x[1]} for x in _WRONGMEDIAPATH[:10]])
-            if len(_WRONGMEDIAPATH) > 10:
-                error += '\n ...'
-            self.user.warn(_("Missing media objects:"), error)
+            self.spool_dir = tempfile.mkdtemp(prefix="gramps-web-")
+        if hasattr(multiprocessing, 'get_context'):
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing
+        # the forked workers find the report here
+        _PAGE_WORKER['report'] = self
+        _PAGE_WORKER['db'] = database
+        try:
+            self.pool = context.Pool(self.workers, _init_page_worker)
+        finally:
+            _PAGE_WORKER.clear()
+
+    def _stop_workers(self):
+        """
+        Stop the worker processes and remove the spool directory.
+        """
+        if self.pool is not None:
+            # let the workers exit normally, so that they remove their copy
+            # of the database
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.spool_dir is not None:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            self.spool_dir = None
+
+    def _init_worker(self, database):
+        """
+        Set up the report in a worker process, to write pages from database,
+        a private copy of the database of the report.
+        """
+        self.user = User()
+        self.database = self._proxy_database(database)
+        if self.recorder is not None:
+            self.recorder = DependencyRecorder(self.database)
+            self.database = self.recorder
+        for tab in self.tab.values():
+            if hasattr(tab, 'db'):
+                tab.db = self.database
+            if hasattr(tab, 'dbase_'):
+                tab.dbase_ = self.database
+        if self.archive:
+            self.archive = _ArchiveSpool(self.spool_dir)
+        self.manifest_pages = {}
+        self.manifest_signatures = {}
+
+    def take_worker_output(self):
+        """
+        Return what the pages written by a worker since the previous call
+        leave to the report process: the manifest entries of the pages, the
+        archive members and the media files written.
+        """
+        pages = self.manifest_pages
+        self.manifest_pages = {}
+        members = []
+        if self.archive:
+            members = self.archive.members
+            self.archive.members = []
+        media = None
+        if self.media_store is not None:
+            media = self.media_store.take_new()
+        return pages, members, media
+
+    def write_object_pages(self, tab_name, jobs, step):
+        """
+        Write the pages of objects with the write_object_page method of the
+        tab, in the worker processes if they are started.
+
+        @param: tab_name -- the key of the tab in self.tab
+        @param: jobs -- list of argument tuples for write_object_page
+        @param: step -- progress callback, called once for each job
+        """
+        tab = self.tab[tab_name]
+        if self.pool is None or len(jobs) < 2:
+            for job in jobs:
+                step()
+                tab.write_object_page(*job)
+            return
+        chunksize = max(1, min(32, len(jobs) // (4 * self.workers)))
+        try:
+            for pages, members, media in self.pool.imap_unordered(
+                    _write_object_page, [(tab_name, job) for job in jobs],
+                    chunksize):
+                step()
+                if pages:
+                    self.manifest_pages.update(pages)
+                if media is not None:
+                    self.media_store.update(media)
+                for member in members:
+                    self._add_archive_member(member)
+        except:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            raise
+
+    def _add_archive_member(self, member):
+        """
+        Add an archive member handed back by a worker to the archive.
+        """
+        if member[0] == 'file':
+            fname, arcname = member[1:]
+            try:
+                self.archive.add(fname, arcname)
+            finally:
+                os.remove(fname)
+        else:
+            arcname, mtime, data = member[1:]
+            tarinfo = tarfile.TarInfo(arcname)
+            tarinfo.size = len(data)
+            tarinfo.mtime = mtime
+            if not win():
+                tarinfo.uid = os.getuid()
+                tarinfo.gid = os.getgid()
+            self.archive.addfile(tarinfo, BytesIO(data))
+
+    ###########################################################################
+    #
+    # Incremental runs. The manifest of a run lists the object pages that were
+    # written, with a signature of their back references, and the handles of
+    # the objects read or linked to while writing them, and the handles of
+    # the objects included in the site. A page of the previous run is kept if
+    # the options and its signature are the same, and none of these objects
+    # changed, disappeared or was included or left out since the start of the
+    # previous run.
+    #
+    ###########################################################################
+
+    def _options_hash(self):
+        """
+        Return a hash of the report options, pages of a run with other
+        options are not kept.
+        """
+        options = sorted((name, repr(value))
+                         for (name, value) in self.options.items())
+        return md5(repr((VERSION, options)).encode('utf-8')).hexdigest()
+
+    def _start_incremental(self):
+        """
+        Read the manifest of the previous run, collect the change times of
+        all objects and start recording the dependencies of pages.
+        """
+        self.manifest_started = int(time.time())
+        self.manifest_pages = {}
+        self.manifest_signatures = {}
+        self.old_manifest_pages = {}
+        self.old_manifest_started = 0
+        old_included = set()
+        fname = os.path.join(self.html_dir, _MANIFEST)
+        try:
+            with gzip.open(fname, 'rb') as manifest_file:
+                manifest = json.loads(manifest_file.read().decode('utf-8'))
+            if (manifest['version'] == _MANIFEST_VERSION and
+                    manifest['options'] == self._options_hash()):
+                handles = manifest['handles']
+                self.old_manifest_started = manifest['started']
+                self.old_manifest_pages = dict(
+                    (page, (signature, [handles[index] for index in deps]))
+                    for (page, (signature, deps))
+                    in manifest['pages'].items())
+                old_included = set(manifest['included'])
+            else:
+                # everything is written again, remove the pages later on
+                self.old_manifest_pages = dict(
+                    (page, (None, [])) for page in manifest['pages'])
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+        self.change_times = {}
+        for iter_objects in (self.database.iter_people,
+                             self.database.iter_families,
+                             self.database.iter_events,
+                             self.database.iter_places,
+                             self.database.iter_sources,
+                             self.database.iter_citations,
+                             self.database.iter_media_objects,
+                             self.database.iter_repositories,
+                             self.database.iter_notes):
+            for obj in iter_objects():
+                self.change_times[obj.get_handle()] = obj.get_change_time()
+        # the page of a media object and the pages showing its thumbnails
+        # also depend on the media file, which can be replaced without
+        # editing the object
+        for media in self.database.iter_media_objects():
+            try:
+                stat = os.stat(media_path_full(self.database,
+                                               media.get_path()))
+            except OSError:
+                continue
+            handle = media.get_handle()
+            self.change_times[handle] = max(self.change_times[handle],
+                                            int(stat.st_mtime),
+                                            int(stat.st_ctime))
+        # objects included in the site or left out since the previous run,
+        # after a change of a filter or of privacy, count as changed for the
+        # pages linking to them
+        self.included = self._included_handles()
+        for handle in old_included.symmetric_difference(self.included):
+            self.change_times[handle] = self.manifest_started
+
+        self.recorder = DependencyRecorder(self.database)
+        self.database = self.recorder
+
+    def _included_handles(self):
+        """
+        Return the set of handles of the objects included in the site, as
+        built by _build_obj_dict.
+        """
+        included = set()
+        for obj_class in self.obj_dict:
+            included.update(self.obj_dict[obj_class])
+        return included
+
+    def page_is_current(self, obj_class, handle, subdir, extra=None):
+        """
+        Return True if the page of the object, written by the previous run,
+        can be kept. Otherwise start recording the dependencies of the page,
+        which must be written next.
+
+        @param: obj_class -- class of the object, key of bkref_dict
+        @param: handle -- handle of the object, the name of the page
+        @param: subdir -- subdirectory of the page
+        @param: extra -- other data the page depends on, as a repr-able value
+        """
+        if not self.incremental:
+            return False
+        page = os.path.join(self.build_path(subdir, handle), handle) + self.ext
+        bkrefs = sorted((getattr(bkref_class, '__name__', bkref_class),
+                         bkref_handle) for (bkref_class, bkref_handle)
+                        in self.bkref_dict[obj_class].get(handle, ()))
+        signature = md5(repr((bkrefs, extra)).encode('utf-8')).hexdigest()
+        old = self.old_manifest_pages.get(page)
+        if (old is not None and old[0] == signature and
+                os.path.isfile(os.path.join(self.html_dir, page))):
+            started = self.old_manifest_started
+            change_times = self.change_times
+            for dep in old[1]:
+                change = change_times.get(dep)
+                if change is None or change >= started:
+                    break
+            else:
+                self.manifest_pages[page] = old
+                return True
+        self.manifest_signatures[page] = signature
+        self.recorder.take()
+        self.recorder.handles.add(handle)
+        return False
+
+    def _finish_incremental(self):
+        """
+        Remove the pages of the previous run that were not written or kept,
+        and write the manifest of this run.
+        """
+        self.database = self.recorder.unwrap()
+        self.recorder = None
+        for page in self.old_manifest_pages:
+            if page not in self.manifest_pages:
+                fname = os.path.join(self.html_dir, page)
+                if os.path.isfile(fname):
+                    os.remove(fname)
+
+        handles = {}
+        pages = {}
+        for page, (signature, deps) in self.manifest_pages.items():
+            pages[page] = (signature,
+                           [handles.setdefault(dep, len(handles))
+                            for dep in deps])
+        handle_list = [None] * len(handles)
+        for handle, index in handles.items():
+            handle_list[index] = handle
+        manifest = {
+            'version'  : _MANIFEST_VERSION,
+            'options'  : self._options_hash(),
+            'started'  : self.manifest_started,
+            'handles'  : handle_list,
+            'pages'    : pages,
+            'included' : sorted(self.included),
+            }
+        fname = os.path.join(self.html_dir, _MANIFEST)
+        with gzip.open(fname, 'wb') as manifest_file:
+            manifest_file.write(json.dumps(manifest).encode('utf-8'))
 
     ###########################################################################
     # 
@@ -7809,6 +8569,9 @@ class NavWebReport(Report):
 
         if win():
             fname = fname.replace('\\',"/")
+        if subdir and self.recorder is not None:
+            # the page links to the page of this object
+            self.recorder.handles.add(fname)
         subdirs = self.build_subdirs(subdir, fname, up)
         return "/".join(subdirs + [fname])
 
@@ -7867,11 +8630,17 @@ class NavWebReport(Report):
         will close any file passed to it
         """
 
+        if self.cur_fname in self.manifest_signatures:
+            # the dependencies of the page since page_is_current
+            self.manifest_pages[self.cur_fname] = (
+                self.manifest_signatures.pop(self.cur_fname),
+                list(self.recorder.take()))
         if self.archive:
             if sys.version_info[0] >= 3:
                 of.flush()
             tarinfo = tarfile.TarInfo(self.cur_fname)
-            tarinfo.size = len(string_io.getvalue())
+            # the page ends at the current position, no need to copy it
+            tarinfo.size = string_io.tell()
             tarinfo.mtime = time.time()
             if not win():
                 tarinfo.uid = os.getuid()
@@ -7893,7 +8662,8 @@ class NavWebReport(Report):
         thumb_path = os.path.join(self.build_path('thumb', handle), handle + '.png')
         return real_path, thumb_path
 
-    def copy_file(self, from_fname, to_fname, to_dir=''):
+    def copy_file(self, from_fname, to_fname, to_dir='', origin=None,
+                  params=None):
         """
         Copy a file from a source to a (report) destination.
         If to_dir is not present and if the target is not an archive,
@@ -7903,6 +8673,9 @@ class NavWebReport(Report):
 
         'to_dir' is the relative path name in the destination root. It will
         be prepended before 'to_fname'.
+
+        A file in a directory is not copied again if it is current, see
+        MediaStore.copy for 'origin' and 'params'.
         """
         # log.debug("copying '%s' to '%s/%s'" % (from_fname, to_dir, to_fname))
         if self.archive:
@@ -7917,7 +8690,9 @@ class NavWebReport(Report):
 
             if from_fname != dest:
                 try:
-                    shutil.copyfile(from_fname, dest)
+                    self.media_store.copy(from_fname,
+                                          os.path.join(to_dir, to_fname),
+                                          origin, params)
                 except:
                     print("Copying error: %s" % sys.exc_info()[1])
                     print("Continuing...")
@@ -7945,6 +8720,7 @@ class NavWebOptions(MenuReportOptions):
     def __init__(self, name, dbase):
         self.__db = dbase
         self.__archive = None
+        self.__compression = None
         self.__target = None
         self.__pid = None
         self.__filter = None
@@ -7980,6 +8756,16 @@ class NavWebOptions(MenuReportOptions):
         addopt( "archive", self.__archive )
         self.__archive.connect('value-changed', self.__archive_changed)
 
+        self.__compression = EnumeratedListOption(_("Archive compression"),
+                                                  "gzip")
+        for (name, ext) in _ARCHIVE_COMPRESSIONS:
+            self.__compression.add_item(name, name)
+        self.__compression.set_help(_("The compression of the archive file. "
+                                      "zstd is only available with the "
+                                      "zstandard module."))
+        addopt( "archive_compression", self.__compression )
+        self.__compression.connect('value-changed', self.__archive_changed)
+
         dbname = self.__db.get_dbname()
         default_dir = dbname + "_" + "NAVWEB"
         self.__target = DestinationOption(_("Destination"),
@@ -8292,6 +9078,31 @@ class NavWebOptions(MenuReportOptions):
                                    "events."))
         addopt( "inc_addressbook", inc_addressbook )
 
+        incremental = BooleanOption(_("Only write the pages of changed "
+                                      "objects"), False)
+        incremental.set_help(_("Keep the pages written by the previous run "
+                               "with the same options for the people, "
+                               "families, events, places, sources, media "
+                               "and repositories that did not change, and "
+                               "remove the pages of objects that are no "
+                               "longer included. Not used for archives."))
+        addopt( "incremental", incremental )
+
+        workers = NumberOption(_("Worker processes"), 1, 1, 64)
+        workers.set_help(_("The number of processes writing the pages of "
+                           "people, families, events, places, sources, "
+                           "media and repositories. With 1 all pages are "
+                           "written by the report itself."))
+        addopt( "workers", workers )
+
+        hardlinkmedia = BooleanOption(_("Hard link media files"), False)
+        hardlinkmedia.set_help(_("Make the media files of the web site hard "
+                                 "links to the originals, where the file "
+                                 "system allows it, instead of copies. The "
+                                 "original files must then not be edited "
+                                 "in place."))
+        addopt( "hardlinkmedia", hardlinkmedia )
+
     def __add_place_map_options(self, menu):
         """
         options for the Place Map tab.
@@ -8343,10 +9154,15 @@ class NavWebOptions(MenuReportOptions):
         Update the change of storage: archive or directory
         """
         if self.__archive.get_value() == True:
-            self.__target.set_extension(".tar.gz")
+            compression = self.__compression.get_value()
+            for (name, ext) in _ARCHIVE_COMPRESSIONS:
+                if name == compression:
+                    self.__target.set_extension(ext)
             self.__target.set_directory_entry(False)
+            self.__compression.set_available(True)
         else:
             self.__target.set_directory_entry(True)
+            self.__compression.set_available(False)
 
     def __update_filters(self):
         """
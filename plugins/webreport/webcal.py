@@ -32,7 +32,7 @@ Web Calendar generator.
 # python modules
 #------------------------------------------------------------------------
 from functools import partial
-import os, codecs, shutil, re, sys
+import os, codecs, re, sys
 import datetime, calendar
 
 #------------------------------------------------------------------------
@@ -75,6 +75,7 @@ from gramps.gen.lib.date import gregorian
 # import styled notes from
 # src/plugins/lib/libhtmlbackend.py
 from gramps.plugins.lib.libhtmlbackend import HtmlBackend
+from gramps.plugins.lib.libwebmedia import MediaStore
 #------------------------------------------------------------------------
 # constants
 #------------------------------------------------------------------------
@@ -154,6 +155,7 @@ class WebCalReport(Report):
         self.today = Today()
 
         self.warn_dir = True            # Only give warning once.
+        self.media_store = None
 
         self.link_to_narweb = mgobn('link_to_narweb')
         self.narweb_prefix = mgobn('prefix')
@@ -241,7 +243,7 @@ class WebCalReport(Report):
             os.makedirs(destdir)
 
         if from_fname != dest:
-            shutil.copyfile(from_fname, dest)
+            self.media_store.copy(from_fname, os.path.join(to_dir, to_fname))
         elif self.warn_dir:
             self._user.warn(
                 _("Possible destination error") + "\n" +
@@ -1232,7 +1234,7 @@ class WebCalReport(Report):
         # writes the file out from the page variable; Html instance
         # This didn't work for some reason, but it does in NarWeb:
         #page.write(partial(print, file=of.write))
-        page.write(lambda line: of.write(line + '\n'))
+        of.write(page.serialize())
         # close the file now...
         self.close_file(of)
 
@@ -1243,8 +1245,11 @@ class WebCalReport(Report):
         # get data from database for birthdays/ anniversaries
         self.collect_data(self.start_year)
 
-        # Copy all files for the calendars being created
+        # Copy all files for the calendars being created, the ones that
+        # changed since the previous run
+        self.media_store = MediaStore(self.html_dir)
         self.copy_calendar_files()
+        self.media_store.save()
 
         if self.multiyear:
 
@@ -0,0 +1,560 @@
+#! /usr/bin/env python
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# test/benchmark.py
+
+"""
+Benchmarks of the database, filters, relationships, import, export,
+reports and views of Gramps.
+
+For each size, a synthetic tree is generated into a temporary database, see
+:class:`.TreeGenerator`, and every benchmark is timed on it. The results
+are written as JSON, which can be compared with the results of another run,
+for instance of another version:
+
+    python -m gramps.test.benchmark -s 1000,10000 -o new.json -c old.json
+
+A benchmark that can not run here, for instance the views without GTK, is
+recorded as skipped.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+#-------------------------------------------------------------------------
+from __future__ import print_function
+
+import os
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import traceback
+from timeit import default_timer
+from optparse import OptionParser
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import VERSION, PLUGINS_DIR
+from gramps.gen.db import DbBsddb
+from gramps.gen.db.dbconst import DBMODE_W
+from gramps.gen.lib import (Person, Family, Event, Place, Source, Citation,
+                            MediaObject, Repository, Note)
+from gramps.gen.plug import BasePluginManager
+from gramps.gen.plug.report import CATEGORY_BOOK, CATEGORY_CODE
+from gramps.gen.filters import GenericFilter
+from gramps.gen.filters.rules.person import editor_rule_list
+from gramps.gen.relationship import get_relationship_calculator
+from gramps.cli.user import User
+from gramps.cli.plug import cl_report
+from gramps.plugins.lib.libsynthetic import TreeGenerator
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# name, class, cursor method, handles method, get method
+_TABLES = (
+    ('person', Person, 'get_person_cursor', 'get_person_handles',
+     'get_person_from_handle'),
+    ('family', Family, 'get_family_cursor', 'get_family_handles',
+     'get_family_from_handle'),
+    ('event', Event, 'get_event_cursor', 'get_event_handles',
+     'get_event_from_handle'),
+    ('place', Place, 'get_place_cursor', 'get_place_handles',
+     'get_place_from_handle'),
+    ('source', Source, 'get_source_cursor', 'get_source_handles',
+     'get_source_from_handle'),
+    ('citation', Citation, 'get_citation_cursor', 'get_citation_handles',
+     'get_citation_from_handle'),
+    ('media', MediaObject, 'get_media_cursor', 'get_media_object_handles',
+     'get_object_from_handle'),
+    ('repository', Repository, 'get_repository_cursor',
+     'get_repository_handles', 'get_repository_from_handle'),
+    ('note', Note, 'get_note_cursor', 'get_note_handles',
+     'get_note_from_handle'),
+    )
+
+# the tables whose objects are looked up in the reference map
+_BACKLINK_TABLES = ('event', 'place', 'source', 'citation', 'media')
+
+# family tree formats to export and import
+_FORMATS = ('gramps', 'ged')
+
+_RELATIONSHIP_PAIRS = 200
+
+# arguments of the person rules with parameters, '%(name)s' is replaced by
+# the value name of the generated tree, see tree_values. The other rules
+# with parameters, like the rules of custom filters, are skipped.
+_RULE_ARGUMENTS = {
+    'ChangedSince'          : ['2000-01-01', ''],
+    'HasAddress'            : ['0', 'greater than'],
+    'HasAssociation'        : ['0', 'greater than'],
+    'HasAttribute'          : ['Nickname', ''],
+    'HasBirth'              : ['after 1900', '', ''],
+    'HasCitation'           : ['', '', '2'],
+    'HasCommonAncestorWith' : ['%(person)s'],
+    'HasDeath'              : ['before 1900', '', ''],
+    'HasEvent'              : ['Occupation', '', '', '', '', '0'],
+    'HasFamilyAttribute'    : ['Number of Children', ''],
+    'HasFamilyEvent'        : ['Marriage', 'after 1900', '', ''],
+    'HasIdOf'               : ['%(person)s'],
+    'HasLDS'                : ['0', 'greater than'],
+    'HasNameOf'             : ['', '%(surname)s'] + [''] * 9,
+    'HasNameOriginType'     : ['Patrilineal'],
+    'HasNameType'           : ['Birth Name'],
+    'HasNote'               : ['0', 'greater than'],
+    'HasNoteRegexp'         : ['e'],
+    'HasRelationship'       : ['1', '', '2'],
+    'HasSourceCount'        : ['0', 'greater than'],
+    'HasSourceOf'           : ['%(source)s'],
+    'HasTextMatchingSubstringOf' : ['%(surname)s', '0'],
+    'HavePhotos'            : ['0', 'greater than'],
+    'IsAncestorOf'          : ['%(person)s', '1'],
+    'IsDescendantFamilyOf'  : ['%(ancestor)s', '1'],
+    'IsDescendantOf'        : ['%(ancestor)s', '1'],
+    'IsDuplicatedAncestorOf' : ['%(person)s'],
+    'IsLessThanNthGenerationAncestorOf' : ['%(person)s', '5'],
+    'IsLessThanNthGenerationAncestorOfBookmarked' : ['5'],
+    'IsLessThanNthGenerationAncestorOfDefaultPerson' : ['5'],
+    'IsLessThanNthGenerationDescendantOf' : ['%(ancestor)s', '5'],
+    'IsMoreThanNthGenerationAncestorOf' : ['%(person)s', '2'],
+    'IsMoreThanNthGenerationDescendantOf' : ['%(ancestor)s', '2'],
+    'IsRelatedWith'         : ['%(person)s'],
+    'IsWitness'             : ['Marriage'],
+    'MatchesSourceConfidence' : ['2'],
+    'ProbablyAlive'         : ['1950'],
+    'RegExpIdOf'            : ['1'],
+    'RelationshipPathBetween' : ['%(person)s', '%(person2)s'],
+    }
+
+#-------------------------------------------------------------------------
+#
+# Benchmark
+#
+#-------------------------------------------------------------------------
+class Skipped(Exception):
+    """
+    Raised by a benchmark that can not run here.
+    """
+
+class Benchmark(object):
+    """
+    The results of the benchmarks on one tree.
+    """
+
+    def __init__(self, verbose=False):
+        self.results = {}
+        self.verbose = verbose
+
+    def time(self, name, func, *args):
+        """
+        Time func(*args), which returns the number of items it processed,
+        and record it as name.
+        """
+        try:
+            start = default_timer()
+            count = func(*args)
+            seconds = default_timer() - start
+        except Skipped as msg:
+            result = {'skipped' : str(msg)}
+        except Exception:
+            result = {'error' : traceback.format_exc().splitlines()[-1]}
+            if self.verbose:
+                traceback.print_exc()
+        else:
+            result = {'seconds' : seconds, 'count' : count}
+            if count and seconds > 0:
+                result['per_second'] = count / seconds
+        self.record(name, result)
+        return result
+
+    def skip(self, name, reason):
+        """
+        Record the benchmark name as skipped.
+        """
+        self.record(name, {'skipped' : reason})
+
+    def record(self, name, result):
+        self.results[name] = result
+        if self.verbose:
+            print("  %-45s %s" % (name, _format_result(result)))
+
+def _format_result(result):
+    """
+    Return the result of a benchmark as text.
+    """
+    if 'seconds' in result:
+        return "%9.3f s %8d items" % (result['seconds'], result['count'])
+    elif 'skipped' in result:
+        return "skipped: %s" % result['skipped']
+    return "error: %s" % result['error']
+
+#-------------------------------------------------------------------------
+#
+# Databases
+#
+#-------------------------------------------------------------------------
+def open_database(path):
+    """
+    Create a database in the empty directory path and open it.
+    """
+    database = DbBsddb()
+    database.write_version(path)
+    database.load(path, None, DBMODE_W)
+    return database
+
+def generate_database(path, size, seed):
+    """
+    Create a database in path with a synthetic tree of size people.
+
+    :returns: (database, seconds taken)
+    """
+    database = open_database(path)
+    start = default_timer()
+    TreeGenerator(database, seed=seed).generate(size)
+    return database, default_timer() - start
+
+#-------------------------------------------------------------------------
+#
+# Benchmarks
+#
+#-------------------------------------------------------------------------
+def iterate_cursor(database, class_type, cursor_method):
+    """
+    Unserialize every object of a table, read with a cursor.
+    """
+    count = 0
+    with getattr(database, cursor_method)() as cursor:
+        for handle, data in cursor:
+            obj = class_type()
+            obj.unserialize(data)
+            count += 1
+    return count
+
+def get_from_handles(database, handles, get_method):
+    """
+    Get every object of handles.
+    """
+    get_func = getattr(database, get_method)
+    for handle in handles:
+        get_func(handle)
+    return len(handles)
+
+def find_backlinks(database, handles):
+    """
+    Find the back references of every object of handles.
+    """
+    for handle in handles:
+        for item in database.find_backlink_handles(handle):
+            pass
+    return len(handles)
+
+def tree_values(database, handles, rng):
+    """
+    Return the values of the generated tree for the arguments of the rules:
+    the IDs of two random people, one of the first generation, a surname
+    and the ID of a source.
+    """
+    values = {'person' : '', 'person2' : '', 'ancestor' : '', 'surname' : '',
+              'source' : ''}
+    if handles['person']:
+        person = database.get_person_from_handle(rng.choice(handles['person']))
+        values['person'] = person.get_gramps_id()
+        values['surname'] = person.get_primary_name().get_surname()
+        values['person2'] = database.get_person_from_handle(
+            rng.choice(handles['person'])).get_gramps_id()
+        # the people are generated from the oldest generation on
+        values['ancestor'] = database.get_person_from_handle(
+            min(handles['person'],
+                key=lambda handle: database.get_raw_person_data(handle)[1])
+            ).get_gramps_id()
+    if handles['source']:
+        values['source'] = database.get_source_from_handle(
+            rng.choice(handles['source'])).get_gramps_id()
+    return values
+
+def apply_rule(database, rule_class, arguments, handles):
+    """
+    Apply a filter with only rule_class, with arguments, to handles.
+    """
+    person_filter = GenericFilter()
+    person_filter.add_rule(rule_class(arguments))
+    person_filter.apply(database, handles)
+    return len(handles)
+
+def calculate_relationships(database, pairs):
+    """
+    Calculate the relationship of every pair of person handles.
+    """
+    calc = get_relationship_calculator()
+    for handle1, handle2 in pairs:
+        calc.get_one_relationship(database,
+                                  database.get_person_from_handle(handle1),
+                                  database.get_person_from_handle(handle2))
+    return len(pairs)
+
+def _get_plugin(plugins, extension):
+    """
+    Return the import or export plugin of extension, of plugins.
+    """
+    for plugin in plugins:
+        if plugin.get_extension() == extension:
+            return plugin
+    raise Skipped("no plugin for %s" % extension)
+
+def export_tree(database, extension, filename):
+    """
+    Export database to filename.
+    """
+    pmgr = BasePluginManager.get_instance()
+    plugin = _get_plugin(pmgr.get_export_plugins(), extension)
+    plugin.get_export_function()(database, filename,
+                                 User(auto_accept=True, quiet=True))
+    return database.get_number_of_people()
+
+def import_tree(extension, filename, path):
+    """
+    Import filename into a new database in path.
+    """
+    if not os.path.isfile(filename):
+        raise Skipped("not exported")
+    pmgr = BasePluginManager.get_instance()
+    plugin = _get_plugin(pmgr.get_import_plugins(), extension)
+    os.mkdir(path)
+    database = open_database(path)
+    try:
+        plugin.get_import_function()(database, filename,
+                                     User(auto_accept=True, quiet=True))
+        return database.get_number_of_people()
+    finally:
+        database.close()
+
+def write_report(database, name, options):
+    """
+    Write the report name with options, a dictionary of option strings.
+    """
+    pmgr = BasePluginManager.get_instance()
+    for pdata in pmgr.get_reg_reports(gui=False):
+        if pdata.id == name:
+            break
+    else:
+        raise Skipped("no report %s" % name)
+    if pdata.category in (CATEGORY_BOOK, CATEGORY_CODE):
+        raise Skipped("not a plain report")
+    mod = pmgr.load_plugin(pdata)
+    if not mod:
+        raise Skipped("the report can not be loaded")
+    cl_report(database, name, pdata.category,
+              getattr(mod, pdata.reportclass),
+              getattr(mod, pdata.optionclass), options)
+    return database.get_number_of_people()
+
+def build_person_view(database):
+    """
+    Build the model of the person list view.
+    """
+    try:
+        from gramps.gui.views.treemodels import PersonListModel
+    except ImportError as msg:
+        raise Skipped("no GTK: %s" % msg)
+    PersonListModel(database)
+    return database.get_number_of_people()
+
+def run_benchmarks(bench, database, tmpdir, seed):
+    """
+    Run all benchmarks on database, using tmpdir for files.
+    """
+    handles = {}
+    for name, class_type, cursor_method, handles_method, get_method \
+            in _TABLES:
+        bench.time("cursor.%s" % name, iterate_cursor, database, class_type,
+                   cursor_method)
+        handles[name] = list(getattr(database, handles_method)())
+        bench.time("get_from_handle.%s" % name, get_from_handles, database,
+                   handles[name], get_method)
+
+    for name in _BACKLINK_TABLES:
+        bench.time("find_backlink_handles.%s" % name, find_backlinks,
+                   database, handles[name])
+
+    values = tree_values(database, handles, random.Random(seed))
+    for rule_class in editor_rule_list:
+        name = "filter.%s" % rule_class.__name__
+        if not rule_class.labels:
+            arguments = []
+        elif rule_class.__name__ in _RULE_ARGUMENTS:
+            arguments = [argument % values for argument
+                         in _RULE_ARGUMENTS[rule_class.__name__]]
+        else:
+            bench.skip(name, "needs parameters")
+            continue
+        bench.time(name, apply_rule, database, rule_class, arguments,
+                   handles['person'])
+
+    rng = random.Random(seed)
+    pairs = []
+    if handles['person']:
+        pairs = [(rng.choice(handles['person']),
+                  rng.choice(handles['person']))
+                 for index in range(_RELATIONSHIP_PAIRS)]
+    bench.time("relationship", calculate_relationships, database, pairs)
+
+    for extension in _FORMATS:
+        filename = os.path.join(tmpdir, "export.%s" % extension)
+        bench.time("export.%s" % extension, export_tree, database,
+                   extension, filename)
+        bench.time("import.%s" % extension, import_tree, extension,
+                   filename, os.path.join(tmpdir, "import-%s" % extension))
+
+    bench.time("report.navwebpage", write_report, database, 'navwebpage',
+               {'target' : os.path.join(tmpdir, "narrativeweb")})
+
+    bench.time("view.person", build_person_view, database)
+
+#-------------------------------------------------------------------------
+#
+# Comparison
+#
+#-------------------------------------------------------------------------
+def compare(old, new, threshold):
+    """
+    Print the benchmarks of the sizes in both results, with the ratio of
+    the new time to the old. Ratios above threshold are marked. Benchmarks
+    that were skipped or failed in either run are shown as such.
+    """
+    print("%-8s %-45s %9s %9s %7s" % ("size", "benchmark", "old", "new",
+                                      "ratio"))
+    for size in sorted(new['sizes'], key=int):
+        if size not in old['sizes']:
+            continue
+        old_results = old['sizes'][size]['results']
+        new_results = new['sizes'][size]['results']
+        for name in sorted(set(old_results) | set(new_results)):
+            old_result = old_results.get(name, {})
+            new_result = new_results.get(name, {})
+            if not ('seconds' in old_result and 'seconds' in new_result):
+                print("%-8s %-45s %9s %9s" % (size, name,
+                                              _result_state(old_result),
+                                              _result_state(new_result)))
+                continue
+            if old_result['seconds'] > 0:
+                ratio = new_result['seconds'] / old_result['seconds']
+            else:
+                ratio = 1.0
+            print("%-8s %-45s %9.3f %9.3f %7.2f%s" % (
+                size, name, old_result['seconds'], new_result['seconds'],
+                ratio, " *" if ratio > threshold else ""))
+
+def _result_state(result):
+    """
+    Return the time of a result, or what became of it, as short text.
+    """
+    if 'seconds' in result:
+        return "%.3f" % result['seconds']
+    elif 'skipped' in result:
+        return "skipped"
+    elif 'error' in result:
+        return "error"
+    return "-"
+
+#-------------------------------------------------------------------------
+#
+# Main
+#
+#-------------------------------------------------------------------------
+def make_parser():
+    usage = "usage: %prog [options]"
+    parser = OptionParser(usage)
+    parser.add_option("-s", "--sizes", dest="sizes", default="1000,10000",
+                      help="Comma separated numbers of people of the trees")
+    parser.add_option("--seed", type="int", dest="seed", default=0,
+                      help="Seed of the generated trees")
+    parser.add_option("-o", "--output", dest="output",
+                      default="benchmark.json",
+                      help="File to write the results to")
+    parser.add_option("-c", "--compare", dest="compare", default=None,
+                      help="Results of an earlier run to compare with")
+    parser.add_option("-t", "--threshold", type="float", dest="threshold",
+                      default=1.2,
+                      help="Mark benchmarks slower than this ratio")
+    parser.add_option("-k", "--keep", action="store_true", dest="keep",
+                      default=False,
+                      help="Keep the generated databases")
+    parser.add_option("-q", "--quiet", action="store_false", dest="verbose",
+                      default=True,
+                      help="Do not print the results while running")
+    return parser
+
+def main(args=None):
+    (options, args) = make_parser().parse_args(args)
+    sizes = [int(size) for size in options.sizes.split(',') if size]
+
+    pmgr = BasePluginManager.get_instance()
+    pmgr.reg_plugins(PLUGINS_DIR)
+
+    output = {
+        'version'  : VERSION,
+        'python'   : platform.python_version(),
+        'platform' : platform.platform(),
+        'date'     : time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'seed'     : options.seed,
+        'sizes'    : {},
+        }
+    for size in sizes:
+        tmpdir = tempfile.mkdtemp(prefix="gramps-benchmark-")
+        if options.verbose:
+            print("%d people, in %s" % (size, tmpdir))
+        database = None
+        try:
+            path = os.path.join(tmpdir, "tree")
+            os.mkdir(path)
+            database, seconds = generate_database(path, size, options.seed)
+            if options.verbose:
+                print("  %-45s %9.3f s" % ("generate", seconds))
+            bench = Benchmark(options.verbose)
+            run_benchmarks(bench, database, tmpdir, options.seed)
+            output['sizes'][str(size)] = {
+                'generate' : seconds,
+                'people'   : database.get_number_of_people(),
+                'families' : database.get_number_of_families(),
+                'events'   : database.get_number_of_events(),
+                'results'  : bench.results,
+                }
+        finally:
+            if database is not None:
+                database.close()
+            if not options.keep:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    with open(options.output, 'w') as output_file:
+        json.dump(output, output_file, indent=1, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as old_file:
+            compare(json.load(old_file), output, options.threshold)
+
+if __name__ == '__main__':
+    main()